@@ -0,0 +1,221 @@
+"""
+Debounced background autosave for TODO_App_GUI.
+
+Changes mark the task list as dirty. Saving waits until no change has
+been made for a short delay, so a burst of edits results in one save.
+The save itself runs on a worker thread, so writing large task lists
+doesn't freeze the window.
+"""
+
+import time
+import queue
+import logging
+import threading
+import tkinter as tk
+
+from typing import Callable, Union
+
+logger = logging.getLogger(__name__)
+
+
+class Autosaver():
+    def __init__(
+            self,
+            root: tk.Tk,
+            prepare_save: Callable[[], Union[Callable[[], None], None]],
+            on_save_error: Callable[[Exception], None],
+            delay: int,
+            max_delay: int) -> None:
+        """
+        Parameters
+        ----------
+        root : tk.Tk
+            Main window, used to schedule timers on the Tk thread
+        prepare_save : Callable[[], Callable[[], None] or None]
+            Called on the Tk thread when it is time to save. Returns a
+            function that writes the changes and is safe to run on the
+            worker thread, or None if there's nothing to save
+        on_save_error : Callable[[Exception], None]
+            Called on the Tk thread if a save fails
+        delay : int
+            Milliseconds without changes to wait before saving
+        max_delay : int
+            Maximum milliseconds a change waits to be saved while
+            changes keep coming
+        """
+
+        self.root = root
+        self.prepare_save = prepare_save
+        self.on_save_error = on_save_error
+        self.delay = delay
+        self.max_delay = max_delay
+
+        self.dirty: bool = False
+        self.timer_id: Union[str, None] = None
+        self.first_change_time: Union[float, None] = None
+        self.saves_in_progress: int = 0
+        self.saves_lock = threading.Lock()
+        self.results_check_id: Union[str, None] = None
+
+        self.save_jobs: queue.Queue = queue.Queue()
+        self.save_errors: queue.Queue = queue.Queue()
+
+        self.worker = threading.Thread(
+            target=self.run_worker, name="autosave", daemon=True
+        )
+        self.worker.start()
+
+    def mark_dirty(self) -> None:
+        """
+        Records that tasks have changed, (re)starts the save timer.
+        The timer is not pushed back past max_delay from the first
+        unsaved change
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        now: float = time.monotonic()
+
+        if not self.dirty:
+            self.dirty = True
+            self.first_change_time = now
+
+        waited: int = int((now - self.first_change_time) * 1000)
+        delay: int = max(min(self.delay, self.max_delay - waited), 0)
+
+        if self.timer_id is not None:
+            self.root.after_cancel(self.timer_id)
+
+        self.timer_id = self.root.after(delay, self.flush)
+
+    def save_now(self) -> None:
+        """
+        Saves right away, even if no change has been recorded since
+        the last save, for example when the user asks for a save
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        self.dirty = True
+        self.flush()
+
+    def flush(self) -> None:
+        """
+        Hands unsaved changes to the worker thread right away. Does
+        nothing if there are no unsaved changes
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        if self.timer_id is not None:
+            self.root.after_cancel(self.timer_id)
+            self.timer_id = None
+
+        if not self.dirty:
+            return
+
+        save_job: Union[Callable[[], None], None] = self.prepare_save()
+
+        self.dirty = False
+        self.first_change_time = None
+
+        if save_job is None:
+            return
+
+        with self.saves_lock:
+            self.saves_in_progress += 1
+
+        self.save_jobs.put(save_job)
+
+        if self.results_check_id is None:
+            self.results_check_id = self.root.after(100, self.check_results)
+
+    def check_results(self) -> None:
+        """
+        Reports errors of finished saves on the Tk thread. Runs only
+        while saves are in progress
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        self.results_check_id = None
+
+        while True:
+            try:
+                error: Exception = self.save_errors.get_nowait()
+            except queue.Empty:
+                break
+
+            self.on_save_error(error)
+
+        with self.saves_lock:
+            saves_in_progress: int = self.saves_in_progress
+
+        if saves_in_progress:
+            self.results_check_id = self.root.after(100, self.check_results)
+
+    def close(self) -> None:
+        """
+        Saves unsaved changes, waits for the worker thread to finish
+        writing them. Called when the window is closed
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        self.flush()
+
+        self.save_jobs.put(None)
+        self.worker.join()
+
+        if self.results_check_id is not None:
+            self.root.after_cancel(self.results_check_id)
+            self.results_check_id = None
+
+        while not self.save_errors.empty():
+            self.on_save_error(self.save_errors.get_nowait())
+
+    def run_worker(self) -> None:
+        while True:
+            save_job: Union[Callable[[], None], None] = self.save_jobs.get()
+
+            if save_job is None:
+                return
+
+            try:
+                save_job()
+            except Exception as error:
+                logger.exception("Autosave failed")
+                self.save_errors.put(error)
+            finally:
+                with self.saves_lock:
+                    self.saves_in_progress -= 1
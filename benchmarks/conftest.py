@@ -0,0 +1,79 @@
+"""
+Shared setup of the benchmark suite. Benchmarks are run with pytest
+from the repository root:
+
+    python -m pytest benchmarks
+
+Task counts benchmarks run with are read from the TODO_BENCHMARK_SIZES
+environment variable, for example TODO_BENCHMARK_SIZES=1000,100000.
+Measured times are printed in a table after the test results.
+"""
+
+import os
+import sys
+import time
+import pytest
+
+from typing import Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+benchmark_results: list = []
+
+
+def benchmark_sizes() -> list:
+    return [
+        int(size) for size in os.environ.get(
+            "TODO_BENCHMARK_SIZES", "1000,100000,1000000"
+        ).split(",")
+    ]
+
+
+@pytest.fixture
+def measure() -> Callable[..., float]:
+    """
+    Returns a function that times an operation, records the result for
+    the summary table and returns the time one operation took
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    measure : Callable[..., float]
+        Called with the operation's name, number of tasks, a function
+        that runs the operation operation_count times and
+        operation_count. Returns seconds per operation
+    """
+
+    def measure(
+            operation: str,
+            size: int,
+            run: Callable[[], None],
+            operation_count: int = 1) -> float:
+        started: float = time.perf_counter()
+        run()
+        seconds: float = time.perf_counter() - started
+
+        benchmark_results.append((operation, size, seconds, operation_count))
+
+        return seconds / operation_count
+
+    return measure
+
+
+def pytest_terminal_summary(terminalreporter) -> None:
+    if not benchmark_results:
+        return
+
+    terminalreporter.section("benchmarks")
+    terminalreporter.write_line(
+        f"{'operation':<24}{'tasks':>10}{'total ms':>12}{'per op us':>12}"
+    )
+
+    for operation, size, seconds, operation_count in benchmark_results:
+        terminalreporter.write_line(
+            f"{operation:<24}{size:>10}{seconds * 1000:>12.1f}"
+            f"{seconds / operation_count * 1e6:>12.2f}"
+        )
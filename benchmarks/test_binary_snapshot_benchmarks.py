@@ -0,0 +1,102 @@
+"""
+Benchmarks of reading binary snapshots at different numbers of tasks.
+Opening a snapshot and reading one page of it should cost the same no
+matter how many tasks it holds, reading all tasks should cost the same
+per task.
+"""
+
+import datetime
+import pytest
+
+from binary_snapshot import BinarySnapshotReader, write_binary_snapshot
+from conftest import benchmark_sizes
+
+OPEN_COUNT: int = 100
+PAGE_SIZE: int = 50
+
+# Allowed ratio of time per operation (or per task) on the largest
+# snapshot to time on the smallest
+MAX_SLOWDOWN: float = 10.0
+
+FIRST_DEADLINE: datetime.date = datetime.date(2030, 1, 1)
+
+
+def snapshot_task(index: int) -> dict:
+    deadline: datetime.date = FIRST_DEADLINE + datetime.timedelta(
+        days=index % 365
+    )
+
+    return {"task_id": f"{index:032x}", "task_name": f"Task {index % 1000}",
+            "deadline": deadline.strftime("%d-%m-%Y"),
+            "completed": index % 2 == 0}
+
+
+@pytest.fixture(scope="module")
+def snapshots(tmp_path_factory) -> dict:
+    directory = tmp_path_factory.mktemp("binary_snapshots")
+    snapshots: dict = {}
+
+    for size in benchmark_sizes():
+        snapshot_dir: str = str(directory / f"tasks_{size}.bin")
+
+        with open(snapshot_dir, "wb") as snapshot_file:
+            write_binary_snapshot(
+                snapshot_file=snapshot_file,
+                tasks=(snapshot_task(index) for index in range(size))
+            )
+
+        snapshots[size] = snapshot_dir
+
+    return snapshots
+
+
+def check_scaling(per_operation: dict) -> None:
+    smallest: float = per_operation[min(per_operation)]
+    largest: float = per_operation[max(per_operation)]
+
+    assert largest <= smallest * MAX_SLOWDOWN, per_operation
+
+
+def test_open(snapshots: dict, measure) -> None:
+    per_open: dict = {}
+
+    for size, snapshot_dir in snapshots.items():
+        def run() -> None:
+            for _ in range(OPEN_COUNT):
+                with BinarySnapshotReader(snapshot_dir) as snapshot:
+                    assert len(snapshot) == size
+
+        per_open[size] = measure("open binary snapshot", size, run, OPEN_COUNT)
+
+    check_scaling(per_open)
+
+
+def test_read_last_page(snapshots: dict, measure) -> None:
+    per_page: dict = {}
+
+    for size, snapshot_dir in snapshots.items():
+        with BinarySnapshotReader(snapshot_dir) as snapshot:
+            def run() -> None:
+                tasks: list = snapshot.read_range(size - PAGE_SIZE, size)
+                assert tasks[-1] == snapshot_task(size - 1)
+
+            per_page[size] = measure("read binary page", size, run)
+
+    check_scaling(per_page)
+
+
+def test_read_all(snapshots: dict, measure) -> None:
+    per_task: dict = {}
+
+    for size, snapshot_dir in snapshots.items():
+        def run() -> None:
+            tasks_count: int = 0
+
+            for _ in BinarySnapshotReader(snapshot_dir):
+                tasks_count += 1
+
+            assert tasks_count == size
+
+        per_task[size] = measure("read binary snapshot", size, run, size)
+
+    check_scaling(per_task)
@@ -0,0 +1,74 @@
+"""
+Benchmarks of searching task names at different numbers of tasks. A
+query that matches few tasks should cost about as much as its matches,
+so it fails if it isn't much faster than looking through every name.
+"""
+
+import pytest
+
+from conftest import benchmark_sizes
+from search_index import TaskNameIndex
+from task_store import Task
+
+QUERY_COUNT: int = 100
+
+# How many times faster than a scan of all names a query that matches
+# one task has to be on the largest index
+MIN_SPEEDUP: float = 20.0
+
+WORDS: tuple = ("buy", "milk", "report", "call", "fix", "bug", "email",
+                "plan", "trip", "review", "code", "pay", "rent")
+
+
+def task_name(index: int) -> str:
+    return (f"{WORDS[index % len(WORDS)]} "
+            f"{WORDS[index // len(WORDS) % len(WORDS)]} #{index}.")
+
+
+@pytest.fixture(scope="module")
+def indexes() -> dict:
+    indexes: dict = {}
+
+    for size in benchmark_sizes():
+        name_index = TaskNameIndex()
+        name_index.rebuild(
+            Task(task_id=f"{index:032x}", task_name=task_name(index),
+                 deadline=0)
+            for index in range(size)
+        )
+        indexes[size] = name_index
+
+    return indexes
+
+
+def test_search_few_matches(indexes: dict, measure) -> None:
+    per_query: dict = {}
+
+    for size, name_index in indexes.items():
+        queries: list = [
+            f"#{index * (size // QUERY_COUNT)}."
+            for index in range(QUERY_COUNT)
+        ]
+
+        def run() -> None:
+            for query in queries:
+                assert len(name_index.search(query)) == 1
+
+        per_query[size] = measure(
+            "search (few matches)", size, run, QUERY_COUNT
+        )
+
+    size: int = max(indexes)
+    task_names: list = [task_name(index).casefold() for index in range(size)]
+
+    per_scan: float = measure(
+        "scan all names", size,
+        lambda: [name for name in task_names if "#0." in name]
+    )
+
+    assert per_query[size] * MIN_SPEEDUP <= per_scan, (per_query, per_scan)
+
+
+def test_search_short_query(indexes: dict, measure) -> None:
+    for size, name_index in indexes.items():
+        measure("search (short query)", size, lambda: name_index.search("mi"))
@@ -0,0 +1,240 @@
+"""
+Benchmarks of TaskStore operations at different numbers of tasks. They
+don't need a display. Operations that should cost the same no matter how
+many tasks there are fail if they get much slower on the largest store,
+loading and saving all tasks fail if their cost per task does.
+"""
+
+import json
+import datetime
+import pytest
+
+from conftest import benchmark_sizes
+from task_journal import TaskJournal
+from task_storage import JsonJournalStorage
+from task_store import Task, TaskStore
+
+OPERATION_COUNT: int = 1000
+
+# Allowed ratio of time per operation (or per task) on the largest
+# store to time on the smallest. Generous, so timer noise and cache
+# effects don't fail the suite, while linear scans still do
+MAX_SLOWDOWN: float = 10.0
+
+FIRST_DEADLINE: int = datetime.date(2030, 1, 1).toordinal()
+
+
+def task_id(index: int) -> str:
+    return f"{index:032x}"
+
+
+def build_store(directory, size: int) -> TaskStore:
+    """
+    Creates a store with size tasks, saved to a JSON snapshot in
+    directory
+
+    Parameters
+    ----------
+    directory : pathlib.Path
+        Directory for the snapshot and journal files
+    size : int
+        Number of tasks
+
+    Returns
+    ----------
+    task_store : TaskStore
+        Store with the tasks, with no unsaved changes
+    """
+
+    task_journal = TaskJournal(
+        snapshot_dir=str(directory / f"tasks_{size}.json"),
+        journal_dir=str(directory / f"tasks_{size}.journal"),
+        compaction_threshold=2 ** 62
+    )
+    task_store = TaskStore(
+        task_storage=JsonJournalStorage(task_journal=task_journal)
+    )
+
+    for index in range(size):
+        task_store.insert(task=Task(
+            task_id=task_id(index), task_name=f"Task {index}",
+            deadline=FIRST_DEADLINE + index % 365, completed=index % 2 == 0
+        ))
+
+    task_store.task_storage.write_snapshot(
+        tasks=(task.to_dict() for task in task_store)
+    )
+
+    return task_store
+
+
+def spread_task_ids(size: int, count: int) -> list:
+    step: int = max(size // count, 1)
+
+    return [task_id(index) for index in range(0, size, step)][:count]
+
+
+def check_scaling(per_operation: dict) -> None:
+    smallest: float = per_operation[min(per_operation)]
+    largest: float = per_operation[max(per_operation)]
+
+    assert largest <= smallest * MAX_SLOWDOWN, per_operation
+
+
+@pytest.fixture(scope="module")
+def stores(tmp_path_factory) -> dict:
+    """
+    Stores keyed by number of tasks. Built once per module because
+    building the largest store takes a while. Benchmarks change the
+    stores, but never by more than a few thousand tasks
+    """
+
+    directory = tmp_path_factory.mktemp("task_store_benchmarks")
+
+    return {
+        size: build_store(directory=directory, size=size)
+        for size in benchmark_sizes()
+    }
+
+
+def test_add(stores: dict, measure) -> None:
+    per_operation: dict = {}
+
+    for size, task_store in stores.items():
+        def run() -> None:
+            for index in range(OPERATION_COUNT):
+                task_store.add(
+                    task_name=f"Added {index}", deadline=FIRST_DEADLINE
+                )
+
+        per_operation[size] = measure("add", size, run, OPERATION_COUNT)
+
+    check_scaling(per_operation)
+
+
+def test_toggle(stores: dict, measure) -> None:
+    per_operation: dict = {}
+
+    for size, task_store in stores.items():
+        task_ids: list = spread_task_ids(size=size, count=OPERATION_COUNT)
+
+        def run() -> None:
+            for toggled_task_id in task_ids:
+                task_store.toggle(task_id=toggled_task_id, completed=True)
+
+        per_operation[size] = measure("toggle", size, run, len(task_ids))
+
+    check_scaling(per_operation)
+
+
+def test_edit(stores: dict, measure) -> None:
+    per_operation: dict = {}
+
+    for size, task_store in stores.items():
+        task_ids: list = spread_task_ids(size=size, count=OPERATION_COUNT)
+
+        def run() -> None:
+            for edited_task_id in task_ids:
+                task_store.edit(
+                    task_id=edited_task_id, task_name="Edited",
+                    deadline=FIRST_DEADLINE + 1
+                )
+
+        per_operation[size] = measure("edit", size, run, len(task_ids))
+
+    check_scaling(per_operation)
+
+
+def test_save_changes(stores: dict, measure) -> None:
+    per_operation: dict = {}
+
+    for size, task_store in stores.items():
+        task_ids: list = spread_task_ids(size=size, count=OPERATION_COUNT)
+
+        for toggled_task_id in task_ids:
+            task_store.toggle(task_id=toggled_task_id, completed=False)
+
+        per_operation[size] = measure(
+            "save (changes)", size, task_store.save, len(task_ids)
+        )
+
+    check_scaling(per_operation)
+
+
+def test_delete(stores: dict, measure) -> None:
+    per_operation: dict = {}
+
+    for size, task_store in stores.items():
+        # Fewer deletes than a quarter of the store, so the cost of
+        # compacting the tasks list is measured separately by load
+        task_ids: list = spread_task_ids(
+            size=size, count=min(OPERATION_COUNT, size // 10)
+        )
+
+        def run() -> None:
+            for deleted_task_id in task_ids:
+                task_store.delete(task_id=deleted_task_id)
+
+        per_operation[size] = measure("delete", size, run, len(task_ids))
+
+    check_scaling(per_operation)
+
+
+def test_toggle_many(stores: dict, measure) -> None:
+    per_task: dict = {}
+
+    for size, task_store in stores.items():
+        task_ids: list = [task.task_id for task in task_store]
+
+        per_task[size] = measure(
+            "toggle_many (all)", size,
+            lambda: task_store.toggle_many(task_ids=task_ids, completed=True),
+            len(task_ids)
+        )
+        task_store.save()
+
+    check_scaling(per_task)
+
+
+def test_delete_many(stores: dict, measure) -> None:
+    per_task: dict = {}
+
+    for size, task_store in stores.items():
+        task_ids: list = [task.task_id for task in task_store][::10]
+
+        per_task[size] = measure(
+            "delete_many (10%)", size,
+            lambda: task_store.delete_many(task_ids=task_ids),
+            len(task_ids)
+        )
+        task_store.save()
+
+    check_scaling(per_task)
+
+
+def test_save_full_rewrite(stores: dict, measure) -> None:
+    per_task: dict = {}
+
+    for size, task_store in stores.items():
+        task_store.storage_outdated = True
+
+        per_task[size] = measure(
+            "save (full rewrite)", size, task_store.save, len(task_store)
+        )
+
+    check_scaling(per_task)
+
+
+def test_load(stores: dict, measure) -> None:
+    per_task: dict = {}
+
+    for size, saved_store in stores.items():
+        task_store = TaskStore(task_storage=saved_store.task_storage)
+
+        per_task[size] = measure(
+            "load", size, task_store.load, len(saved_store)
+        )
+
+        assert len(task_store) == len(saved_store)
+
+    check_scaling(per_task)
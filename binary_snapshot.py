@@ -0,0 +1,386 @@
+"""
+Binary snapshot of tasks with random access to every task.
+
+The file starts with a fixed-size header, followed by one fixed-width
+record per task and a string table:
+
+- header: magic bytes, format version, record size, number of records,
+  number of strings and where the string table starts
+- record: task ID (16 bytes), task name (index of a string in the
+  string table), deadline (date ordinal) and flags
+- string table: offsets of the strings, then the strings themselves as
+  UTF-8. Task names are interned, so a name used by many tasks is
+  stored once
+
+Task IDs written by the app are 32 hexadecimal digits and are stored in
+the record as 16 bytes. Other IDs are stored in the string table.
+
+The file is read through mmap. Opening it reads only the header, and
+the position of any record is computed from its index, so a single task
+or a page of tasks can be decoded without reading the rest.
+"""
+
+import mmap
+import struct
+import datetime
+
+from typing import BinaryIO, Iterable, Iterator, Union
+
+MAGIC: bytes = b"TODOSNAP"
+FORMAT_VERSION: int = 1
+
+# magic, format version, record size, number of records, number of
+# strings, offset of string table
+HEADER = struct.Struct("<8sIIQQQ")
+
+# task ID, index of task name, deadline ordinal, flags
+RECORD = struct.Struct("<16sIIB3x")
+
+STRING_OFFSETS = struct.Struct("<QQ")
+
+COMPLETED_FLAG: int = 1
+# The task ID is not 32 hexadecimal digits. The first 4 bytes of the ID
+# field are the index of the ID in the string table
+ID_IN_STRING_TABLE_FLAG: int = 2
+
+
+def write_binary_snapshot(
+        snapshot_file: BinaryIO,
+        tasks: Iterable[dict],
+        batch_size: int = 1000) -> int:
+    """
+    Writes tasks to a file in the binary snapshot format. Records are
+    written batch_size at a time, so tasks can be streamed from another
+    file. Only distinct strings are kept in memory
+
+    Parameters
+    ----------
+    snapshot_file : BinaryIO
+        File opened for writing in binary mode. Has to be seekable
+    tasks : Iterable[dict]
+        Tasks in the JSON file format
+    batch_size : int, default: 1000
+        Number of records written at a time
+
+    Returns
+    ----------
+    written_count : int
+        Number of tasks written
+    """
+
+    strings: list = []
+    string_indexes: dict = {}
+    deadline_ordinals: dict = {}
+
+    def intern(text: str) -> int:
+        string_index: Union[int, None] = string_indexes.get(text)
+
+        if string_index is None:
+            string_index = string_indexes[text] = len(strings)
+            strings.append(text.encode("utf-8"))
+
+        return string_index
+
+    header_position: int = snapshot_file.tell()
+    snapshot_file.write(HEADER.pack(MAGIC, FORMAT_VERSION, RECORD.size, 0, 0, 0))
+
+    written_count: int = 0
+    records: list = []
+
+    for task in tasks:
+        flags: int = COMPLETED_FLAG if task.get("completed") else 0
+
+        task_id: str = task.get("task_id") or ""
+        try:
+            id_bytes: bytes = bytes.fromhex(task_id)
+        except ValueError:
+            id_bytes = b""
+
+        if len(id_bytes) != 16 or id_bytes.hex() != task_id:
+            id_bytes = struct.pack("<I", intern(task_id))
+            flags |= ID_IN_STRING_TABLE_FLAG
+
+        deadline: Union[int, None] = deadline_ordinals.get(task["deadline"])
+        if deadline is None:
+            day, month, year = task["deadline"].split("-")
+            deadline = deadline_ordinals[task["deadline"]] = datetime.date(
+                int(year), int(month), int(day)
+            ).toordinal()
+
+        records.append(RECORD.pack(
+            id_bytes, intern(task["task_name"]), deadline, flags
+        ))
+        written_count += 1
+
+        if len(records) >= batch_size:
+            snapshot_file.write(b"".join(records))
+            records = []
+
+    snapshot_file.write(b"".join(records))
+
+    string_table_position: int = snapshot_file.tell() - header_position
+
+    string_offset: int = 0
+    offsets: list = [0]
+
+    for string in strings:
+        string_offset += len(string)
+        offsets.append(string_offset)
+
+        if len(offsets) >= batch_size:
+            snapshot_file.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+            offsets = []
+
+    snapshot_file.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+    snapshot_file.write(b"".join(strings))
+
+    end_position: int = snapshot_file.tell()
+    snapshot_file.seek(header_position)
+    snapshot_file.write(HEADER.pack(
+        MAGIC, FORMAT_VERSION, RECORD.size, written_count, len(strings),
+        string_table_position
+    ))
+    snapshot_file.seek(end_position)
+
+    return written_count
+
+
+class BinarySnapshotReader():
+    """
+    Reads tasks from a binary snapshot. Used as a context manager for
+    random access, or iterated to read all tasks in order like
+    SnapshotReader. records_read and records_count show how far
+    iterating has got.
+    """
+
+    def __init__(self, snapshot_dir: str) -> None:
+        """
+        Parameters
+        ----------
+        snapshot_dir : str
+            Path of the binary snapshot file
+        """
+
+        self.snapshot_dir = snapshot_dir
+        self.snapshot_file: Union[BinaryIO, None] = None
+        self.mapping: Union[mmap.mmap, None] = None
+
+        self.records_count: Union[int, None] = None
+        self.records_read: int = 0
+
+        self.strings: dict = {}
+        self.deadline_texts: dict = {}
+
+    def open(self) -> None:
+        """
+        Maps the file to memory and reads its header
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+
+        Raises
+        ----------
+        ValueError
+            If the file is not a binary snapshot in a known format
+        """
+
+        self.snapshot_file = open(self.snapshot_dir, "rb")
+
+        try:
+            self.mapping = mmap.mmap(
+                self.snapshot_file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+
+            if len(self.mapping) < HEADER.size:
+                raise ValueError(f"{self.snapshot_dir} is not a task snapshot")
+
+            (magic, format_version, record_size, self.records_count,
+             self.strings_count, string_table_position) = HEADER.unpack_from(
+                self.mapping, 0
+            )
+        except BaseException:
+            self.close()
+            raise
+
+        if magic != MAGIC or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{self.snapshot_dir} is not a task snapshot")
+
+        if format_version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(
+                f"{self.snapshot_dir} has unknown format version "
+                f"{format_version}"
+            )
+
+        self.string_offsets_position: int = string_table_position
+        self.strings_position: int = (
+            string_table_position + (self.strings_count + 1) * 8
+        )
+
+    def close(self) -> None:
+        if self.mapping is not None:
+            self.mapping.close()
+            self.mapping = None
+
+        if self.snapshot_file is not None:
+            self.snapshot_file.close()
+            self.snapshot_file = None
+
+    def __enter__(self) -> "BinarySnapshotReader":
+        self.open()
+
+        return self
+
+    def __exit__(self, *exception_info) -> None:
+        self.close()
+
+    def progress(self) -> float:
+        if self.records_count is None:
+            return 0.0
+
+        if not self.records_count:
+            return 1.0
+
+        return min(self.records_read / self.records_count, 1.0)
+
+    def string(self, string_index: int) -> str:
+        """
+        Returns a string of the string table. Decoded strings are kept,
+        so tasks with the same name share one string object
+
+        Parameters
+        ----------
+        string_index : int
+            Index of the string
+
+        Returns
+        ----------
+        string : str
+            Decoded string
+        """
+
+        string: Union[str, None] = self.strings.get(string_index)
+
+        if string is None:
+            start, end = STRING_OFFSETS.unpack_from(
+                self.mapping, self.string_offsets_position + string_index * 8
+            )
+            string = self.strings[string_index] = self.mapping[
+                self.strings_position + start:self.strings_position + end
+            ].decode("utf-8")
+
+        return string
+
+    def deadline_text(self, deadline: int) -> str:
+        deadline_text: Union[str, None] = self.deadline_texts.get(deadline)
+
+        if deadline_text is None:
+            deadline_date: datetime.date = datetime.date.fromordinal(deadline)
+            deadline_text = self.deadline_texts[deadline] = (
+                f"{deadline_date.day:02d}-{deadline_date.month:02d}-"
+                f"{deadline_date.year:04d}"
+            )
+
+        return deadline_text
+
+    def __len__(self) -> int:
+        return self.records_count
+
+    def __getitem__(self, index: int) -> dict:
+        """
+        Decodes one task. The reader has to be open
+
+        Parameters
+        ----------
+        index : int
+            Position of the task in the snapshot, negative counts from
+            the end
+
+        Returns
+        ----------
+        task : dict
+            Task in the JSON file format
+
+        Raises
+        ----------
+        IndexError
+            If there is no task at the position
+        """
+
+        if index < 0:
+            index += self.records_count
+
+        if not 0 <= index < self.records_count:
+            raise IndexError("BinarySnapshotReader index out of range")
+
+        id_bytes, name_index, deadline, flags = RECORD.unpack_from(
+            self.mapping, HEADER.size + index * RECORD.size
+        )
+
+        if flags & ID_IN_STRING_TABLE_FLAG:
+            task_id: str = self.string(struct.unpack_from("<I", id_bytes)[0])
+        else:
+            task_id = id_bytes.hex()
+
+        return {"task_id": task_id, "task_name": self.string(name_index),
+                "deadline": self.deadline_text(deadline),
+                "completed": bool(flags & COMPLETED_FLAG)}
+
+    def read_range(self, start: int, stop: int) -> list:
+        """
+        Decodes the tasks in a range of positions, for example one page
+        of a task list. The reader has to be open
+
+        Parameters
+        ----------
+        start : int
+            Position of the first task
+        stop : int
+            Position after the last task. Clamped to the number of tasks
+
+        Returns
+        ----------
+        tasks : list
+            Tasks in the JSON file format
+        """
+
+        return [
+            self[index]
+            for index in range(max(start, 0), min(stop, self.records_count))
+        ]
+
+    def __iter__(self) -> Iterator[dict]:
+        """
+        Yields tasks in the order they appear in the snapshot. If the
+        reader isn't open, it is opened for the iteration and closed
+        once all tasks are read
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        tasks : Iterator[dict]
+            Tasks read from the snapshot
+        """
+
+        opened_here: bool = self.mapping is None
+        if opened_here:
+            self.open()
+
+        try:
+            self.records_read = 0
+
+            for index in range(self.records_count):
+                self.records_read += 1
+                yield self[index]
+        finally:
+            if opened_here:
+                self.close()
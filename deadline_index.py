@@ -0,0 +1,375 @@
+"""
+Tasks sorted by deadline, kept up to date as tasks change.
+
+DeadlineIndex keeps two sorted lists, one of all tasks and one of tasks
+that are not finished yet. Tasks with the same deadline stay in the
+order they were added. Finding the tasks due in a range of days is a
+binary search, and DeadlineRange shows such a range as a read-only
+sequence without copying it, so the task list view always shows the
+current tasks of the range.
+"""
+
+import bisect
+
+from task_store import Task
+from typing import Iterable, Iterator, Union
+
+# Batches with more changed tasks than this rebuild the sorted lists in
+# one pass instead of moving tasks one at a time
+LARGE_BATCH_SIZE: int = 32
+
+
+class DeadlineIndex():
+    def __init__(self) -> None:
+        # Entries are (deadline, sequence, task) tuples. sequence is
+        # unique, so tasks themselves are never compared
+        self.entries: list = []
+        self.open_entries: list = []
+        self.entry_keys: dict = {}
+        self.next_sequence: int = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def rebuild(self, tasks: Iterable[Task]) -> None:
+        """
+        Replaces indexed tasks with the given tasks. Used once tasks are
+        loaded, since sorting them all at once is faster than inserting
+        them one at a time
+
+        Parameters
+        ----------
+        tasks : Iterable[Task]
+            Tasks in the order they were added
+
+        Returns
+        ----------
+        None
+        """
+
+        self.entries = []
+        self.entry_keys = {}
+
+        for sequence, task in enumerate(tasks):
+            self.entries.append((task.deadline, sequence, task))
+            self.entry_keys[task.task_id] = (task.deadline, sequence)
+
+        self.next_sequence = len(self.entries)
+
+        self.entries.sort(key=lambda entry: entry[:2])
+        self.open_entries = [
+            entry for entry in self.entries if not entry[2].completed
+        ]
+
+    def insert(self, task: Task) -> None:
+        """
+        Adds a task to the index
+
+        Parameters
+        ----------
+        task : Task
+            Task that isn't indexed yet
+
+        Returns
+        ----------
+        None
+        """
+
+        entry: tuple = (task.deadline, self.next_sequence, task)
+        self.next_sequence += 1
+        self.entry_keys[task.task_id] = entry[:2]
+
+        bisect.insort(self.entries, entry)
+
+        if not task.completed:
+            bisect.insort(self.open_entries, entry)
+
+    def discard(self, task: Task) -> Union[tuple, None]:
+        """
+        Removes a task from the index. Does nothing if the task isn't
+        indexed
+
+        Parameters
+        ----------
+        task : Task
+            Task to remove
+
+        Returns
+        ----------
+        entry_key : tuple or None
+            Deadline and sequence number the task was indexed with, None
+            if it wasn't indexed
+        """
+
+        entry_key: Union[tuple, None] = self.entry_keys.pop(task.task_id, None)
+
+        if entry_key is not None:
+            self.remove_entry(self.entries, entry_key)
+            self.remove_entry(self.open_entries, entry_key)
+
+        return entry_key
+
+    @staticmethod
+    def remove_entry(entries: list, entry_key: tuple) -> None:
+        position: int = bisect.bisect_left(entries, entry_key)
+
+        if position < len(entries) and entries[position][:2] == entry_key:
+            del entries[position]
+
+    def on_task_changed(
+            self,
+            operation: str,
+            tasks: list,
+            previous_states: list) -> None:
+        """
+        Updates the index after tasks changed. Added to TaskStore as a
+        listener
+
+        Parameters
+        ----------
+        operation : str
+            "add", "edit", "toggle" or "delete"
+        tasks : list
+            Changed tasks
+        previous_states : list
+            Tasks' states before the change, None for added tasks
+
+        Returns
+        ----------
+        None
+        """
+
+        if operation != "add" and len(tasks) > LARGE_BATCH_SIZE:
+            self.reindex_many(tasks=tasks, removed=operation == "delete")
+            return
+
+        for task in tasks:
+            if operation == "add":
+                self.discard(task)
+                self.insert(task)
+            elif operation == "delete":
+                self.discard(task)
+            elif task.task_id in self.entry_keys:
+                self.reindex(task)
+
+    def reindex_many(self, tasks: list, removed: bool) -> None:
+        """
+        Updates many changed tasks at once by rebuilding the sorted 
+        lists. Tasks keep their sequence numbers
+
+        Parameters
+        ----------
+        tasks : list
+            Changed tasks
+        removed : bool
+            True if the tasks were deleted
+
+        Returns
+        ----------
+        None
+        """
+
+        entry_keys: dict = self.entry_keys
+
+        for task in tasks:
+            entry_key: Union[tuple, None] = entry_keys.pop(task.task_id, None)
+
+            if entry_key is not None and not removed:
+                entry_keys[task.task_id] = (task.deadline, entry_key[1])
+
+        self.entries = [
+            entry_keys[task.task_id] + (task,)
+            for _, _, task in self.entries if task.task_id in entry_keys
+        ]
+        self.entries.sort(key=lambda entry: entry[:2])
+        self.open_entries = [
+            entry for entry in self.entries if not entry[2].completed
+        ]
+
+    def reindex(self, task: Task) -> None:
+        """
+        Moves an indexed task to where its current deadline and state
+        belong. The task keeps its sequence number, so it stays in the
+        same order among tasks with the same deadline
+
+        Parameters
+        ----------
+        task : Task
+            Indexed task that changed
+
+        Returns
+        ----------
+        None
+        """
+
+        deadline, sequence = self.entry_keys[task.task_id]
+        entry: tuple = (task.deadline, sequence, task)
+
+        if deadline != task.deadline:
+            self.remove_entry(self.entries, (deadline, sequence))
+            bisect.insort(self.entries, entry)
+            self.entry_keys[task.task_id] = entry[:2]
+
+        self.remove_entry(self.open_entries, (deadline, sequence))
+
+        if not task.completed:
+            bisect.insort(self.open_entries, entry)
+
+    def by_deadline(self) -> "DeadlineRange":
+        return DeadlineRange(deadline_index=self, open_only=False)
+
+    def due_between(
+            self,
+            first_deadline: Union[int, None],
+            end_deadline: Union[int, None]) -> "DeadlineRange":
+        """
+        Returns unfinished tasks due in a range of days
+
+        Parameters
+        ----------
+        first_deadline : int or None
+            Date ordinal of the first day of the range. None includes
+            all days before end_deadline
+        end_deadline : int or None
+            Date ordinal of the day after the range. None includes all
+            days after first_deadline
+
+        Returns
+        ----------
+        tasks : DeadlineRange
+            Tasks in the range, earliest deadline first
+        """
+
+        return DeadlineRange(
+            deadline_index=self, open_only=True,
+            first_deadline=first_deadline, end_deadline=end_deadline
+        )
+
+    def overdue(self, today: int) -> "DeadlineRange":
+        return self.due_between(first_deadline=None, end_deadline=today)
+
+    def due_today(self, today: int) -> "DeadlineRange":
+        return self.due_between(first_deadline=today, end_deadline=today + 1)
+
+    def due_this_week(self, today: int) -> "DeadlineRange":
+        return self.due_between(first_deadline=today, end_deadline=today + 7)
+
+
+class DeadlineRange():
+    """
+    Tasks of a DeadlineIndex with deadlines in a range, as a read-only
+    sequence. Range bounds are found with a binary search on every
+    access, so the sequence follows changes made to the index.
+    """
+
+    def __init__(
+            self,
+            deadline_index: DeadlineIndex,
+            open_only: bool,
+            first_deadline: Union[int, None] = None,
+            end_deadline: Union[int, None] = None) -> None:
+        """
+        Parameters
+        ----------
+        deadline_index : DeadlineIndex
+            Index the tasks are taken from
+        open_only : bool
+            If True, finished tasks are left out
+        first_deadline : int or None, default: None
+            Date ordinal of the first day of the range, None for no
+            lower bound
+        end_deadline : int or None, default: None
+            Date ordinal of the day after the range, None for no upper
+            bound
+        """
+
+        self.deadline_index = deadline_index
+        self.open_only = open_only
+        self.first_deadline = first_deadline
+        self.end_deadline = end_deadline
+
+    def bounds(self) -> tuple:
+        """
+        Returns the indexed entries and where the range starts and ends
+        in them
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        entries : list
+            Sorted entries of the index
+        start : int
+            Position of the first entry in the range
+        stop : int
+            Position after the last entry in the range
+        """
+
+        entries: list = (
+            self.deadline_index.open_entries if self.open_only
+            else self.deadline_index.entries
+        )
+
+        start: int = 0
+        if self.first_deadline is not None:
+            start = bisect.bisect_left(entries, (self.first_deadline,))
+
+        stop: int = len(entries)
+        if self.end_deadline is not None:
+            stop = bisect.bisect_left(entries, (self.end_deadline,), start)
+
+        return entries, start, stop
+
+    def select(self, tasks: Iterable[Task]) -> list:
+        """
+        Returns the given tasks that are in this range, in the order
+        the range shows them. Costs as much as the number of given
+        tasks, not the size of the range
+
+        Parameters
+        ----------
+        tasks : Iterable[Task]
+            Tasks indexed by the deadline index, like search results
+
+        Returns
+        ----------
+        selected_tasks : list
+            Tasks in the range, earliest deadline first
+        """
+
+        entry_keys: dict = self.deadline_index.entry_keys
+
+        selected_tasks: list = [
+            task for task in tasks
+            if not (self.open_only and task.completed)
+            and (self.first_deadline is None
+                 or task.deadline >= self.first_deadline)
+            and (self.end_deadline is None
+                 or task.deadline < self.end_deadline)
+        ]
+        selected_tasks.sort(key=lambda task: entry_keys[task.task_id])
+
+        return selected_tasks
+
+    def __len__(self) -> int:
+        _, start, stop = self.bounds()
+
+        return stop - start
+
+    def __getitem__(self, index: int) -> Task:
+        entries, start, stop = self.bounds()
+
+        if index < 0:
+            index += stop - start
+
+        if not 0 <= index < stop - start:
+            raise IndexError("DeadlineRange index out of range")
+
+        return entries[start + index][2]
+
+    def __iter__(self) -> Iterator[Task]:
+        entries, start, stop = self.bounds()
+
+        return (entry[2] for entry in entries[start:stop])
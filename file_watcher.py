@@ -0,0 +1,287 @@
+"""
+Detection of changes other programs make to the task files.
+
+FileWatcher keeps the size, modification time and inode of the files a
+storage backend writes to, and calls on_change when they differ from
+what the app itself last wrote. On Linux it is woken up by inotify
+through Tk's file handlers, so nothing runs while the files don't
+change. Elsewhere, or if inotify can't be used, the files are checked
+with root.after every poll interval. Changes are only checked once the
+files have been quiet for a short delay, so a program writing a file in
+several steps causes one reload.
+"""
+
+import os
+import sys
+import struct
+import threading
+import tkinter as tk
+
+from typing import Callable, Iterable, Union
+
+# inotify event masks and flags, see inotify(7)
+IN_MODIFY: int = 0x2
+IN_CLOSE_WRITE: int = 0x8
+IN_MOVED_FROM: int = 0x40
+IN_MOVED_TO: int = 0x80
+IN_CREATE: int = 0x100
+IN_DELETE: int = 0x200
+IN_NONBLOCK: int = 0o4000
+IN_CLOEXEC: int = 0o2000000
+
+WATCH_MASK: int = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+                   | IN_CREATE | IN_DELETE)
+
+# wd, mask, cookie and length of the name that follows
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class FileWatcher():
+    def __init__(
+            self,
+            root: tk.Tk,
+            file_dirs: Iterable[str],
+            on_change: Callable[[], None],
+            is_busy: Callable[[], bool],
+            poll_interval: int,
+            settle_delay: int) -> None:
+        """
+        Parameters
+        ----------
+        root : tk.Tk
+            Main window, used for timers and file handlers
+        file_dirs : Iterable[str]
+            Paths of the files to watch. They don't have to exist
+        on_change : Callable[[], None]
+            Called on the Tk thread after another program changed the
+            files
+        is_busy : Callable[[], bool]
+            Returns True while the app itself is writing the files.
+            Checks are put off until it returns False
+        poll_interval : int
+            Milliseconds between checks when inotify isn't used
+        settle_delay : int
+            Milliseconds the files have to stay unchanged before they
+            are checked
+        """
+
+        self.root = root
+        self.file_dirs: list = [os.path.abspath(path) for path in file_dirs]
+        self.on_change = on_change
+        self.is_busy = is_busy
+        self.poll_interval = poll_interval
+        self.settle_delay = settle_delay
+
+        self.file_names: set = {
+            os.path.basename(file_dir) for file_dir in self.file_dirs
+        }
+
+        # Written by acknowledge, which may run on the autosave thread
+        self.known_signatures: tuple = ()
+        self.signatures_lock = threading.Lock()
+
+        self.inotify_fd: Union[int, None] = None
+        self.poll_timer_id: Union[str, None] = None
+        self.check_timer_id: Union[str, None] = None
+
+    @staticmethod
+    def signature(file_dir: str) -> Union[tuple, None]:
+        try:
+            file_stat: os.stat_result = os.stat(file_dir)
+        except OSError:
+            return None
+
+        return (file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns)
+
+    def signatures(self) -> tuple:
+        return tuple(self.signature(file_dir) for file_dir in self.file_dirs)
+
+    def acknowledge(self) -> None:
+        """
+        Records the current state of the files as written by the app,
+        so the change isn't reported. Called after every save, from the
+        thread that saved
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        signatures: tuple = self.signatures()
+
+        with self.signatures_lock:
+            self.known_signatures = signatures
+
+    def has_unseen_changes(self) -> bool:
+        signatures: tuple = self.signatures()
+
+        with self.signatures_lock:
+            return signatures != self.known_signatures
+
+    def start(self) -> None:
+        """
+        Starts watching. The files as they are now count as known
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        self.acknowledge()
+
+        if not self.start_inotify():
+            self.poll_timer_id = self.root.after(self.poll_interval, self.poll)
+
+    def start_inotify(self) -> bool:
+        """
+        Watches the directories of the files with inotify, and lets Tk
+        call on_inotify_event when events arrive
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        started : bool
+            False if inotify isn't available, in which case the files
+            have to be polled
+        """
+
+        if not sys.platform.startswith("linux"):
+            return False
+
+        try:
+            import ctypes
+
+            libc = ctypes.CDLL(None, use_errno=True)
+            inotify_fd: int = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return False
+
+        if inotify_fd < 0:
+            return False
+
+        directories: set = {
+            os.path.dirname(file_dir) for file_dir in self.file_dirs
+        }
+
+        try:
+            for directory in directories:
+                if libc.inotify_add_watch(
+                        inotify_fd, os.fsencode(directory), WATCH_MASK) < 0:
+                    raise OSError(ctypes.get_errno(), "inotify_add_watch")
+
+            self.root.tk.createfilehandler(
+                inotify_fd, tk.READABLE, self.on_inotify_event
+            )
+        except (OSError, AttributeError, tk.TclError, RuntimeError):
+            os.close(inotify_fd)
+            return False
+
+        self.inotify_fd = inotify_fd
+
+        return True
+
+    def on_inotify_event(self, inotify_fd: int, mask: int) -> None:
+        """
+        Reads waiting inotify events, schedules a check if one of them
+        is about a watched file
+
+        Parameters
+        ----------
+        inotify_fd : int
+            inotify file descriptor
+        mask : int
+            Tk file handler mask, not used
+
+        Returns
+        ----------
+        None
+        """
+
+        try:
+            events: bytes = os.read(inotify_fd, 65536)
+        except BlockingIOError:
+            return
+
+        position: int = 0
+        watched_file_changed: bool = False
+
+        while position + INOTIFY_EVENT.size <= len(events):
+            _, _, _, name_length = INOTIFY_EVENT.unpack_from(events, position)
+            position += INOTIFY_EVENT.size
+
+            file_name: str = os.fsdecode(
+                events[position:position + name_length].rstrip(b"\0")
+            )
+            position += name_length
+
+            if file_name in self.file_names:
+                watched_file_changed = True
+
+        if watched_file_changed:
+            self.schedule_check()
+
+    def poll(self) -> None:
+        self.poll_timer_id = self.root.after(self.poll_interval, self.poll)
+
+        if self.check_timer_id is None:
+            self.check()
+
+    def schedule_check(self) -> None:
+        if self.check_timer_id is not None:
+            self.root.after_cancel(self.check_timer_id)
+
+        self.check_timer_id = self.root.after(self.settle_delay, self.check)
+
+    def check(self) -> None:
+        """
+        Calls on_change if the files differ from what the app last
+        wrote or saw. Put off while the app is writing them
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        self.check_timer_id = None
+
+        if self.is_busy():
+            self.schedule_check()
+            return
+
+        signatures: tuple = self.signatures()
+
+        with self.signatures_lock:
+            if signatures == self.known_signatures:
+                return
+
+            self.known_signatures = signatures
+
+        self.on_change()
+
+    def close(self) -> None:
+        for timer_id in (self.poll_timer_id, self.check_timer_id):
+            if timer_id is not None:
+                self.root.after_cancel(timer_id)
+
+        self.poll_timer_id = None
+        self.check_timer_id = None
+
+        if self.inotify_fd is not None:
+            self.root.tk.deletefilehandler(self.inotify_fd)
+            os.close(self.inotify_fd)
+            self.inotify_fd = None
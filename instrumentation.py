@@ -0,0 +1,258 @@
+"""
+Opt-in timing of event handlers and storage calls.
+
+Instrumentation wraps functions so every call is timed, and keeps one
+latency histogram per function. Histograms use buckets whose bounds
+grow by a fixed ratio, so memory use doesn't grow with the number of
+calls and percentiles are accurate to within the bucket ratio. Gauges
+read counts like the number of live widgets when metrics are taken.
+Metrics can be written to a JSON file at any time.
+"""
+
+import math
+import time
+import json
+import functools
+import threading
+
+from task_journal import write_file_atomically
+from typing import Callable, Iterable, Union
+
+# Each histogram bucket's upper bound is this many times the previous
+# one, so percentiles are off by at most 5%
+BUCKET_RATIO: float = 1.05
+
+# Durations are counted in microseconds, shorter ones fall in the first
+# bucket
+MIN_DURATION: float = 1e-6
+
+
+class LatencyHistogram():
+    def __init__(self) -> None:
+        self.bucket_counts: dict = {}
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+
+    def record(self, duration: float) -> None:
+        """
+        Adds one measured duration
+
+        Parameters
+        ----------
+        duration : float
+            Duration in seconds
+
+        Returns
+        ----------
+        None
+        """
+
+        bucket: int = 0
+        if duration > MIN_DURATION:
+            bucket = math.ceil(
+                math.log(duration / MIN_DURATION, BUCKET_RATIO)
+            )
+
+        self.bucket_counts[bucket] = self.bucket_counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Returns the duration that the given percentage of recorded
+        durations don't exceed
+
+        Parameters
+        ----------
+        percent : float
+            Percentage between 0 and 100
+
+        Returns
+        ----------
+        duration : float
+            Upper bound of the bucket the percentile falls in, in
+            seconds, but at most the longest recorded duration. 0.0 if
+            nothing was recorded
+        """
+
+        rank: float = self.count * percent / 100
+        seen_count: int = 0
+
+        for bucket in sorted(self.bucket_counts):
+            seen_count += self.bucket_counts[bucket]
+
+            if seen_count >= rank:
+                return min(MIN_DURATION * BUCKET_RATIO ** bucket, self.max)
+
+        return self.max
+
+    def summary(self) -> dict:
+        """
+        Returns the number of calls and their latencies in milliseconds
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        summary : dict
+            count, total_ms, mean_ms, p50_ms, p95_ms, p99_ms and max_ms
+        """
+
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total * 1000 / max(self.count, 1), 3),
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p95_ms": round(self.percentile(95) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3)
+        }
+
+
+class Instrumentation():
+    """
+    Latency histograms of timed functions and gauges read on demand.
+    Timed functions may be called from any thread.
+    """
+
+    def __init__(self, dump_dir: str) -> None:
+        """
+        Parameters
+        ----------
+        dump_dir : str
+            Path of the JSON file dump writes metrics to
+        """
+
+        self.dump_dir = dump_dir
+        self.started: float = time.time()
+
+        self.histograms: dict = {}
+        self.histograms_lock = threading.Lock()
+        self.gauges: dict = {}
+
+    def record(self, name: str, duration: float) -> None:
+        with self.histograms_lock:
+            histogram: Union[LatencyHistogram, None] = (
+                self.histograms.get(name)
+            )
+
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+
+            histogram.record(duration)
+
+    def timed(self, name: str, function: Callable) -> Callable:
+        """
+        Returns a function that calls the given function and records
+        how long the call took, also if it raised an exception
+
+        Parameters
+        ----------
+        name : str
+            Name the durations are recorded under
+        function : Callable
+            Function to time
+
+        Returns
+        ----------
+        timed_function : Callable
+            Function that takes the same arguments
+        """
+
+        @functools.wraps(function)
+        def timed_function(*args, **kwargs):
+            started: float = time.perf_counter()
+
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - started)
+
+        return timed_function
+
+    def instrument(
+            self,
+            target: object,
+            method_names: Iterable[str],
+            prefix: str = "") -> None:
+        """
+        Replaces methods of an object with timed versions. Has to be
+        done before the methods are given to Tk as callbacks
+
+        Parameters
+        ----------
+        target : object
+            Object whose methods are timed
+        method_names : Iterable[str]
+            Names of the methods
+        prefix : str, default: ""
+            Added before method names in metric names
+
+        Returns
+        ----------
+        None
+        """
+
+        for method_name in method_names:
+            setattr(
+                target, method_name,
+                self.timed(f"{prefix}{method_name}",
+                           getattr(target, method_name))
+            )
+
+    def add_gauge(self, name: str, read: Callable[[], object]) -> None:
+        self.gauges[name] = read
+
+    def metrics(self) -> dict:
+        """
+        Returns latency summaries of timed functions and current values
+        of gauges
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        metrics : dict
+            Dictionary that can be written as JSON
+        """
+
+        with self.histograms_lock:
+            latencies: dict = {
+                name: histogram.summary()
+                for name, histogram in sorted(self.histograms.items())
+            }
+
+        return {
+            "uptime_s": round(time.time() - self.started, 3),
+            "gauges": {name: read() for name, read in self.gauges.items()},
+            "latencies": latencies
+        }
+
+    def dump(self, event: Union[object, None] = None) -> None:
+        """
+        Writes metrics to the dump file, replacing it
+
+        Parameters
+        ----------
+        event : tk.Event or None, default: None
+            Key press event when bound to a hotkey, not used
+
+        Returns
+        ----------
+        None
+        """
+
+        metrics: dict = self.metrics()
+
+        write_file_atomically(
+            file_dir=self.dump_dir,
+            write_contents=lambda dump_file: json.dump(
+                obj=metrics, fp=dump_file, indent=2
+            )
+        )
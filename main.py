@@ -76,15 +76,54 @@ Style Guide n.d., numpydoc maintainers, accessed 11 October 2024,
 <https://numpydoc.readthedocs.io/en/latest/format.html#sections>
 """
 
+import time
+
+imports_started: float = time.perf_counter()
+
 import os
-import json
-import yaml
+import sys
+import pickle
+import logging
+import argparse
 import datetime
 import tkinter as tk
 
-from tkcalendar import DateEntry
+from autosave import Autosaver
+from deadline_index import DeadlineIndex, DeadlineRange
+from file_watcher import FileWatcher
+from instrumentation import Instrumentation
+from recurrence import (
+    RecurrenceRule, RecurrenceStore, RecurringRange
+)
+from reminders import ReminderScheduler
+from search_index import TaskNameIndex
+from stall_watchdog import StallWatchdog
+from style_registry import StyleRegistry
+from task_archive import TaskArchive
+from task_cli import validate_task
+from task_storage import SaveConflictError, create_task_storage
+from task_store import Task, TaskStore
+from task_list_view import VirtualTaskList
+from undo_history import UndoHistory
 from tkinter import messagebox
-from typing import Union
+from typing import Callable, Iterable, Iterator, Sequence, Union
+
+imports_finished: float = time.perf_counter()
+
+# Methods timed when instrumentation is enabled: event handlers and the
+# functions that load and save tasks
+INSTRUMENTED_METHODS: tuple = (
+    "save_tasks", "on_task_changed", "prepare_save", "load_task_batch",
+    "replay_journal", "change_view_mode", "run_search",
+    "update_shown_tasks", "open_task_create_window", "add_task",
+    "checkbutton_function", "open_edit_task_window", "edit_task",
+    "delete_task_frame", "select_all_tasks", "set_selected_tasks_completed",
+    "delete_selected_tasks", "purge_completed_tasks", "show_reminder",
+    "reload_task_batch", "undo", "redo", "archive_old_tasks",
+    "read_archive_batch"
+)
+
+logger = logging.getLogger(__name__)
 
 def parse_yaml_file(yaml_dir: str) -> dict:
     """
@@ -100,27 +139,298 @@ def parse_yaml_file(yaml_dir: str) -> dict:
     resulting_dict : dict
         Dictionary that includes content of YAML file
     """
+
+    import yaml
     
     with open(yaml_dir, "r") as yaml_file:
         resulting_dict: dict = yaml.safe_load(yaml_file)
 
     return resulting_dict
 
+def load_config(yaml_dir: str, cache_dir: str) -> tuple:
+    """
+    Returns content of the YAML config file. The parsed config is 
+    cached in a binary file together with the YAML file's modification 
+    time and size, and the cache is used as long as they don't change,
+    so the YAML file (and the yaml module) is only needed after the
+    config has been edited
+
+    Parameters
+    ----------
+    yaml_dir : str
+        Path of YAML file to read
+    cache_dir : str
+        Path of cache file. Failing to write it is not an error
+
+    Returns
+    ----------
+    config_dict : dict
+        Dictionary that includes content of YAML file
+    from_cache : bool
+        True if the config was read from the cache
+    """
+
+    yaml_stat: os.stat_result = os.stat(yaml_dir)
+    yaml_version: tuple = (yaml_stat.st_mtime_ns, yaml_stat.st_size)
+
+    try:
+        with open(cache_dir, "rb") as cache_file:
+            cached_version, config_dict = pickle.load(cache_file)
+
+        if cached_version == yaml_version:
+            return config_dict, True
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        pass
+
+    config_dict: dict = parse_yaml_file(yaml_dir)
+
+    try:
+        os.makedirs(os.path.dirname(cache_dir), exist_ok=True)
+        temporary_dir: str = f"{cache_dir}.{os.getpid()}.tmp"
+
+        with open(temporary_dir, "wb") as cache_file:
+            pickle.dump((yaml_version, config_dict), cache_file)
+
+        os.replace(temporary_dir, cache_dir)
+    except OSError:
+        pass
+
+    return config_dict, False
+
 class TODO_App_GUI():
-    def __init__(self) -> None:
+    def __init__(self, startup_profile: bool = False) -> None:
+        self.startup_profile = startup_profile
+        self.startup_timings: dict = {
+            "imports": imports_finished - imports_started
+        }
+
+        stage_started: float = time.perf_counter()
+
         current_dir = os.path.dirname(__file__)
         yaml_dir = os.path.join(current_dir, "todo_app_config.yaml")
-        self.config_dict = parse_yaml_file(yaml_dir)
+        self.config_dict, config_from_cache = load_config(
+            yaml_dir=yaml_dir,
+            cache_dir=os.path.join(
+                current_dir, "__pycache__", "todo_app_config.cache"
+            )
+        )
+
+        self.startup_timings["config (cached)" if config_from_cache 
+                             else "config (parsed)"] = (
+            time.perf_counter() - stage_started
+        )
 
-        save_filename: str = "saved_tasks.json"
-        self.json_dir = os.path.join(current_dir, save_filename)
+        self.instrumentation: Union[Instrumentation, None] = None
+        if (self.config_dict["instrumentation"]["enabled"]
+                or os.environ.get("TODO_INSTRUMENTATION", "0") != "0"):
+            self.instrumentation = Instrumentation(
+                dump_dir=os.path.join(
+                    current_dir,
+                    self.config_dict["instrumentation"]["dump_filename"]
+                )
+            )
+            self.instrumentation.instrument(
+                target=self, method_names=INSTRUMENTED_METHODS
+            )
+
+        self.task_store = TaskStore(
+            task_storage=create_task_storage(
+                config_dict=self.config_dict, current_dir=current_dir
+            )
+        )
+        self.task_store.add_listener(self.on_task_changed)
+
+        self.deadline_index = DeadlineIndex()
+        self.name_index = TaskNameIndex()
+
+        if self.instrumentation is not None:
+            self.instrumentation.instrument(
+                target=self.task_store.task_storage,
+                method_names=("save",),
+                prefix="storage."
+            )
+
+            for component_name in ("deadline_index", "name_index"):
+                self.instrumentation.instrument(
+                    target=getattr(self, component_name),
+                    method_names=("on_task_changed",),
+                    prefix=f"{component_name}."
+                )
+
+        self.task_store.add_listener(self.deadline_index.on_task_changed)
+        self.task_store.add_listener(self.name_index.on_task_changed)
+
+        self.recurrences = RecurrenceStore(
+            rules_dir=os.path.join(
+                current_dir,
+                self.config_dict["storage"]["recurrence_filename"]
+            )
+        )
+        self.recurrences.load()
+
+        self.undo_history = UndoHistory(
+            task_store=self.task_store,
+            max_depth=self.config_dict["undo"]["max_depth"],
+            recurrences=self.recurrences
+        )
+        self.task_store.add_listener(self.undo_history.on_task_changed)
+        self.recurrences.add_listener(self.undo_history.on_rules_changed)
+
+        self.task_store.add_listener(self.recurrences.on_task_changed)
+        self.recurrences.add_listener(self.on_recurrences_changed)
 
-        self.tasks_list: list = []
+        # Read only while the archive view is shown
+        self.archive = TaskArchive(
+            archive_dir=os.path.join(
+                current_dir, self.config_dict["storage"]["archive_filename"]
+            )
+        )
+        self.reading_archive: Union[Iterator[dict], None] = None
+        self.archive_read_timer_id: Union[str, None] = None
+        self.archived_tasks: list = []
+        self.archived_task_positions: dict = {}
+
+        self.search_query: str = ""
+        self.search_matches: Union[set, None] = None
+        self.search_timer_id: Union[str, None] = None
+
+        self.tasks_in_order: list = []
+        self.view_mode: str = "all"
+        # Range of the current view that generated the occurrences it
+        # shows, also while search results of it are shown
+        self.recurring_range: Union[RecurringRange, None] = None
+
+        self.loading_tasks: Union[Iterator[dict], None] = None
+
+        self.reloading_tasks: Union[Iterator[dict], None] = None
+        self.reloaded_tasks: list = []
+        self.reload_pending: bool = False
+        self.changed_while_reloading: set = set()
+
+        self.task_creation_window: Union[tk.Toplevel, None] = None
+        self.task_edit_window: Union[tk.Toplevel, None] = None
+        self.edited_task_id: Union[str, None] = None
+        self.reminder_window: Union[tk.Toplevel, None] = None
+        self.reminded_task_names: list = []
+
+        stage_started = time.perf_counter()
 
         self.root = tk.Tk()
+        self.styles = StyleRegistry(
+            root=self.root, config_dict=self.config_dict
+        )
+
+        self.autosaver = Autosaver(
+            root=self.root,
+            prepare_save=self.prepare_save,
+            on_save_error=self.show_save_error,
+            delay=self.config_dict["autosave"]["delay"],
+            max_delay=self.config_dict["autosave"]["max_delay"]
+        )
+
+        self.reminders: Union[ReminderScheduler, None] = None
+        if self.config_dict["reminders"]["enabled"]:
+            self.reminders = ReminderScheduler(
+                root=self.root,
+                on_due=self.show_reminder,
+                reminder_time=datetime.datetime.strptime(
+                    self.config_dict["reminders"]["time"], "%H:%M"
+                ).time()
+            )
+
+            if self.instrumentation is not None:
+                self.instrumentation.instrument(
+                    target=self.reminders, method_names=("on_task_changed",),
+                    prefix="reminders."
+                )
+
+            self.task_store.add_listener(self.reminders.on_task_changed)
+
+        self.stall_watchdog: Union[StallWatchdog, None] = None
+        if self.config_dict["stall_watchdog"]["enabled"]:
+            self.stall_watchdog = StallWatchdog(
+                root=self.root,
+                heartbeat_interval=self.config_dict["stall_watchdog"][
+                    "heartbeat_interval"],
+                stall_threshold=self.config_dict["stall_watchdog"][
+                    "stall_threshold"],
+                on_stall_end=self.record_stall
+            )
+
+            if self.config_dict["stall_watchdog"]["log_filename"]:
+                stall_log_handler = logging.FileHandler(
+                    filename=os.path.join(
+                        current_dir,
+                        self.config_dict["stall_watchdog"]["log_filename"]
+                    ),
+                    delay=True
+                )
+                stall_log_handler.setFormatter(
+                    logging.Formatter("%(asctime)s %(message)s")
+                )
+                logging.getLogger("stall_watchdog").addHandler(
+                    stall_log_handler
+                )
+
+        self.file_watcher: Union[FileWatcher, None] = None
+        watched_files: list = self.task_store.task_storage.watched_files()
+        if self.config_dict["file_watcher"]["enabled"] and watched_files:
+            self.file_watcher = FileWatcher(
+                root=self.root,
+                file_dirs=watched_files + [self.recurrences.rules_dir],
+                on_change=self.reload_stored_tasks,
+                is_busy=lambda: self.autosaver.saves_in_progress > 0,
+                poll_interval=self.config_dict["file_watcher"][
+                    "poll_interval"],
+                settle_delay=self.config_dict["file_watcher"]["settle_delay"]
+            )
+
+        # Started once tasks are loaded, see load_task_batch
+        self.rpc_server = None
+        self.rpc_deleted_tasks: list = []
+        self.rpc_changed_tasks: bool = False
+        if self.config_dict["rpc_server"]["enabled"]:
+            # rpc_server imports asyncio, which takes longer than any
+            # other import, so it is only imported if the server is used
+            import socket
+
+            from rpc_server import RpcServer
+
+            rpc_config: dict = self.config_dict["rpc_server"]
+            rpc_address: Union[str, tuple] = (
+                rpc_config["host"], rpc_config["port"]
+            )
+            if rpc_config["socket_filename"] and hasattr(socket, "AF_UNIX"):
+                rpc_address = os.path.join(
+                    current_dir, rpc_config["socket_filename"]
+                )
+
+            self.rpc_server = RpcServer(
+                root=self.root,
+                methods={
+                    "add_tasks": self.rpc_add_tasks,
+                    "edit_tasks": self.rpc_edit_tasks,
+                    "complete_tasks": self.rpc_complete_tasks,
+                    "delete_tasks": self.rpc_delete_tasks,
+                    "query_tasks": self.rpc_query_tasks
+                },
+                on_drained=self.finish_rpc_drain,
+                address=rpc_address,
+                drain_time_budget=rpc_config["drain_time_budget"],
+                poll_interval=rpc_config["poll_interval"],
+                max_request_size=rpc_config["max_request_size"]
+            )
 
         self.init_gui()
 
+        if self.instrumentation is not None:
+            self.add_instrumentation_gauges()
+
+        self.startup_timings["tk init"] = time.perf_counter() - stage_started
+
+        if self.file_watcher is not None:
+            self.file_watcher.start()
+
         self.load_tasks()
 
     def init_gui(self) -> None:
@@ -140,53 +450,194 @@ class TODO_App_GUI():
         self.root.geometry(self.config_dict["geometry"])
         self.root.title(self.config_dict["window_names"]["main_window"])
 
-        upperside_frame = tk.Frame(
-            master=self.root, 
-            bg=self.config_dict["bg_color"]["frame_bg_1"],
-            name="upperside_frame"
+        upperside_frame = self.styles.style(
+            tk.Frame(
+                master=self.root,
+                name="upperside_frame"
+            ),
+            bg="frame_bg_1"
         )
         upperside_frame.pack(fill=tk.X, side=tk.TOP)
     
-        create_task_frame = tk.Frame(
-            master=upperside_frame, 
-            bg=self.config_dict["bg_color"]["frame_bg_1"],
-            name="create_task_frame"
+        create_task_frame = self.styles.style(
+            tk.Frame(
+                master=upperside_frame,
+                name="create_task_frame"
+            ),
+            bg="frame_bg_1"
         )
         create_task_frame.pack(fill=tk.NONE, anchor=tk.CENTER, ipady=10)
     
-        create_task_button = tk.Button(
-            master=create_task_frame, 
-            bg=self.config_dict["bg_color"]["button_bg"], 
-            relief=tk.FLAT, 
-            text=self.config_dict["button_texts"]["create_task_button"],
-            command=self.open_task_create_window,
-            name="create_task_button"
+        create_task_button = self.styles.style(
+            tk.Button(
+                master=create_task_frame,
+                relief=tk.FLAT,
+                text=self.config_dict["button_texts"]["create_task_button"],
+                command=self.open_task_create_window,
+                name="create_task_button"
+            ),
+            bg="button_bg", fg="primary"
         )
         create_task_button.pack(fill=tk.NONE, side=tk.LEFT, padx=10)
 
-        save_tasks_button = tk.Button(
-            master=create_task_frame,
-            bg=self.config_dict["bg_color"]["button_bg"],
-            relief=tk.FLAT,
-            text=self.config_dict["button_texts"]["save_tasks_button"],
-            command=self.save_tasks,
-            name="save_tasks_button"
+        save_tasks_button = self.styles.style(
+            tk.Button(
+                master=create_task_frame,
+                relief=tk.FLAT,
+                text=self.config_dict["button_texts"]["save_tasks_button"],
+                command=self.save_tasks,
+                name="save_tasks_button"
+            ),
+            bg="button_bg", fg="primary"
         )
         save_tasks_button.pack(fill=tk.NONE, side=tk.LEFT, padx=10)
+
+        self.view_mode_var = tk.StringVar(
+            master=self.root, value=self.config_dict["view_names"]["all"]
+        )
+        self.view_mode_menu = tk.OptionMenu(
+            create_task_frame,
+            self.view_mode_var,
+            *self.config_dict["view_names"].values(),
+            command=self.change_view_mode
+        )
+        self.view_mode_menu.config(
+            relief=tk.FLAT,
+            highlightthickness=0,
+            state=tk.DISABLED
+        )
+        self.styles.style(self.view_mode_menu, bg="button_bg", fg="primary")
+        self.view_mode_menu.pack(fill=tk.NONE, side=tk.LEFT, padx=10)
+
+        if len(self.styles.theme_names()) > 1:
+            self.theme_var = tk.StringVar(
+                master=self.root, value=self.styles.theme_name
+            )
+            theme_menu = tk.OptionMenu(
+                create_task_frame,
+                self.theme_var,
+                *self.styles.theme_names(),
+                command=self.styles.set_theme
+            )
+            theme_menu.config(relief=tk.FLAT, highlightthickness=0)
+            self.styles.style(theme_menu, bg="button_bg", fg="primary")
+            theme_menu.pack(fill=tk.NONE, side=tk.LEFT, padx=10)
+
+        search_frame = self.styles.style(
+            tk.Frame(
+                master=upperside_frame,
+                name="search_frame"
+            ),
+            bg="frame_bg_1"
+        )
+        search_frame.pack(fill=tk.NONE, anchor=tk.CENTER, pady=(0, 10))
+
+        search_label = self.styles.style(
+            tk.Label(
+                master=search_frame,
+                text=self.config_dict["label_texts"]["search_label"],
+                name="search_label"
+            ),
+            bg="frame_bg_1", fg="inverted"
+        )
+        search_label.pack(fill=tk.NONE, side=tk.LEFT, padx=5)
+
+        self.search_var = tk.StringVar(master=self.root)
+        self.search_var.trace_add("write", self.schedule_search)
+        self.search_entry = self.styles.style(
+            tk.Entry(
+                master=search_frame,
+                relief=tk.FLAT,
+                textvariable=self.search_var,
+                state=tk.DISABLED,
+                name="search_entry"
+            ),
+            bg="entry_bg", fg="primary"
+        )
+        self.search_entry.pack(fill=tk.NONE, side=tk.LEFT, padx=5)
+
+        bulk_actions_frame = self.styles.style(
+            tk.Frame(
+                master=upperside_frame,
+                name="bulk_actions_frame"
+            ),
+            bg="frame_bg_1"
+        )
+        bulk_actions_frame.pack(fill=tk.NONE, anchor=tk.CENTER, pady=(0, 10))
+
+        for button_name, command in (
+                ("select_all_button", self.select_all_tasks),
+                ("complete_selected_button",
+                 lambda: self.set_selected_tasks_completed(completed=True)),
+                ("uncomplete_selected_button",
+                 lambda: self.set_selected_tasks_completed(completed=False)),
+                ("delete_selected_button", self.delete_selected_tasks),
+                ("purge_completed_button", self.purge_completed_tasks)):
+            bulk_action_button = self.styles.style(
+                tk.Button(
+                    master=bulk_actions_frame,
+                    relief=tk.FLAT,
+                    text=self.config_dict["button_texts"][button_name],
+                    command=command,
+                    name=button_name
+                ),
+                bg="button_bg", fg="primary"
+            )
+            bulk_action_button.pack(fill=tk.NONE, side=tk.LEFT, padx=5)
+
+        self.loading_label = self.styles.style(
+            tk.Label(
+                master=create_task_frame,
+                name="loading_label"
+            ),
+            bg="frame_bg_1", fg="inverted"
+        )
     
-        self.downside_frame = tk.Frame(
-            master=self.root, 
-            bg=self.config_dict["bg_color"]["frame_bg_3"],
-            name="downside_frame"
+        self.downside_frame = self.styles.style(
+            tk.Frame(
+                master=self.root,
+                name="downside_frame"
+            ),
+            bg="frame_bg_3"
         )
         self.downside_frame.pack(fill=tk.BOTH, side=tk.TOP, expand=True)
 
+        self.task_list_view = VirtualTaskList(
+            master=self.downside_frame,
+            config_dict=self.config_dict,
+            styles=self.styles,
+            on_toggle=self.checkbutton_function,
+            on_edit=self.open_edit_task_window,
+            on_delete=self.delete_task_frame
+        )
+        self.task_list_view.pack(
+            fill=tk.BOTH, side=tk.TOP, expand=True, pady=3
+        )
+
         self.root.bind("<Key-Return>", self.open_task_create_window)
         self.root.bind("<Control-Key-S>", self.save_tasks)
+        self.root.bind("<Control-Key-z>", self.undo)
+        self.root.bind("<Control-Key-y>", self.redo)
+        self.root.bind("<Control-Key-a>", self.select_all_tasks)
+        for sequence, step in (("<Control-Key-plus>", 1),
+                               ("<Control-Key-equal>", 1),
+                               ("<Control-Key-minus>", -1),
+                               ("<Control-Key-0>", 0)):
+            self.root.bind(
+                sequence,
+                lambda event, step=step: self.styles.change_font_size(step)
+            )
+        self.root.bind(
+            "<Key-Escape>", 
+            lambda event: self.task_list_view.clear_selection()
+        )
+        self.root.protocol("WM_DELETE_WINDOW", self.close_window)
 
     def save_tasks(self, event: Union[tk.Event, None] = None) -> None:
         """
-        Saves tasks in tasks list to a JSON file
+        Saves changes made to tasks since the last save right away,
+        without waiting for autosave. Saving runs on the autosave 
+        thread
 
         Parameters
         ----------
@@ -198,530 +649,2322 @@ class TODO_App_GUI():
         ----------
         None
         """
-        
-        with open(self.json_dir, "w") as json_savefile:
-            json.dump(obj=self.tasks_list, fp=json_savefile, indent=2)
 
-    def load_tasks(self) -> None:
+        self.autosaver.save_now()
+
+    def on_task_changed(
+            self,
+            operation: str,
+            tasks: list,
+            previous_states: list) -> None:
         """
-        Loads tasks from JSON file, creates task frames for each task
+        Lets autosave know that there are unsaved changes. Called by 
+        the task store after every change, once for a batch of changes
 
         Parameters
         ----------
-        None
+        operation : str
+            "add", "edit", "toggle" or "delete"
+        tasks : list
+            Changed tasks
+        previous_states : list
+            Tasks' states before the change, None for added tasks
 
         Returns
         ----------
         None
         """
-        
-        with open(self.json_dir, "r") as json_file:
-            self.tasks_list: list = json.load(fp=json_file)
 
-        for task in self.tasks_list:
-            deadline: datetime.date = datetime.datetime.strptime(
-                task.get("deadline"), "%d-%m-%Y")
-            
-            task_frame = self.create_task_frame(
-                root=self.downside_frame, 
-                task_name=task.get("task_name"),
-                deadline=deadline,
-                task_completed=task.get("completed"),
-                bg=self.config_dict["bg_color"]["frame_bg_2"])
+        if self.reloading_tasks is not None:
+            self.changed_while_reloading.update(
+                task.task_id for task in tasks
+            )
 
-            task_frame.pack(fill=tk.X, side=tk.TOP, padx=6, pady=3)
+        if self.config_dict["autosave"]["enabled"]:
+            self.autosaver.mark_dirty()
 
-    def open_task_create_window(
-            self, 
-            event: Union[tk.Event, None] = None) -> None:
+    def on_recurrences_changed(
+            self,
+            task_ids: list,
+            previous_states: Union[list, None]) -> None:
         """
-        Opens a separate window for user to enter task name and deadline
-        of a task they want to create
+        Schedules a save after recurrence rules changed. Finishing a
+        generated occurrence only changes the rules, so it isn't seen
+        by on_task_changed
 
         Parameters
         ----------
-        event : tk.Event or None, default: None
-            A key press event that lets a user saving tasks with a 
-            keyboard shortcut. Default is None
+        task_ids : list
+            IDs of the tasks whose rules changed
+        previous_states : list or None
+            Rules' states before the change, unused
 
         Returns
         ----------
         None
         """
-        
-        self.task_creation_window = tk.Toplevel(
-            master=self.root, 
-            bg=self.config_dict["bg_color"]["frame_bg_3"],
-            name="task_creation_window"
-        )
-        self.task_creation_window.geometry("300x250")
-        self.task_creation_window.title(
-            self.config_dict["window_names"]["task_create_window"]
-        )
 
-        task_data_frame = tk.Frame(
-            master=self.task_creation_window,
-            bg=self.config_dict["bg_color"]["frame_bg_3"],
-            name="task_data_frame"
-        )
-        task_data_frame.pack(fill=tk.BOTH, side=tk.TOP, expand=True)
+        if self.config_dict["autosave"]["enabled"]:
+            self.autosaver.mark_dirty()
 
-        create_task_button_frame = tk.Frame(
-            master=self.task_creation_window,
-            bg=self.config_dict["bg_color"]["frame_bg_3"],
-            name="create_task_button_frame"
-        )
-        create_task_button_frame.pack(fill=tk.BOTH, side=tk.TOP, expand=True)
+    def prepare_save(self) -> Union[Callable[[], None], None]:
+        """
+        Takes the changes made since the last save, returns a function
+        that saves them to the storage backend chosen in the YAML file.
+        The JSON backend appends them to the journal file, the SQLite
+        backend writes them in one transaction. All tasks are written
+        instead if the backend needs compaction or loaded tasks were 
+        given new IDs. Changed recurrence rules are written to their
+        own file first. While tasks are loading, or another program has
+        changed stored tasks and they haven't been reloaded yet, only
+        changes are saved, so the changes of the other program aren't
+        overwritten
 
-        self.task_name_var = tk.StringVar(name="task_name")
-        create_task_entry = tk.Entry(
-            master=task_data_frame, 
-            bg=self.config_dict["bg_color"]["entry_bg"], 
-            relief=tk.FLAT,
-            textvariable=self.task_name_var,
-            name="create_task_entry"
-        )
-        create_task_entry.pack(fill=tk.NONE, side=tk.LEFT, padx=10)
+        Parameters
+        ----------
+        None
 
-        self.create_task_date = DateEntry(
-            master=task_data_frame,
-            bg=self.config_dict["bg_color"]["entry_bg"],
-            name="create_task_date"
+        Returns
+        ----------
+        save_job : Callable[[], None] or None
+            Function that the autosave thread calls to save, or None 
+            if there's nothing to save
+        """
+
+        save_job: Union[Callable[[], None], None] = (
+            self.task_store.prepare_save(
+                allow_full_rewrite=(
+                    self.loading_tasks is None
+                    and self.reloading_tasks is None
+                    and (self.file_watcher is None
+                         or not self.file_watcher.has_unseen_changes())
+                )
+            )
         )
-        self.create_task_date.pack(fill=tk.NONE, side=tk.LEFT, padx=10)
 
-        create_task_button = tk.Button(
-            master=create_task_button_frame, 
-            bg=self.config_dict["bg_color"]["button_bg"], 
-            relief=tk.FLAT, 
-            text=self.config_dict["button_texts"]["create_task_button"],
-            command=self.add_task,
-            name="create_task_button"
+        recurrence_save_job: Union[Callable[[], bool], None] = (
+            self.recurrences.prepare_save()
         )
-        create_task_button.pack(fill=tk.NONE, side=tk.TOP, padx=10)
 
-        create_task_entry.focus()
+        if recurrence_save_job is None and (
+                save_job is None or self.file_watcher is None):
+            return save_job
 
-        self.task_creation_window.bind(
-            sequence="<Key-Return>", func=self.add_task
-        )
+        def save_and_acknowledge() -> None:
+            changed_elsewhere: bool = False
 
-    def add_task(self, event: Union[tk.Event, None] = None) -> None:
+            if recurrence_save_job is not None:
+                changed_elsewhere = recurrence_save_job()
+
+            if save_job is not None:
+                changed_elsewhere = save_job() or changed_elsewhere
+
+            # If changes of another program were merged, the files stay
+            # unacknowledged so the watcher reloads them
+            if not changed_elsewhere and self.file_watcher is not None:
+                self.file_watcher.acknowledge()
+
+        return save_and_acknowledge
+
+    def show_save_error(self, error: Exception) -> None:
         """
-        Adds user entered task to tasks list, calls create_task_frame
-        function for the task, closes the task creation window
+        Tells the user that saving failed. The next save writes all 
+        tasks, so changes that couldn't be saved aren't lost. If changes
+        conflicted with another program's, the user is told which tasks
+        kept the other program's changes and tasks are reloaded
 
         Parameters
         ----------
-        event : tk.Event or None, default: None
-            A key press event that lets a user saving tasks with a 
-            keyboard shortcut. Default is None
+        error : Exception
+            Error raised while saving
 
         Returns
         ----------
         None
         """
 
-        task_name: str = self.task_name_var.get()
-        deadline: datetime.date = self.create_task_date.get_date()
-
-        if not self.is_user_input_valid(task_name=task_name, deadline=deadline):
+        if isinstance(error, SaveConflictError):
+            # The other changes were saved, tasks are reloaded to show
+            # the other program's version of the conflicted ones
+            if self.file_watcher is not None:
+                self.file_watcher.acknowledge()
+            self.reload_stored_tasks()
+
+            messagebox.showwarning(
+                title="Changes not saved",
+                message=(
+                    "Another program changed these tasks at the same "
+                    "time, its changes were kept:\n"
+                    + "\n".join(error.conflicted_task_names[:10])
+                )
+            )
             return
-            
-        task_entry: dict = {"task_name": task_name, 
-                            "deadline": deadline.strftime(format="%d-%m-%Y"),
-                            "completed": False}
-        self.tasks_list.append(task_entry)
 
-        task_frame = self.create_task_frame(
-            root=self.downside_frame, task_name=task_name,
-            deadline=deadline, bg=self.config_dict["bg_color"]["frame_bg_2"])
-        task_frame.pack(fill=tk.X, side=tk.TOP, padx=6, pady=3)
+        self.task_store.storage_outdated = True
 
-        self.task_creation_window.destroy()
+        messagebox.showerror(
+            title="Saving failed", 
+            message=f"Tasks couldn't be saved: {error}"
+        )
 
-    def create_task_frame(
-            self, 
-            root: tk.Frame, 
-            task_name: str, 
-            deadline: datetime.date,
-            bg: str,
-            task_completed: bool = False) -> tk.Frame:
+    def close_window(self) -> None:
         """
-        Opens a separate window for user to enter task name and deadline
-        of a task
+        Saves changes autosave hasn't saved yet, waits for saving to 
+        finish, closes the window
 
         Parameters
         ----------
-        root : tk.Frame
-            Parent frame for the tkinter frame created here
-        task_name : str
-            Name of task to create
-        deadline : datetime.date
-            Deadline of task to create
-        bg : str
-            Background color of tkinter frame created here
-        task_completed : bool, default: False
-            Info of whether a task is marked as finished or unfinished.
-            Important when loading tasks from JSON file
+        None
 
         Returns
         ----------
-        task_frame : tk.Frame
-            A tkinter frame that includes a checkbox, task info and
-            edit and delete buttons
+        None
         """
 
-        task_frame = tk.Frame(master=root, bg=bg)
+        if self.rpc_server is not None:
+            self.rpc_server.close()
 
-        checkbutton_variable = tk.IntVar(master=task_frame)
-        checkbutton_variable.set(1 if task_completed else 0)
+        self.stop_reading_archive()
+        self.autosaver.close()
+        self.task_store.task_storage.close()
 
-        task_finished_checkbutton = tk.Checkbutton(
-            master=task_frame, 
-            bg=self.config_dict["bg_color"]["frame_bg_2"],
-            variable=checkbutton_variable,
-            name="task_finished_checkbox"
-        )
-        task_finished_checkbutton.pack(fill=tk.NONE, side=tk.LEFT, padx=5)
+        if self.reminders is not None:
+            self.reminders.close()
 
-        task_info_frame = tk.Frame(
-            master=task_frame, 
-            bg=self.config_dict["bg_color"]["frame_bg_2"],
-            name="task_info_frame"
-        )
-        task_info_frame.pack(fill=tk.NONE, side=tk.LEFT, padx=5, ipadx=2)
+        if self.stall_watchdog is not None:
+            self.stall_watchdog.close()
 
-        task_name_label = tk.Label(
-            master=task_info_frame, 
-            bg=self.config_dict["bg_color"]["frame_bg_2"],
-            fg=self.config_dict["text_color"]["primary"], 
-            font=("Arial", 15, "bold"), text=task_name,
-            name="task_name_label"
-        )
-        task_name_label.pack(fill=tk.NONE, side=tk.TOP)
+        if self.file_watcher is not None:
+            self.file_watcher.close()
 
-        formatted_deadline: str = deadline.strftime(format="%d-%m-%Y")
-        task_deadline_label = tk.Label(
-            master=task_info_frame, 
-            bg=self.config_dict["bg_color"]["frame_bg_2"],
-            fg=self.config_dict["text_color"]["secondary"],
-            font=("Arial", 10, "normal"), text=formatted_deadline,
-            name="task_deadline_label"
-        )
-        task_deadline_label.pack(fill=tk.NONE, side=tk.TOP)
+        if self.instrumentation is not None:
+            try:
+                self.instrumentation.dump()
+            except OSError as error:
+                logger.warning("Metrics couldn't be written: %s", error)
 
-        task_buttons_frame = tk.Frame(
-            master=task_frame, 
-            bg=self.config_dict["bg_color"]["frame_bg_2"],
-            name="buttons_frame"
-        )
-        task_buttons_frame.pack(fill=tk.NONE, side=tk.RIGHT, padx=5)
+        self.root.destroy()
 
-        task_delete_button = tk.Button(
-            master=task_buttons_frame, 
-            bg=self.config_dict["bg_color"]["frame_bg_1"],
-            fg=self.config_dict["text_color"]["inverted"], 
-            font=("Arial", 12, "normal"), 
-            text=self.config_dict["button_texts"]["delete_task_button"],
-            relief=tk.FLAT,
-            command=lambda: self.delete_task_frame(
-                checkbutton_variable, task_frame, 
-                task_name_label, task_deadline_label
-            ),
-            name="delete_button"
-        )
-        task_delete_button.pack(fill=tk.NONE, side=tk.RIGHT, padx=1)
+    def add_instrumentation_gauges(self) -> None:
+        """
+        Times rendering of the task list, adds gauges for the number of
+        tasks and widgets, binds the key that writes metrics to the 
+        dump file. Called once the GUI is built if instrumentation is
+        enabled
 
-        task_edit_button = tk.Button(
-            master=task_buttons_frame, 
-            bg=self.config_dict["bg_color"]["button_bg"],
-            fg=self.config_dict["text_color"]["primary"], 
-            font=("Arial", 12, "normal"),
-            text=self.config_dict["button_texts"]["edit_task_button"],
-            relief=tk.FLAT, 
-            name="edit_button",
-            command=lambda: self.open_edit_task_window(
-                checkbutton_variable, task_name_label, task_deadline_label
-            )
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        self.instrumentation.instrument(
+            target=self.task_list_view, method_names=("refresh",),
+            prefix="task_list_view."
+        )
+        self.instrumentation.instrument(
+            target=self.task_list_view.row_pool, method_names=("create_row",),
+            prefix="task_row_pool."
         )
-        task_edit_button.pack(fill=tk.NONE, side=tk.RIGHT, padx=1)
 
-        task_finished_checkbutton.config(
-            command=lambda: self.checkbutton_function(
-                checkbutton_variable, task_name_label, task_deadline_label
-            )
+        self.instrumentation.add_gauge(
+            name="tasks", read=lambda: len(self.task_store)
+        )
+        self.instrumentation.add_gauge(
+            name="task_list_slots",
+            read=lambda: len(self.task_store.tasks_list)
+        )
+        self.instrumentation.add_gauge(
+            name="shown_tasks", read=lambda: len(self.task_list_view.tasks)
+        )
+        self.instrumentation.add_gauge(
+            name="task_rows", read=lambda: len(self.task_list_view.rows)
+        )
+        self.instrumentation.add_gauge(
+            name="task_row_pool", read=self.task_list_view.row_pool.stats
+        )
+        self.instrumentation.add_gauge(
+            name="widgets", read=self.count_widgets
         )
 
-        if task_completed:
-            task_name_label.config(
-                font=("Arial", 15, "overstrike"), 
-                fg=self.config_dict["text_color"]["secondary"]
-            )
-        else:
-            task_name_label.config(
-                font=("Arial", 15, "bold"),
-                fg=self.config_dict["text_color"]["primary"]
+        if self.stall_watchdog is not None:
+            self.instrumentation.add_gauge(
+                name="event_loop_stalls", read=self.stall_watchdog.stats
             )
 
-        return task_frame
-    
-    def checkbutton_function(
-            self, 
-            checkbutton_variable: tk.IntVar, 
-            task_name_label: tk.Label,
-            task_deadline_label: tk.Label) -> None:
+        self.root.bind(
+            self.config_dict["instrumentation"]["dump_key"],
+            self.instrumentation.dump
+        )
+
+    def record_stall(self, stall_time: float) -> None:
         """
-        Changes task name's appearance and its info in tasks list 
-        according to whether the user has checked or unchecked the
-        checkbutton
+        Adds an event loop stall to the metrics. Called by the stall 
+        watchdog once a stall has ended
 
         Parameters
         ----------
-        checkbutton_variable : tk.IntVar
-            Used to determine whether a task is marked as finished or
-            unfinished
-        task_name_label : tk.Label
-            tkinter label of task's name. Its font is changed according
-            to the checkbutton_variable's value
-        task_deadline_label : tk.Label
-            tkinter label of task's deadline. Its content is used to
-            find the task in tasks list
+        stall_time : float
+            Duration of the stall in seconds
 
         Returns
         ----------
         None
         """
 
-        if checkbutton_variable.get():
-            task_name_label.config(
-                font=("Arial", 15, "overstrike"), 
-                fg=self.config_dict["text_color"]["secondary"]
-            )
-            is_task_completed: bool = False
-        else:
-            task_name_label.config(
-                font=("Arial", 15, "bold"),
-                fg=self.config_dict["text_color"]["primary"]
+        if self.instrumentation is not None:
+            self.instrumentation.record(
+                name="event_loop_stall", duration=stall_time
             )
-            is_task_completed: bool = True
 
-        removed_task_index: int = self.remove_task_from_list(
-            task_name_label=task_name_label,
-            task_deadline_label=task_deadline_label,
-            is_task_completed=is_task_completed
-        )
-        
-        self.insert_task_to_list(
-            task_name_label=task_name_label,
-            task_deadline_label=task_deadline_label,
-            is_task_completed=not is_task_completed,
-            index_to_insert=removed_task_index
-        )
-            
-    def open_edit_task_window(
-            self, 
-            checkbutton_variable: tk.IntVar, 
-            task_name_label: tk.Label, 
-            task_deadline_label: tk.Label) -> None:
+    def count_widgets(self) -> int:
         """
-        Opens a separate window for user to edit task name and deadline
-        of an existing task
+        Returns the number of widgets that exist, including windows
 
         Parameters
         ----------
-        checkbutton_variable : tk.IntVar
-            Used to determine whether a task is marked as finished or
-            unfinished. Necessary for edit_task function called within 
-            this function.
-        task_name_label : tk.Label
-            Used to update task in task list and its content is updated
-            according to what the user has entered. Necessary for 
-            edit_task function called within this function
-        task_deadline_label : tk.Label
-            Used to update task in task list and its content is updated
-            according to what the user has entered. Necessary for 
-            edit_task function called within this function
+        None
 
         Returns
         ----------
-        None
+        widgets_count : int
+            Number of live widgets
         """
 
-        self.task_edit_window = tk.Toplevel(
-            master=self.root, bg=self.config_dict["bg_color"]["frame_bg_3"],
-            name="task_edit_window"
-        )
-        self.task_edit_window.geometry("300x250")
-        self.task_edit_window.title(
-            self.config_dict["window_names"]["task_edit_window"]
-        )
+        widgets_count: int = 0
+        widgets: list = [self.root]
 
-        task_data_frame = tk.Frame(
-            master=self.task_edit_window,
-            bg=self.config_dict["bg_color"]["frame_bg_3"],
-            name="task_data_frame"
-        )
-        task_data_frame.pack(fill=tk.BOTH, side=tk.TOP, expand=True)
+        while widgets:
+            widget: tk.Misc = widgets.pop()
+            widgets_count += 1
+            widgets.extend(widget.winfo_children())
 
-        edit_task_button_frame = tk.Frame(
-            master=self.task_edit_window,
-            bg=self.config_dict["bg_color"]["frame_bg_3"],
-            name="edit_task_button_frame"
-        )
-        edit_task_button_frame.pack(fill=tk.BOTH, side=tk.TOP, expand=True)
+        return widgets_count
 
-        self.task_name_var = tk.StringVar(name="task_name")
-        self.task_name_var.set(task_name_label.cget("text"))
-        edit_task_entry = tk.Entry(
-            master=task_data_frame, 
-            bg=self.config_dict["bg_color"]["entry_bg"], 
-            relief=tk.FLAT,
-            textvariable=self.task_name_var,
-            name="edit_task_entry"
-        )
-        edit_task_entry.pack(fill=tk.NONE, side=tk.LEFT, padx=10)
+    def load_tasks(self) -> None:
+        """
+        Starts loading tasks from storage. Tasks are read in batches
+        scheduled with root.after, so the first screen of tasks is shown
+        quickly and the window stays responsive while the rest is read.
+        A label shows how much of the stored tasks has been read
 
-        self.edit_task_date = DateEntry(
-            master=task_data_frame,
-            bg=self.config_dict["bg_color"]["entry_bg"],
-            name="edit_task_date"
-        )
-        self.edit_task_date.pack(fill=tk.NONE, side=tk.LEFT, padx=10)
+        Parameters
+        ----------
+        None
 
-        task_deadline: datetime.datetime = datetime.datetime.strptime(
-            task_deadline_label.cget("text"), "%d-%m-%Y"
-        )
-        self.edit_task_date.set_date(task_deadline)
+        Returns
+        ----------
+        None
+        """
 
-        edit_task_button = tk.Button(
-            master=edit_task_button_frame, 
-            bg=self.config_dict["bg_color"]["button_bg"], 
-            relief=tk.FLAT, 
-            text=self.config_dict["button_texts"]["edit_task_button"],
-            command=lambda: self.edit_task(
-                checkbutton_variable, task_name_label, task_deadline_label
-            ),
-            name="edit_task_button"
-        )
-        edit_task_button.pack(fill=tk.NONE, side=tk.TOP, padx=10)
+        self.loading_started: float = time.perf_counter()
+        self.loading_tasks = self.task_store.task_storage.iter_tasks()
 
-        edit_task_entry.focus()
+        self.tasks_in_order = []
+        self.task_list_view.set_tasks(self.tasks_in_order)
+        self.loading_label.pack(fill=tk.NONE, side=tk.LEFT, padx=10)
 
-        self.task_edit_window.bind(
-            sequence="<Key-Return>", 
-            func=lambda x: self.edit_task(
-                checkbutton_variable, task_name_label, task_deadline_label
-            )
+        self.load_task_batch(
+            time_budget=self.config_dict["loading"]["first_batch_time_budget"]
         )
 
-    def edit_task(
-            self, 
-            checkbutton_variable: tk.IntVar, 
-            task_name_label: tk.Label, 
-            task_deadline_label: tk.Label, 
-            event: Union[tk.Event, None] = None) -> None:
+        self.startup_timings["load_tasks (first batch)"] = (
+            time.perf_counter() - self.loading_started
+        )
+
+    def load_task_batch(self, time_budget: Union[int, None] = None) -> None:
         """
-        Edits task name and task deadline in a task frame, updates task
-        in task list, closes task edit window
+        Reads tasks from storage until the time budget runs out, shows
+        them in the task list, schedules the next batch. After the last
+        batch, saved changes that are not part of the read tasks yet,
+        like the JSON backend's journal, are replayed
 
         Parameters
         ----------
-        checkbutton_variable : tk.IntVar
-            Used to determine whether a task is marked as finished or
-            unfinished. This info will be used to find task in tasks
-            list.
-        task_name_label : tk.Label
-            Used to update task in task list and its content is updated
-            according to what the user has entered
-        task_deadline_label : tk.Label
-            Used to update task in task list and its content is updated
-            according to what the user has entered
-        event : tk.Event or None, default: None
-            A key press event that lets a user saving tasks with a 
-            keyboard shortcut. Default is None
+        time_budget : int or None, default: None
+            Time in milliseconds this batch may take. Default is None,
+            which uses batch_time_budget from the YAML file
 
         Returns
         ----------
         None
         """
-        
-        task_name = self.task_name_var.get()
-        deadline: datetime.date = self.edit_task_date.get_date()
 
-        if not self.is_user_input_valid(task_name=task_name, deadline=deadline):
-            return
-            
-        if checkbutton_variable.get():
-            is_task_completed: bool = True
-        else:
-            is_task_completed: bool = False
+        if time_budget is None:
+            time_budget = self.config_dict["loading"]["batch_time_budget"]
 
-        edited_task_index: int = self.remove_task_from_list(
-            task_name_label=task_name_label,
-            task_deadline_label=task_deadline_label,
-            is_task_completed=is_task_completed
-        )
+        batch_deadline: float = time.perf_counter() + time_budget / 1000
+        loaded_tasks: list = []
+        finished: bool = True
 
-        task_name_label.config(text=task_name)
-        task_deadline_label.config(text=deadline.strftime("%d-%m-%Y"))
+        for task_entry in self.loading_tasks:
+            task: Task = self.task_store.insert_loaded(task_entry=task_entry)
+            self.name_index.add(task=task, task_name=task.task_name)
+            loaded_tasks.append(task)
 
-        self.insert_task_to_list(
-            task_name_label=task_name_label, 
-            task_deadline_label=task_deadline_label,
-            is_task_completed=is_task_completed,
-            index_to_insert=edited_task_index
+            if time.perf_counter() > batch_deadline:
+                finished = False
+                break
+
+        self.task_list_view.extend_tasks(loaded_tasks)
+
+        if not finished:
+            self.loading_label.config(
+                text=f"Loading tasks "
+                     f"{self.task_store.task_storage.load_progress():.0%}"
+            )
+            self.root.after(1, self.load_task_batch)
+            return
+
+        self.loading_tasks = None
+        self.loading_label.pack_forget()
+
+        self.deadline_index.rebuild(self.task_store)
+        self.replay_journal()
+
+        if self.reload_pending:
+            self.reload_stored_tasks()
+
+        if self.reminders is not None:
+            self.reminders.rebuild(self.task_store)
+
+        if self.config_dict["archive"]["enabled"]:
+            self.archive_old_tasks()
+
+        self.view_mode_menu.config(state=tk.NORMAL)
+        self.search_entry.config(state=tk.NORMAL)
+
+        if self.rpc_server is not None:
+            try:
+                self.rpc_server.start()
+            except OSError as error:
+                logger.warning("RPC server couldn't be started: %s", error)
+                self.rpc_server = None
+
+        if (self.task_store.storage_outdated 
+                and self.config_dict["autosave"]["enabled"]):
+            self.autosaver.mark_dirty()
+
+        self.startup_timings["load_tasks (all batches)"] = (
+            time.perf_counter() - self.loading_started
+        )
+
+        if self.instrumentation is not None:
+            self.instrumentation.record(
+                name="load_tasks (all batches)",
+                duration=self.startup_timings["load_tasks (all batches)"]
+            )
+
+        if self.startup_profile:
+            self.print_startup_profile()
+
+    def print_startup_profile(self) -> None:
+        """
+        Prints how long each startup stage took. Called once all tasks
+        are loaded if the app was started with --startup-profile
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        print("Startup profile:")
+
+        for stage, duration in self.startup_timings.items():
+            print(f"  {stage:<28}{duration * 1000:>10.1f} ms")
+
+        print(f"  {'tasks loaded':<28}{len(self.task_store):>10}")
+
+    def replay_journal(self) -> None:
+        """
+        Applies saved changes that were not part of the loaded tasks to
+        them
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        records: Iterable[dict] = (
+            self.task_store.task_storage.read_pending_records()
+        )
+
+        with self.undo_history.ignore_changes():
+            for record in records:
+                operation, task = self.task_store.apply_record(record=record)
+
+                if operation == "add":
+                    self.task_list_view.tasks.append(task)
+                elif operation == "delete":
+                    self.task_list_view.remove_task(task)
+
+        self.task_list_view.refresh()
+
+    def reload_stored_tasks(self) -> None:
+        """
+        Starts reading stored tasks again after another program changed
+        them. Like loading, tasks are read in batches scheduled with 
+        root.after. If tasks are still being loaded or reloaded, they
+        are reloaded again once that has finished
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        if self.loading_tasks is not None or self.reloading_tasks is not None:
+            self.reload_pending = True
+            return
+
+        self.reload_pending = False
+        self.recurrences.load()
+        self.reloading_tasks = (
+            self.task_store.task_storage.iter_current_tasks()
+        )
+        self.reloaded_tasks = []
+        self.changed_while_reloading = set()
+
+        self.reload_task_batch()
+
+    def reload_task_batch(self) -> None:
+        """
+        Reads stored tasks until the batch time budget runs out, 
+        schedules the next batch. After the last batch, the stored tasks
+        are compared with the tasks in the app by ID and only the tasks
+        that differ are changed, so only their rows are redrawn. Tasks
+        the user changed in the meantime keep the user's changes
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        batch_deadline: float = time.perf_counter() + (
+            self.config_dict["loading"]["batch_time_budget"] / 1000
+        )
+
+        try:
+            for task_entry in self.reloading_tasks:
+                self.reloaded_tasks.append(Task.from_dict(task_entry))
+
+                if time.perf_counter() > batch_deadline:
+                    self.root.after(1, self.reload_task_batch)
+                    return
+        except (OSError, ValueError, KeyError) as error:
+            # The other program may still be writing, the next change
+            # to the files reloads them again
+            logger.warning("Reloading changed tasks failed: %s", error)
+            self.reloading_tasks = None
+            self.reloaded_tasks = []
+            return
+
+        self.reloading_tasks = None
+
+        # Changes of other programs can't be undone, undoing a change
+        # the user made before skips tasks that are gone meanwhile
+        with self.undo_history.ignore_changes():
+            changes: dict = self.task_store.apply_stored_tasks(
+                stored_tasks=self.reloaded_tasks,
+                kept_task_ids=self.changed_while_reloading
+            )
+        self.reloaded_tasks = []
+        self.changed_while_reloading = set()
+
+        self.show_changes(changes)
+
+        if self.reload_pending:
+            self.reload_stored_tasks()
+
+    def change_view_mode(self, view_name: str) -> None:
+        """
+        Shows the tasks of the view the user picked from the view menu,
+        scrolled to the top. Rows of tasks that are shown in both views
+        are moved instead of being rebuilt. The archive is read only
+        while the archive view is shown
+
+        Parameters
+        ----------
+        view_name : str
+            Name of the view as written in view_names of the YAML file
+
+        Returns
+        ----------
+        None
+        """
+
+        for view_mode, name in self.config_dict["view_names"].items():
+            if name == view_name:
+                self.view_mode = view_mode
+                break
+
+        self.task_list_view.top = 0
+        self.task_list_view.selected_task_ids = set()
+
+        if self.view_mode == "archive":
+            self.read_archive()
+            return
+
+        self.stop_reading_archive()
+        self.task_list_view.set_tasks(self.tasks_for_view_mode())
+
+    def tasks_for_view_mode(self) -> Sequence[Task]:
+        """
+        Returns the tasks shown in the current view mode. Views other
+        than "all" are ranges of the deadline index, which follow 
+        changes to tasks without being rebuilt
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        tasks : Sequence[Task]
+            Tasks in the order they are shown
+        """
+
+        self.recurring_range = None
+
+        if self.view_mode == "archive":
+            # Already filtered by the search text while being read
+            return self.archived_tasks
+
+        today: int = datetime.date.today().toordinal()
+        tasks: Sequence[Task] = self.tasks_in_order
+
+        if self.view_mode == "deadline":
+            tasks = self.deadline_index.by_deadline()
+        elif self.view_mode == "overdue":
+            tasks = self.deadline_index.overdue(today=today)
+        elif self.view_mode == "today":
+            tasks = self.deadline_index.due_today(today=today)
+        elif self.view_mode == "week":
+            tasks = self.deadline_index.due_this_week(today=today)
+
+        # Views of a few days also show later occurrences of recurring
+        # tasks, generated for those days only
+        if self.view_mode in ("today", "week") and len(self.recurrences):
+            tasks = RecurringRange(
+                deadline_range=tasks, recurrences=self.recurrences,
+                task_store=self.task_store
+            )
+            self.recurring_range = tasks
+
+        if self.search_matches is None:
+            return tasks
+
+        if isinstance(tasks, (DeadlineRange, RecurringRange)):
+            return tasks.select(self.search_matches)
+
+        task_positions: dict = self.task_store.task_positions
+
+        return sorted(
+            self.search_matches, 
+            key=lambda task: task_positions[task.task_id]
+        )
+
+    def schedule_search(self, *trace_arguments) -> None:
+        """
+        Schedules a search after the search text changed. Each change
+        moves the search back by the delay set in the YAML file, so 
+        typing fast results in one search instead of one per key press
+
+        Parameters
+        ----------
+        *trace_arguments
+            Arguments passed by tk.StringVar.trace_add, not used
+
+        Returns
+        ----------
+        None
+        """
+
+        if self.search_timer_id is not None:
+            self.root.after_cancel(self.search_timer_id)
+
+        self.search_timer_id = self.root.after(
+            self.config_dict["search"]["delay"], self.run_search
+        )
+
+    def run_search(self) -> None:
+        """
+        Shows tasks whose name includes the search text, scrolled to the
+        top. If the new search text includes the previous one, the 
+        previous matches are narrowed down instead of searching all 
+        tasks again. An empty search text shows all tasks of the view.
+        In the archive view, the archive is read again and filtered
+        while it is read
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        self.search_timer_id = None
+
+        previous_query: str = self.search_query
+        self.search_query = self.search_var.get().casefold()
+
+        if not self.search_query.strip():
+            self.search_query = ""
+            self.search_matches = None
+        elif (self.search_matches is not None 
+                and previous_query in self.search_query):
+            self.search_matches = {
+                task for task in self.search_matches 
+                if self.search_query in task.task_name.casefold()
+            }
+        else:
+            self.search_matches = self.name_index.search(self.search_query)
+
+        self.task_list_view.top = 0
+
+        if self.view_mode == "archive":
+            self.read_archive()
+            return
+
+        self.task_list_view.set_tasks(self.tasks_for_view_mode())
+
+    def read_archive(self) -> None:
+        """
+        Starts showing archived tasks whose name includes the search
+        text. The archive is read in batches scheduled with root.after,
+        so the window stays responsive while a large archive is read
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        self.stop_reading_archive()
+
+        self.reading_archive = self.archive.search(self.search_query)
+        self.archived_tasks = []
+        self.archived_task_positions = {}
+        self.task_list_view.set_tasks(self.archived_tasks)
+
+        self.read_archive_batch()
+
+    def read_archive_batch(self) -> None:
+        """
+        Reads archived tasks until the batch time budget runs out, shows
+        them, schedules the next batch. Tasks restored to the task list
+        are skipped. A task archived more than once is shown once, as 
+        it was archived the last time
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        self.archive_read_timer_id = None
+        batch_deadline: float = time.perf_counter() + (
+            self.config_dict["loading"]["batch_time_budget"] / 1000
+        )
+
+        for task_entry in self.reading_archive:
+            if task_entry.get("task_id") in self.task_store:
+                continue
+
+            try:
+                task: Task = Task.from_dict(task_entry)
+            except (KeyError, ValueError, AttributeError):
+                continue
+
+            position: Union[int, None] = self.archived_task_positions.get(
+                task.task_id
+            )
+            if position is None:
+                self.archived_task_positions[task.task_id] = len(
+                    self.archived_tasks
+                )
+                self.archived_tasks.append(task)
+            else:
+                self.archived_tasks[position] = task
+
+            if time.perf_counter() > batch_deadline:
+                self.archive_read_timer_id = self.root.after(
+                    1, self.read_archive_batch
+                )
+                self.task_list_view.refresh()
+                return
+
+        self.reading_archive = None
+        self.task_list_view.refresh()
+
+    def stop_reading_archive(self) -> None:
+        """
+        Stops reading the archive and lets go of archived tasks read
+        so far, for example after switching from the archive view to 
+        another view
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        if self.archive_read_timer_id is not None:
+            self.root.after_cancel(self.archive_read_timer_id)
+            self.archive_read_timer_id = None
+
+        if self.reading_archive is not None:
+            # Closes the archive file
+            self.reading_archive.close()
+            self.reading_archive = None
+
+        self.archived_tasks = []
+        self.archived_task_positions = {}
+
+    def archive_old_tasks(self) -> None:
+        """
+        Moves finished tasks whose deadline is more than
+        archive.older_than_days days ago from the task list to the 
+        archive, schedules the next check. Tasks are on disk in the 
+        archive before they are removed, and all tasks are written at
+        the next save, so the task files shrink. Archiving can't be
+        undone, archived tasks are restored from the archive view
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        self.root.after(
+            self.config_dict["archive"]["check_interval"],
+            self.archive_old_tasks
+        )
+
+        if self.loading_tasks is not None or self.reloading_tasks is not None:
+            return
+
+        end_deadline: int = datetime.date.today().toordinal() - (
+            self.config_dict["archive"]["older_than_days"]
+        )
+        old_tasks: list = [
+            task for task in DeadlineRange(
+                deadline_index=self.deadline_index, open_only=False,
+                end_deadline=end_deadline
+            )
+            if task.completed
+        ]
+
+        if not old_tasks:
+            return
+
+        try:
+            self.archive.append(task.to_dict() for task in old_tasks)
+        except OSError as error:
+            logger.warning("Archiving finished tasks failed: %s", error)
+            return
+
+        with self.undo_history.ignore_changes():
+            archived_tasks: list = self.task_store.delete_many(
+                task.task_id for task in old_tasks
+            )
+
+        self.task_store.storage_outdated = True
+        self.remove_shown_tasks(archived_tasks)
+
+    def restore_archived_tasks(self, task_ids: Iterable[str]) -> None:
+        """
+        Moves archived tasks back to the task list as unfinished tasks.
+        They stay in the archive, which is append-only, but aren't 
+        shown in the archive view while they are in the task list
+
+        Parameters
+        ----------
+        task_ids : Iterable[str]
+            IDs of tasks shown in the archive view
+
+        Returns
+        ----------
+        None
+        """
+
+        tasks: list = [
+            self.archived_tasks[self.archived_task_positions[task_id]]
+            for task_id in task_ids
+            if task_id in self.archived_task_positions
+        ]
+
+        for task in tasks:
+            task.completed = False
+
+        restored_tasks: list = self.task_store.restore_many(tasks)
+        restored_task_ids: set = {task.task_id for task in restored_tasks}
+
+        self.archived_tasks[:] = [
+            task for task in self.archived_tasks
+            if task.task_id not in restored_task_ids
+        ]
+        self.archived_task_positions = {
+            task.task_id: position
+            for position, task in enumerate(self.archived_tasks)
+        }
+        self.task_list_view.selected_task_ids -= restored_task_ids
+
+        self.tasks_in_order.extend(restored_tasks)
+        self.update_shown_tasks()
+
+    def update_shown_tasks(self) -> None:
+        """
+        Redraws the task list after tasks changed. Search results are 
+        looked up again, since the change may have added or removed a
+        match
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        if self.search_matches is None:
+            self.task_list_view.refresh()
+            return
+
+        self.search_matches = self.name_index.search(self.search_query)
+        self.task_list_view.set_tasks(self.tasks_for_view_mode())
+
+    def open_task_create_window(
+            self, 
+            event: Union[tk.Event, None] = None) -> None:
+        """
+        Opens a separate window for user to enter task name and deadline
+        of a task they want to create. The window is built the first
+        time it is opened, later it is shown again with its fields 
+        cleared, so there is never more than one task creation window
+
+        Parameters
+        ----------
+        event : tk.Event or None, default: None
+            A key press event that lets a user saving tasks with a 
+            keyboard shortcut. Default is None
+
+        Returns
+        ----------
+        None
+        """
+
+        if self.task_creation_window is None:
+            self.build_task_create_window()
+
+        self.create_task_name_var.set("")
+        self.create_task_date.set_date(datetime.date.today())
+        self.show_recurrence_rule(
+            recurrence_widgets=self.create_recurrence_widgets, rule=None
+        )
+
+        self.task_creation_window.deiconify()
+        self.task_creation_window.lift()
+        self.create_task_entry.focus()
+
+    def build_task_create_window(self) -> None:
+        """
+        Builds the task creation window. Closing the window hides it
+        instead of destroying it, so it can be shown again
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+        
+        self.task_creation_window = self.styles.style(
+            tk.Toplevel(
+                master=self.root,
+                name="task_creation_window"
+            ),
+            bg="frame_bg_3"
+        )
+        self.task_creation_window.geometry("420x250")
+        self.task_creation_window.title(
+            self.config_dict["window_names"]["task_create_window"]
+        )
+        self.task_creation_window.protocol(
+            "WM_DELETE_WINDOW", self.task_creation_window.withdraw
+        )
+
+        task_data_frame = self.styles.style(
+            tk.Frame(
+                master=self.task_creation_window,
+                name="task_data_frame"
+            ),
+            bg="frame_bg_3"
+        )
+        task_data_frame.pack(fill=tk.BOTH, side=tk.TOP, expand=True)
+
+        create_task_button_frame = self.styles.style(
+            tk.Frame(
+                master=self.task_creation_window,
+                name="create_task_button_frame"
+            ),
+            bg="frame_bg_3"
+        )
+        create_task_button_frame.pack(
+            fill=tk.BOTH, side=tk.BOTTOM, expand=True
+        )
+
+        self.create_task_name_var = tk.StringVar(master=self.root)
+        self.create_task_entry = self.styles.style(
+            tk.Entry(
+                master=task_data_frame,
+                relief=tk.FLAT,
+                textvariable=self.create_task_name_var,
+                name="create_task_entry"
+            ),
+            bg="entry_bg", fg="primary"
+        )
+        self.create_task_entry.pack(fill=tk.NONE, side=tk.LEFT, padx=10)
+
+        from tkcalendar import DateEntry
+
+        self.create_task_date = DateEntry(
+            master=task_data_frame,
+            bg=self.styles.bg("entry_bg"),
+            name="create_task_date"
+        )
+        self.create_task_date.pack(fill=tk.NONE, side=tk.LEFT, padx=10)
+
+        self.create_recurrence_widgets: dict = self.build_recurrence_frame(
+            master=self.task_creation_window
+        )
+
+        create_task_button = self.styles.style(
+            tk.Button(
+                master=create_task_button_frame,
+                relief=tk.FLAT,
+                text=self.config_dict["button_texts"]["create_task_button"],
+                command=self.add_task,
+                name="create_task_button"
+            ),
+            bg="button_bg", fg="primary"
+        )
+        create_task_button.pack(fill=tk.NONE, side=tk.TOP, padx=10)
+
+        self.task_creation_window.bind(
+            sequence="<Key-Return>", func=self.add_task
+        )
+
+    def build_recurrence_frame(self, master: tk.Toplevel) -> dict:
+        """
+        Builds the fields that set how often a task recurs, under the
+        task name and deadline fields of a task window
+
+        Parameters
+        ----------
+        master : tk.Toplevel
+            Task creation or task edit window
+
+        Returns
+        ----------
+        recurrence_widgets : dict
+            Variables of the frequency menu, interval spinbox and until
+            checkbutton, and the until date entry, keyed by
+            "frequency_var", "interval_var", "until_var" and
+            "until_date"
+        """
+
+        recurrence_frame = self.styles.style(
+            tk.Frame(master=master, name="recurrence_frame"),
+            bg="frame_bg_3"
+        )
+        recurrence_frame.pack(fill=tk.NONE, side=tk.TOP, pady=5)
+
+        recurrence_names: dict = self.config_dict["recurrence_names"]
+        frequency_var = tk.StringVar(
+            master=self.root, value=recurrence_names["none"]
+        )
+        frequency_menu = tk.OptionMenu(
+            recurrence_frame, frequency_var, *recurrence_names.values()
+        )
+        frequency_menu.config(relief=tk.FLAT, highlightthickness=0)
+        self.styles.style(frequency_menu, bg="button_bg", fg="primary")
+        frequency_menu.pack(fill=tk.NONE, side=tk.LEFT, padx=5)
+
+        every_label = self.styles.style(
+            tk.Label(
+                master=recurrence_frame,
+                text=self.config_dict["label_texts"]["recurrence_every_label"],
+                name="every_label"
+            ),
+            bg="frame_bg_3", fg="inverted"
+        )
+        every_label.pack(fill=tk.NONE, side=tk.LEFT, padx=5)
+
+        interval_var = tk.StringVar(master=self.root, value="1")
+        interval_spinbox = self.styles.style(
+            tk.Spinbox(
+                master=recurrence_frame,
+                from_=1,
+                to=365,
+                width=4,
+                relief=tk.FLAT,
+                textvariable=interval_var,
+                name="interval_spinbox"
+            ),
+            bg="entry_bg", fg="primary"
+        )
+        interval_spinbox.pack(fill=tk.NONE, side=tk.LEFT, padx=5)
+
+        until_var = tk.IntVar(master=self.root, value=0)
+        until_checkbutton = self.styles.style(
+            tk.Checkbutton(
+                master=recurrence_frame,
+                text=self.config_dict["label_texts"]["recurrence_until_label"],
+                variable=until_var,
+                name="until_checkbutton"
+            ),
+            bg="frame_bg_3", fg="inverted"
+        )
+        until_checkbutton.pack(fill=tk.NONE, side=tk.LEFT, padx=5)
+
+        from tkcalendar import DateEntry
+
+        until_date = DateEntry(
+            master=recurrence_frame,
+            bg=self.styles.bg("entry_bg"),
+            name="until_date"
+        )
+        until_date.pack(fill=tk.NONE, side=tk.LEFT, padx=5)
+
+        return {"frequency_var": frequency_var, "interval_var": interval_var,
+                "until_var": until_var, "until_date": until_date}
+
+    def show_recurrence_rule(
+            self,
+            recurrence_widgets: dict,
+            rule: Union[RecurrenceRule, None]) -> None:
+        """
+        Fills the recurrence fields of a task window with a rule
+
+        Parameters
+        ----------
+        recurrence_widgets : dict
+            Fields returned by build_recurrence_frame
+        rule : RecurrenceRule or None
+            Rule to show, None for a task that doesn't recur
+
+        Returns
+        ----------
+        None
+        """
+
+        recurrence_names: dict = self.config_dict["recurrence_names"]
+
+        if rule is None:
+            recurrence_widgets["frequency_var"].set(recurrence_names["none"])
+            recurrence_widgets["interval_var"].set("1")
+            recurrence_widgets["until_var"].set(0)
+            recurrence_widgets["until_date"].set_date(datetime.date.today())
+            return
+
+        recurrence_widgets["frequency_var"].set(
+            recurrence_names[rule.frequency]
+        )
+        recurrence_widgets["interval_var"].set(str(rule.interval))
+        recurrence_widgets["until_var"].set(0 if rule.until is None else 1)
+        recurrence_widgets["until_date"].set_date(
+            datetime.date.today() if rule.until is None
+            else datetime.date.fromordinal(rule.until)
+        )
+
+    def read_recurrence_rule(
+            self,
+            recurrence_widgets: dict,
+            deadline: datetime.date) -> tuple:
+        """
+        Reads the rule entered in the recurrence fields of a task 
+        window. Tells the user what is wrong with an invalid rule
+
+        Parameters
+        ----------
+        recurrence_widgets : dict
+            Fields returned by build_recurrence_frame
+        deadline : datetime.date
+            User entered task deadline, the first occurrence
+
+        Returns
+        ----------
+        valid : bool
+            False if the entered rule is invalid
+        rule : RecurrenceRule or None
+            Entered rule, None if the task doesn't recur or the rule is
+            invalid
+        """
+
+        frequency: Union[str, None] = None
+        for recurrence_name, name in (
+                self.config_dict["recurrence_names"].items()):
+            if name == recurrence_widgets["frequency_var"].get():
+                frequency = recurrence_name
+                break
+
+        if frequency in (None, "none"):
+            return True, None
+
+        until: Union[int, None] = None
+        if recurrence_widgets["until_var"].get():
+            until = recurrence_widgets["until_date"].get_date().toordinal()
+
+        try:
+            rule = RecurrenceRule(
+                start=deadline.toordinal(),
+                frequency=frequency,
+                interval=int(recurrence_widgets["interval_var"].get()),
+                until=until
+            )
+        except ValueError:
+            messagebox.showerror(
+                title="Invalid interval",
+                message="Interval must be a whole number of at least 1."
+            )
+            return False, None
+
+        if until is not None and until < rule.start:
+            messagebox.showerror(
+                title="Invalid end date",
+                message="Recurrence can't end before the deadline."
+            )
+            return False, None
+
+        return True, rule
+
+    def show_reminder(self, tasks: list) -> None:
+        """
+        Shows a window with the names of tasks that fell due. The window
+        doesn't block the main window, and tasks that fall due while it
+        is open are added to it
+
+        Parameters
+        ----------
+        tasks : list
+            Tasks that fell due
+
+        Returns
+        ----------
+        None
+        """
+
+        if self.reminder_window is None:
+            self.build_reminder_window()
+
+        self.reminded_task_names.extend(task.task_name for task in tasks)
+
+        max_shown_tasks: int = self.config_dict["reminders"]["max_shown_tasks"]
+        shown_names: list = self.reminded_task_names[:max_shown_tasks]
+        hidden_count: int = len(self.reminded_task_names) - len(shown_names)
+
+        if hidden_count:
+            shown_names.append(f"and {hidden_count} more")
+
+        self.reminder_tasks_label.config(text="\n".join(shown_names))
+
+        self.reminder_window.deiconify()
+        self.reminder_window.lift()
+        self.root.bell()
+
+    def build_reminder_window(self) -> None:
+        """
+        Builds the reminder window. Closing the window hides it and 
+        clears the tasks shown in it
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        self.reminder_window = self.styles.style(
+            tk.Toplevel(
+                master=self.root,
+                name="reminder_window"
+            ),
+            bg="frame_bg_3"
+        )
+        self.reminder_window.title(
+            self.config_dict["window_names"]["reminder_window"]
+        )
+        self.reminder_window.protocol(
+            "WM_DELETE_WINDOW", self.close_reminder_window
+        )
+
+        reminder_label = self.styles.style(
+            tk.Label(
+                master=self.reminder_window,
+                font=self.styles.font("heading"),
+                text=self.config_dict["label_texts"]["reminder_label"],
+                name="reminder_label"
+            ),
+            bg="frame_bg_3", fg="primary"
+        )
+        reminder_label.pack(fill=tk.NONE, side=tk.TOP, padx=10, pady=5)
+
+        self.reminder_tasks_label = self.styles.style(
+            tk.Label(
+                master=self.reminder_window,
+                justify=tk.LEFT,
+                name="reminder_tasks_label"
+            ),
+            bg="frame_bg_3", fg="primary"
+        )
+        self.reminder_tasks_label.pack(fill=tk.NONE, side=tk.TOP, padx=10)
+
+        reminder_ok_button = self.styles.style(
+            tk.Button(
+                master=self.reminder_window,
+                relief=tk.FLAT,
+                text=self.config_dict["button_texts"]["reminder_ok_button"],
+                command=self.close_reminder_window,
+                name="reminder_ok_button"
+            ),
+            bg="button_bg", fg="primary"
+        )
+        reminder_ok_button.pack(fill=tk.NONE, side=tk.TOP, pady=10)
+
+    def close_reminder_window(self) -> None:
+        """
+        Hides the reminder window and forgets the tasks it showed, so
+        the next reminder starts with an empty list
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        self.reminded_task_names = []
+        self.reminder_window.withdraw()
+
+    def add_task(self, event: Union[tk.Event, None] = None) -> None:
+        """
+        Adds user entered task to tasks list, hides the task creation
+        window. If all tasks are shown, the task list is scrolled to the
+        new task
+
+        Parameters
+        ----------
+        event : tk.Event or None, default: None
+            A key press event that lets a user saving tasks with a 
+            keyboard shortcut. Default is None
+
+        Returns
+        ----------
+        None
+        """
+
+        task_name: str = self.create_task_name_var.get()
+        deadline: datetime.date = self.create_task_date.get_date()
+
+        if not self.is_user_input_valid(task_name=task_name, deadline=deadline):
+            return
+
+        rule_valid, rule = self.read_recurrence_rule(
+            recurrence_widgets=self.create_recurrence_widgets,
+            deadline=deadline
+        )
+        if not rule_valid:
+            return
+            
+        with self.undo_history.batch():
+            task: Task = self.task_store.add(
+                task_name=task_name, deadline=deadline.toordinal()
+            )
+
+            if rule is not None:
+                self.recurrences.set_rule(task_id=task.task_id, rule=rule)
+
+        if self.task_list_view.tasks is self.tasks_in_order:
+            self.task_list_view.append_task(task)
+        else:
+            self.tasks_in_order.append(task)
+            self.update_shown_tasks()
+
+        self.task_creation_window.withdraw()
+
+    def split_shown_task_id(self, task_id: str) -> tuple:
+        """
+        Finds the task an ID shown in the task list belongs to. Only a
+        generated occurrence shown in the current view has an ID that
+        isn't the ID of a task
+
+        Parameters
+        ----------
+        task_id : str
+            ID of a task or of a generated occurrence of a recurring
+            task
+
+        Returns
+        ----------
+        task_id : str
+            ID of the recurring task of an occurrence, otherwise the
+            given ID
+        deadline : int or None
+            Deadline of the occurrence as a date ordinal, None if the
+            given ID isn't the ID of an occurrence
+        """
+
+        if self.recurring_range is not None:
+            occurrence: Union[tuple, None] = (
+                self.recurring_range.find_occurrence(task_id)
+            )
+
+            if occurrence is not None:
+                return occurrence
+
+        return task_id, None
+
+    def checkbutton_function(self, task_id: str, completed: bool) -> None:
+        """
+        Marks a task as finished or unfinished in tasks list according
+        to whether the user has checked or unchecked the checkbutton,
+        redraws the task's row. Finishing a recurring task moves it to
+        its next occurrence instead. In the archive view, unchecking a
+        task restores it to the task list
+
+        Parameters
+        ----------
+        task_id : str
+            Unique ID of the task, used to find it in tasks list, or ID
+            of a generated occurrence of a recurring task
+        completed : bool
+            New value of the checkbutton. True if the task is marked as
+            finished
+
+        Returns
+        ----------
+        None
+        """
+
+        if self.view_mode == "archive":
+            if not completed:
+                self.restore_archived_tasks([task_id])
+            return
+
+        if completed:
+            with self.undo_history.batch():
+                for other_task_id in self.complete_recurring_tasks([task_id]):
+                    self.task_store.toggle(
+                        task_id=other_task_id, completed=True
+                    )
+        else:
+            for other_task_id in self.reopen_occurrences([task_id]):
+                self.task_store.toggle(task_id=other_task_id, completed=False)
+
+        self.update_shown_tasks()
+
+    def complete_recurring_tasks(self, task_ids: Iterable[str]) -> list:
+        """
+        Finishes occurrences of recurring tasks. A task's own 
+        occurrence is finished by moving its deadline to the next 
+        unfinished occurrence, all tasks as one batch. A later, 
+        generated occurrence is kept as an exception of the task's 
+        rule, so the task itself doesn't change
+
+        Parameters
+        ----------
+        task_ids : Iterable[str]
+            IDs of tasks and of generated occurrences
+
+        Returns
+        ----------
+        other_task_ids : list
+            IDs of tasks that don't recur and of recurring tasks without
+            later occurrences, which are finished like other tasks
+        """
+
+        other_task_ids: list = []
+        changes: list = []
+
+        for task_id in task_ids:
+            task_id, deadline = self.split_shown_task_id(task_id)
+
+            if task_id not in self.recurrences:
+                other_task_ids.append(task_id)
+                continue
+
+            if deadline is not None:
+                self.recurrences.set_occurrence_completed(
+                    task_id=task_id, deadline=deadline, completed=True
+                )
+                continue
+
+            task: Task = self.task_store.get(task_id)
+            next_deadline: Union[int, None] = (
+                self.recurrences.next_deadline(task=task, after=task.deadline)
+            )
+
+            if next_deadline is None or task.completed:
+                other_task_ids.append(task_id)
+            else:
+                changes.append((task_id, task.task_name, next_deadline))
+
+        self.task_store.edit_many(changes)
+
+        return other_task_ids
+
+    def reopen_occurrences(self, task_ids: Iterable[str]) -> list:
+        """
+        Marks generated occurrences of recurring tasks as unfinished
+        by removing them from the exceptions of the tasks' rules
+
+        Parameters
+        ----------
+        task_ids : Iterable[str]
+            IDs of tasks and of generated occurrences
+
+        Returns
+        ----------
+        other_task_ids : list
+            IDs that aren't IDs of generated occurrences, of tasks
+            which are marked as unfinished like other tasks
+        """
+
+        other_task_ids: list = []
+
+        for task_id in task_ids:
+            task_id, deadline = self.split_shown_task_id(task_id)
+
+            if deadline is None:
+                other_task_ids.append(task_id)
+            else:
+                self.recurrences.set_occurrence_completed(
+                    task_id=task_id, deadline=deadline, completed=False
+                )
+
+        return other_task_ids
+
+    def open_edit_task_window(self, task_id: str) -> None:
+        """
+        Opens a separate window for user to edit task name and deadline
+        of an existing task. The window is built the first time it is
+        opened, later it is shown again filled with the task's info, so
+        there is never more than one task edit window
+
+        Parameters
+        ----------
+        task_id : str
+            Unique ID of the task to edit, or of a generated occurrence
+            of the recurring task to edit. Necessary for edit_task 
+            function called within this function
+
+        Returns
+        ----------
+        None
+        """
+
+        # Archived tasks can't be edited
+        if self.view_mode == "archive":
+            return
+
+        task_id, _ = self.split_shown_task_id(task_id)
+        task: Task = self.task_store.get(task_id)
+
+        if self.task_edit_window is None:
+            self.build_edit_task_window()
+
+        self.edited_task_id = task_id
+        self.edit_task_name_var.set(task.task_name)
+        self.edit_task_date.set_date(task.deadline_date())
+        self.show_recurrence_rule(
+            recurrence_widgets=self.edit_recurrence_widgets,
+            rule=self.recurrences.rules.get(task_id)
+        )
+
+        self.task_edit_window.deiconify()
+        self.task_edit_window.lift()
+        self.edit_task_entry.focus()
+
+    def build_edit_task_window(self) -> None:
+        """
+        Builds the task edit window. Closing the window hides it instead
+        of destroying it, so it can be shown again
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        self.task_edit_window = self.styles.style(
+            tk.Toplevel(master=self.root, name="task_edit_window"),
+            bg="frame_bg_3"
+        )
+        self.task_edit_window.geometry("420x250")
+        self.task_edit_window.title(
+            self.config_dict["window_names"]["task_edit_window"]
+        )
+        self.task_edit_window.protocol(
+            "WM_DELETE_WINDOW", self.task_edit_window.withdraw
+        )
+
+        task_data_frame = self.styles.style(
+            tk.Frame(
+                master=self.task_edit_window,
+                name="task_data_frame"
+            ),
+            bg="frame_bg_3"
+        )
+        task_data_frame.pack(fill=tk.BOTH, side=tk.TOP, expand=True)
+
+        edit_task_button_frame = self.styles.style(
+            tk.Frame(
+                master=self.task_edit_window,
+                name="edit_task_button_frame"
+            ),
+            bg="frame_bg_3"
+        )
+        edit_task_button_frame.pack(fill=tk.BOTH, side=tk.BOTTOM, expand=True)
+
+        self.edit_task_name_var = tk.StringVar(master=self.root)
+        self.edit_task_entry = self.styles.style(
+            tk.Entry(
+                master=task_data_frame,
+                relief=tk.FLAT,
+                textvariable=self.edit_task_name_var,
+                name="edit_task_entry"
+            ),
+            bg="entry_bg", fg="primary"
+        )
+        self.edit_task_entry.pack(fill=tk.NONE, side=tk.LEFT, padx=10)
+
+        from tkcalendar import DateEntry
+
+        self.edit_task_date = DateEntry(
+            master=task_data_frame,
+            bg=self.styles.bg("entry_bg"),
+            name="edit_task_date"
+        )
+        self.edit_task_date.pack(fill=tk.NONE, side=tk.LEFT, padx=10)
+
+        self.edit_recurrence_widgets: dict = self.build_recurrence_frame(
+            master=self.task_edit_window
+        )
+
+        edit_task_button = self.styles.style(
+            tk.Button(
+                master=edit_task_button_frame,
+                relief=tk.FLAT,
+                text=self.config_dict["button_texts"]["edit_task_button"],
+                command=lambda: self.edit_task(self.edited_task_id),
+                name="edit_task_button"
+            ),
+            bg="button_bg", fg="primary"
+        )
+        edit_task_button.pack(fill=tk.NONE, side=tk.TOP, padx=10)
+
+        self.task_edit_window.bind(
+            sequence="<Key-Return>", 
+            func=lambda x: self.edit_task(self.edited_task_id)
+        )
+
+    def edit_task(
+            self, 
+            task_id: str, 
+            event: Union[tk.Event, None] = None) -> None:
+        """
+        Edits task name and task deadline of a task in tasks list, 
+        redraws the task's row, hides task edit window. If the task was
+        deleted while the window was open, the window is only hidden
+
+        Parameters
+        ----------
+        task_id : str
+            Unique ID of the task to edit
+        event : tk.Event or None, default: None
+            A key press event that lets a user saving tasks with a 
+            keyboard shortcut. Default is None
+
+        Returns
+        ----------
+        None
+        """
+
+        if task_id not in self.task_store:
+            self.task_edit_window.withdraw()
+            return
+        
+        task_name = self.edit_task_name_var.get()
+        deadline: datetime.date = self.edit_task_date.get_date()
+
+        if not self.is_user_input_valid(task_name=task_name, deadline=deadline):
+            return
+
+        rule_valid, rule = self.read_recurrence_rule(
+            recurrence_widgets=self.edit_recurrence_widgets,
+            deadline=deadline
+        )
+        if not rule_valid:
+            return
+
+        task: Task = self.task_store.get(task_id)
+        previous_rule: Union[RecurrenceRule, None] = (
+            self.recurrences.rules.get(task_id)
         )
+
+        # Occurrences keep being counted from the first one unless the
+        # deadline was moved, so monthly tasks keep their day
+        if (rule is not None and previous_rule is not None
+                and task.deadline == deadline.toordinal()):
+            rule.start = previous_rule.start
+
+        with self.undo_history.batch():
+            self.task_store.edit(
+                task_id=task_id, task_name=task_name, 
+                deadline=deadline.toordinal()
+            )
+            self.recurrences.set_rule(task_id=task_id, rule=rule)
+
+        self.update_shown_tasks()
             
-        self.task_edit_window.destroy()
+        self.task_edit_window.withdraw()
+
+    def delete_task_frame(self, task_id: str) -> None:
+        """
+        Removes a task from tasks list, removes its row from the task
+        list. Deleting an occurrence of a recurring task deletes the
+        task with all its occurrences
+
+        Parameters
+        ----------
+        task_id : str
+            Unique ID of the task to delete, or of a generated 
+            occurrence of the recurring task to delete
+
+        Returns
+        ----------
+        None
+
+        Raises
+        ----------
+        ValueError
+            If there's no task with the given ID in tasks list
+        """
+
+        # The archive is append-only
+        if self.view_mode == "archive":
+            return
+
+        task_id, _ = self.split_shown_task_id(task_id)
+        shows_all_tasks: bool = (
+            self.task_list_view.tasks is self.tasks_in_order
+        )
+
+        # Found while the task still has a position in the task store
+        order_index: Union[int, None] = None
+        if not shows_all_tasks and task_id in self.task_store:
+            order_index = self.find_in_order(task_id)
+
+        task: Task = self.task_store.delete(task_id=task_id)
+        self.task_list_view.selected_task_ids.discard(task_id)
+
+        if shows_all_tasks:
+            self.task_list_view.remove_task(task)
+            return
+
+        if order_index is not None:
+            del self.tasks_in_order[order_index]
+
+        self.update_shown_tasks()
+
+    def find_in_order(self, task_id: str) -> Union[int, None]:
+        """
+        Finds a task in tasks in order with a binary search. Tasks are
+        appended to tasks in order as they are added to the task store,
+        so tasks in order are sorted by their positions in the store
+
+        Parameters
+        ----------
+        task_id : str
+            Unique ID of a task in the task store
+
+        Returns
+        ----------
+        order_index : int or None
+            Index of the task in tasks in order, None if it isn't there
+            yet, like while tasks are loading
+        """
+
+        task_positions: dict = self.task_store.task_positions
+        position: int = task_positions[task_id]
+        low: int = 0
+        high: int = len(self.tasks_in_order)
+
+        while low < high:
+            middle: int = (low + high) // 2
+            middle_position: int = task_positions.get(
+                self.tasks_in_order[middle].task_id, -1
+            )
+
+            if middle_position < position:
+                low = middle + 1
+            else:
+                high = middle
+
+        if (low < len(self.tasks_in_order)
+                and self.tasks_in_order[low].task_id == task_id):
+            return low
+
+        return None
+
+    def select_all_tasks(self, event: Union[tk.Event, None] = None) -> None:
+        """
+        Selects all tasks shown in the task list. Ignored while typing 
+        in a text field, where Ctrl+A keeps its usual meaning
+
+        Parameters
+        ----------
+        event : tk.Event or None, default: None
+            A key press event that lets a user selecting tasks with a
+            keyboard shortcut. Default is None
+
+        Returns
+        ----------
+        None
+        """
+
+        if event is not None and isinstance(event.widget, tk.Entry):
+            return
+
+        self.task_list_view.select_all()
+
+    def set_selected_tasks_completed(self, completed: bool) -> None:
+        """
+        Marks selected tasks as finished or unfinished as one batch, 
+        which is redrawn and saved once. Recurring tasks move to their
+        next occurrence instead of being finished, generated 
+        occurrences are marked in their task's rule
+
+        Parameters
+        ----------
+        completed : bool
+            True if the tasks are marked as finished
+
+        Returns
+        ----------
+        None
+        """
+
+        task_ids: Iterable[str] = self.task_list_view.selected_task_ids
+
+        if self.view_mode == "archive":
+            if not completed:
+                self.restore_archived_tasks(task_ids)
+            return
+
+        # Undone as one step, with the moves of recurring tasks
+        with self.undo_history.batch():
+            if completed:
+                task_ids = self.complete_recurring_tasks(task_ids)
+            else:
+                task_ids = self.reopen_occurrences(task_ids)
+
+            self.task_store.toggle_many(task_ids=task_ids, completed=completed)
+
+        self.update_shown_tasks()
+
+    def delete_selected_tasks(self) -> None:
+        """
+        Asks the user to confirm, removes selected tasks as one batch
+
+        Parameters
+        ----------
+        None
 
-    def delete_task_frame(
-            self,
-            checkbutton_variable: tk.IntVar, 
-            task_frame: tk.Frame, 
-            task_name_label: tk.Label, 
-            task_deadline_label: tk.Label) -> None:
+        Returns
+        ----------
+        None
+        """
+
+        task_ids: set = self.task_list_view.selected_task_ids
+
+        # The archive is append-only
+        if self.view_mode == "archive":
+            return
+
+        if not task_ids or not messagebox.askokcancel(
+                title="Delete selected tasks",
+                message=f"Delete {len(task_ids)} selected tasks?"):
+            return
+
+        self.remove_shown_tasks(self.task_store.delete_many(task_ids))
+
+    def purge_completed_tasks(self) -> None:
+        """
+        Asks the user to confirm, removes all finished tasks as one 
+        batch
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        task_ids: list = [
+            task.task_id for task in self.task_store if task.completed
+        ]
+
+        if not task_ids or not messagebox.askokcancel(
+                title="Purge completed tasks",
+                message=f"Delete {len(task_ids)} completed tasks?"):
+            return
+
+        self.remove_shown_tasks(self.task_store.delete_many(task_ids))
+
+    def remove_shown_tasks(self, tasks: list) -> None:
+        """
+        Removes deleted tasks from the task list and from the selection,
+        redraws the task list once. Tasks in order are searched from
+        the end, where recently added tasks are, and only the part from
+        the first deleted task on is rebuilt, so undoing an add costs
+        as much as the number of tasks it added
+
+        Parameters
+        ----------
+        tasks : list
+            Deleted tasks
+
+        Returns
+        ----------
+        None
+        """
+
+        removed_task_ids: set = {task.task_id for task in tasks}
+        remaining_count: int = len(removed_task_ids)
+        first_index: int = len(self.tasks_in_order)
+
+        while remaining_count and first_index:
+            first_index -= 1
+
+            if self.tasks_in_order[first_index].task_id in removed_task_ids:
+                remaining_count -= 1
+
+        self.tasks_in_order[first_index:] = [
+            task for task in self.tasks_in_order[first_index:]
+            if task.task_id not in removed_task_ids
+        ]
+        self.task_list_view.selected_task_ids -= removed_task_ids
+
+        self.update_shown_tasks()
+
+    def show_changes(self, changes: dict) -> None:
+        """
+        Shows tasks changed by something other than the user's last 
+        action, like undo or another program. Added tasks are appended
+        to the tasks in order, the task list is redrawn once
+
+        Parameters
+        ----------
+        changes : dict
+            Added, edited, toggled and deleted tasks, keyed by "add", 
+            "edit", "toggle" and "delete". Undo and redo also give IDs
+            of tasks whose rules changed, keyed by "rules"
+
+        Returns
+        ----------
+        None
+        """
+
+        self.tasks_in_order.extend(changes["add"])
+
+        if changes["delete"]:
+            self.remove_shown_tasks(changes["delete"])
+        elif any(changes.values()):
+            self.update_shown_tasks()
+
+    def undo(self, event: Union[tk.Event, None] = None) -> None:
+        """
+        Reverses the latest change to tasks or recurrence rules, a
+        whole batch at once for bulk actions. Ignored while typing in a
+        text field
+
+        Parameters
+        ----------
+        event : tk.Event or None, default: None
+            A key press event that lets a user undoing with a keyboard
+            shortcut. Default is None
+
+        Returns
+        ----------
+        None
         """
-        Removes a task from tasks list, deletes task's frame
+
+        if event is not None and isinstance(event.widget, tk.Entry):
+            return
+
+        self.show_changes(self.undo_history.undo())
+
+    def redo(self, event: Union[tk.Event, None] = None) -> None:
+        """
+        Makes the latest undone change to tasks again. Ignored while 
+        typing in a text field
 
         Parameters
         ----------
-        checkbutton_variable : tk.IntVar
-            Its value is used to find task in tasks list
-        task_frame : tk.Frame
-            Task frame to delete
-        task_name_label : tk.Label
-            Its content is used to find task in tasks list
-        task_deadline_label : tk.Label
-            Its content is used to find task in tasks list
+        event : tk.Event or None, default: None
+            A key press event that lets a user redoing with a keyboard
+            shortcut. Default is None
 
         Returns
         ----------
         None
+        """
+
+        if event is not None and isinstance(event.widget, tk.Entry):
+            return
+
+        self.show_changes(self.undo_history.redo())
+
+    @staticmethod
+    def rpc_task_ids(params: dict) -> list:
+        """
+        Reads the task IDs an RPC method was called with
+
+        Parameters
+        ----------
+        params : dict
+            Parameters of the call, with "task_ids"
+
+        Returns
+        ----------
+        task_ids : list
+            IDs of the tasks, as strings
 
         Raises
         ----------
         ValueError
-            If there's no task with the entered name and deadline in 
-            tasks list
+            If task_ids is not a list of strings
         """
-        
-        if checkbutton_variable.get():
-            is_task_completed: bool = True
-        else:
-            is_task_completed: bool = False
 
-        task_entry: dict = {"task_name": task_name_label.cget("text"),
-                            "deadline": task_deadline_label.cget("text"),
-                            "completed": is_task_completed}
-        
-        try:
-            self.tasks_list.remove(task_entry)
-        except ValueError:
-            raise ValueError(f"{task_entry} not found in self.tasks_list")
-        
-        task_frame.pack_forget()
-        task_frame.destroy()
+        task_ids: object = params["task_ids"]
+
+        if not isinstance(task_ids, list) or not all(
+                isinstance(task_id, str) for task_id in task_ids):
+            raise ValueError("task_ids must be a list of strings")
+
+        return task_ids
+
+    def rpc_add_tasks(self, params: dict) -> dict:
+        """
+        RPC method that adds tasks as one batch. Tasks are validated
+        like imported tasks, and none is added if one is invalid
+
+        Parameters
+        ----------
+        params : dict
+            "tasks": list of tasks with task_name, deadline (%d-%m-%Y)
+            and optionally completed. Task IDs are always new
+
+        Returns
+        ----------
+        result : dict
+            "task_ids": IDs of the added tasks, in the given order
+
+        Raises
+        ----------
+        ValueError
+            If a task is invalid
+        """
+
+        if not isinstance(params["tasks"], list):
+            raise ValueError("tasks must be a list")
+
+        new_tasks: list = [
+            Task.from_dict(validate_task(row)) for row in params["tasks"]
+        ]
+        added_tasks: list = self.task_store.add_many(
+            (task.task_name, task.deadline, task.completed)
+            for task in new_tasks
+        )
+
+        self.tasks_in_order.extend(added_tasks)
+        self.rpc_changed_tasks = True
+
+        return {"task_ids": [task.task_id for task in added_tasks]}
+
+    def rpc_edit_tasks(self, params: dict) -> dict:
+        """
+        RPC method that changes names and deadlines of tasks as one
+        batch
+
+        Parameters
+        ----------
+        params : dict
+            "tasks": list of objects with task_id and the new task_name,
+            deadline (%d-%m-%Y) or both. Unknown IDs are skipped
+
+        Returns
+        ----------
+        result : dict
+            "task_ids": IDs of the tasks that changed
+
+        Raises
+        ----------
+        ValueError
+            If a new name or deadline is invalid
+        """
+
+        if not isinstance(params["tasks"], list):
+            raise ValueError("tasks must be a list")
+
+        changes: list = []
+
+        for row in params["tasks"]:
+            task: Union[Task, None] = self.task_store.tasks_by_id.get(
+                row["task_id"]
+            )
+            if task is None:
+                continue
+
+            edited: dict = validate_task({
+                "task_name": row.get("task_name", task.task_name),
+                "deadline": row.get("deadline", task.deadline_text())
+            })
+            changes.append((
+                task.task_id, edited["task_name"],
+                Task.from_dict(edited).deadline
+            ))
+
+        changed_tasks: list = self.task_store.edit_many(changes)
+        self.rpc_changed_tasks = True
+
+        return {"task_ids": [task.task_id for task in changed_tasks]}
+
+    def rpc_complete_tasks(self, params: dict) -> dict:
+        """
+        RPC method that marks tasks as finished or unfinished as one
+        batch. Like in the task list, finishing a recurring task moves
+        it to its next occurrence
+
+        Parameters
+        ----------
+        params : dict
+            "task_ids": IDs of the tasks, unknown IDs are skipped.
+            "completed": optional, false marks the tasks unfinished
+
+        Returns
+        ----------
+        result : dict
+            "task_ids": IDs of the tasks that changed
+
+        Raises
+        ----------
+        ValueError
+            If task_ids is not a list of strings or completed is not a
+            boolean
+        """
+
+        task_ids: list = self.rpc_task_ids(params)
+        completed: object = params.get("completed", True)
+
+        # Strings like "false" would be true
+        if not isinstance(completed, bool):
+            raise ValueError("completed must be true or false")
+
+        other_task_ids: list = task_ids
+
+        with self.undo_history.batch():
+            if completed:
+                other_task_ids = self.complete_recurring_tasks(task_ids)
+
+            changed_tasks: list = self.task_store.toggle_many(
+                task_ids=other_task_ids, completed=completed
+            )
+        self.rpc_changed_tasks = True
+
+        # Recurring tasks that moved to their next occurrence
+        other_task_id_set: set = set(other_task_ids)
+        moved_task_ids: list = [
+            task_id for task_id in task_ids
+            if task_id in self.recurrences and task_id in self.task_store
+            and task_id not in other_task_id_set
+        ]
+
+        return {"task_ids": [task.task_id for task in changed_tasks]
+                + moved_task_ids}
+
+    def rpc_delete_tasks(self, params: dict) -> dict:
+        """
+        RPC method that deletes tasks as one batch. Deleted tasks are
+        taken out of the task list once per drain
+
+        Parameters
+        ----------
+        params : dict
+            "task_ids": IDs of the tasks, unknown IDs are skipped
+
+        Returns
+        ----------
+        result : dict
+            "task_ids": IDs of the deleted tasks
+        """
+
+        deleted_tasks: list = self.task_store.delete_many(
+            self.rpc_task_ids(params)
+        )
+        self.rpc_deleted_tasks.extend(deleted_tasks)
+
+        return {"task_ids": [task.task_id for task in deleted_tasks]}
+
+    def rpc_query_tasks(self, params: dict) -> dict:
+        """
+        RPC method that returns one page of tasks, in the order they
+        were added. Tasks whose name contains a text are found with the
+        name index and tasks due in a range of days with the deadline
+        index, so only the tasks those find are checked and sorted
+
+        Parameters
+        ----------
+        params : dict
+            Optional filters "completed" (bool), "name_contains" (text
+            in the task name, ignoring case), "deadline_from" and
+            "deadline_to" (%d-%m-%Y, inclusive), and "offset" and
+            "limit" of the page, by default 0 and 100
+
+        Returns
+        ----------
+        result : dict
+            "total": number of matching tasks, "tasks": tasks of the
+            page in the JSON file format
+
+        Raises
+        ----------
+        ValueError
+            If a filter has an invalid value
+        """
+
+        offset: int = int(params.get("offset", 0))
+        limit: int = int(params.get("limit", 100))
+        if offset < 0 or limit < 0:
+            raise ValueError("offset and limit must not be negative")
+
+        deadline_range: list = []
+        for key, default in (("deadline_from", datetime.date.min),
+                             ("deadline_to", datetime.date.max)):
+            deadline_range.append(
+                datetime.datetime.strptime(params[key], "%d-%m-%Y").date()
+                if key in params else default
+            )
+        first_deadline, last_deadline = (
+            deadline.toordinal() for deadline in deadline_range
+        )
+
+        completed: Union[bool, None] = params.get("completed")
+        if completed is not None and not isinstance(completed, bool):
+            raise ValueError("completed must be true or false")
+
+        candidates: Union[Iterable[Task], None] = None
+        if params.get("name_contains"):
+            candidates = self.name_index.search(
+                params["name_contains"].casefold()
+            )
+        elif "deadline_from" in params or "deadline_to" in params:
+            candidates = DeadlineRange(
+                deadline_index=self.deadline_index,
+                open_only=completed is False,
+                first_deadline=first_deadline,
+                end_deadline=last_deadline + 1
+            )
+
+        tasks: Iterable[Task] = self.task_store
+        if candidates is not None:
+            task_positions: dict = self.task_store.task_positions
+            tasks = sorted(
+                candidates, key=lambda task: task_positions[task.task_id]
+            )
+
+        total: int = 0
+        page: list = []
+
+        for task in tasks:
+            if (completed is not None and task.completed != completed
+                    or not first_deadline <= task.deadline <= last_deadline):
+                continue
+
+            if offset <= total < offset + limit:
+                page.append(task.to_dict())
+            total += 1
+
+        return {"total": total, "tasks": page}
+
+    def finish_rpc_drain(self) -> None:
+        """
+        Redraws the task list once after the RPC server ran a batch of
+        calls, instead of once per call
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        if self.rpc_deleted_tasks:
+            deleted_tasks: list = self.rpc_deleted_tasks
+            self.rpc_deleted_tasks = []
+            self.rpc_changed_tasks = False
+            self.remove_shown_tasks(deleted_tasks)
+        elif self.rpc_changed_tasks:
+            self.rpc_changed_tasks = False
+            self.update_shown_tasks()
 
     def is_user_input_valid(
             self, task_name: str, deadline: datetime.date) -> bool:
@@ -769,101 +3012,106 @@ class TODO_App_GUI():
             
         return result
     
-    def remove_task_from_list(
-            self, 
-            task_name_label: tk.Label,
-            task_deadline_label: tk.Label,
-            is_task_completed: bool) -> int:
-        """
-        Removes a task from tasks list using task information provided 
-        as parameters. Removed task's index is returned.
+    def main(self) -> None:
+        # Started only now, since the window can't respond to anything
+        # before mainloop runs anyway
+        if self.stall_watchdog is not None:
+            self.stall_watchdog.start()
 
-        Parameters
-        ----------
-        task_name_label : tk.Label
-            tkinter label to get task name from. Used to find task in
-            tasks list.
-        task_deadline_label : tk.Label
-            tkinter label to get task deadline from. Used to find task
-            in tasks list.
-        is_task_completed : bool
-            Boolean variable that shows if a task is marked as finished
-            or unfinished. Used to find task in tasks list.
+        self.root.mainloop()
+    
 
-        Returns
-        ----------
-        removed_task_index : int
-            Used to insert a new task to the list at the removed task's 
-            index
+def run_command(arguments: argparse.Namespace) -> int:
+    """
+    Runs an import, export or stats command against the configured
+    storage backend without starting Tk
 
-        Raises
-        ----------
-        ValueError
-            If there's no task with the entered name and deadline in 
-            tasks list
-        """
-        
-        task_entry: dict = {"task_name": task_name_label.cget("text"),
-                            "deadline": task_deadline_label.cget("text"),
-                            "completed": is_task_completed}
-        
-        try:
-            removed_task_index: int = self.tasks_list.index(task_entry)
-            self.tasks_list.remove(task_entry)
-        except ValueError:
-            raise ValueError(f"{task_entry} not found in self.tasks_list")
-        
-        return removed_task_index
-    
-    def insert_task_to_list(
-            self,
-            task_name_label: tk.Label,
-            task_deadline_label: tk.Label,
-            is_task_completed: bool,
-            index_to_insert: int) -> None:
-        """
-        Inserts a task to tasks list using task information and index
-        provided as parameters.
+    Parameters
+    ----------
+    arguments : argparse.Namespace
+        Parsed command line arguments
 
-        Parameters
-        ----------
-        task_name_label : tk.Label
-            tkinter label to get task name from. Used to create new task 
-            for tasks list.
-        task_deadline_label : tk.Label
-            tkinter label to get task deadline from. Used to create new 
-            task for tasks list.
-        is_task_completed : bool
-            Boolean variable that shows if a task is marked as finished
-            or unfinished. Used to create new task for tasks list.
-        index_to_insert : int
-            Used to update a task at that index.
+    Returns
+    ----------
+    exit_status : int
+        Exit status of the command
+    """
 
-        Returns
-        ----------
-        None
+    import task_cli
 
-        Raises
-        ----------
-        ValueError
-            If there's no task with the entered name and deadline in 
-            tasks list
-        """
-        
-        task_entry: dict = {"task_name": task_name_label.cget("text"),
-                            "deadline": task_deadline_label.cget("text"),
-                            "completed": is_task_completed}
-        
-        try:
-            self.tasks_list.insert(index_to_insert, task_entry)
-        except ValueError:
-            raise ValueError(f"{task_entry} not found in self.tasks_list")
+    current_dir: str = os.path.dirname(__file__)
+    config_dict, _ = load_config(
+        yaml_dir=os.path.join(current_dir, "todo_app_config.yaml"),
+        cache_dir=os.path.join(
+            current_dir, "__pycache__", "todo_app_config.cache"
+        )
+    )
+    task_storage = create_task_storage(
+        config_dict=config_dict, current_dir=current_dir
+    )
 
-    def main(self) -> None:
-        self.root.mainloop()
-    
+    try:
+        if arguments.command == "stats":
+            return task_cli.run_stats(task_storage=task_storage)
+
+        file_format: str = arguments.format or (
+            "csv" if arguments.file.lower().endswith(".csv") else "ndjson"
+        )
+
+        if arguments.command == "import":
+            return task_cli.run_import(
+                task_storage=task_storage, input_dir=arguments.file,
+                file_format=file_format, batch_size=arguments.batch_size
+            )
+
+        return task_cli.run_export(
+            task_storage=task_storage, output_dir=arguments.file,
+            file_format=file_format, batch_size=arguments.batch_size
+        )
+    finally:
+        task_storage.close()
 
 if __name__ == "__main__":
-    application = TODO_App_GUI()
+    argument_parser = argparse.ArgumentParser(
+        description="TODO application developed with Python and Tkinter"
+    )
+    argument_parser.add_argument(
+        "--startup-profile", action="store_true",
+        help="print how long imports, config, Tk init and loading tasks "
+             "took once all tasks are loaded"
+    )
+
+    subparsers = argument_parser.add_subparsers(
+        dest="command",
+        help="run a command instead of starting the application"
+    )
+
+    for command, help_text in (
+            ("import", "add tasks in an NDJSON or CSV file to stored tasks"),
+            ("export", "write stored tasks to an NDJSON or CSV file")):
+        command_parser = subparsers.add_parser(command, help=help_text)
+        command_parser.add_argument(
+            "file", help='path of the file, "-" for standard input/output'
+        )
+        command_parser.add_argument(
+            "--format", choices=("ndjson", "csv"),
+            help="file format, by default csv for .csv files and ndjson "
+                 "for others"
+        )
+        command_parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="number of tasks saved or written at a time"
+        )
+
+    subparsers.add_parser(
+        "stats", help="print the number of stored, finished and due tasks"
+    )
+
+    arguments = argument_parser.parse_args()
+
+    if arguments.command is not None:
+        sys.exit(run_command(arguments))
+
+    application = TODO_App_GUI(startup_profile=arguments.startup_profile)
 
-    application.main()
\ No newline at end of file
+    application.main()
@@ -0,0 +1,891 @@
+"""
+Recurring tasks.
+
+A recurring task is an ordinary task of the task store whose deadline
+is its next unfinished occurrence, together with a recurrence rule
+kept by RecurrenceStore under the task's ID. Finishing that occurrence
+moves the deadline to the next one instead of completing the task, so
+a series is one task and one rule however far it extends. Later
+occurrences are never stored. RecurringRange generates the ones due in
+the days a view shows and merges them into the view's deadline range.
+Occurrences finished out of order are kept as exceptions of the rule,
+which are dropped once the task's deadline moves past them.
+"""
+
+import json
+import heapq
+import bisect
+import calendar
+import datetime
+
+from deadline_index import DeadlineRange
+from task_journal import VersionFile, write_file_atomically
+from task_storage import deadline_to_ordinal, ordinal_to_deadline
+from task_store import Task, TaskStore
+from typing import Callable, Iterable, Iterator, Union
+
+FREQUENCIES: tuple = ("daily", "weekly", "monthly")
+
+# Separates the task ID from the deadline in IDs of generated
+# occurrences. Stored task IDs may include it too, since imported tasks
+# keep their IDs, so occurrence IDs are never parsed. RecurringRange
+# keeps the task and deadline of each occurrence it generated instead
+OCCURRENCE_SEPARATOR: str = ":"
+
+
+def occurrence_id(task_id: str, deadline: int) -> str:
+    return f"{task_id}{OCCURRENCE_SEPARATOR}{deadline}"
+
+
+class RecurrenceRule():
+    """
+    How often a task recurs. Occurrences are found with arithmetic on
+    their number, so finding the first one after a day costs the same
+    however many came before it.
+    """
+
+    __slots__ = ("start", "frequency", "interval", "until")
+
+    def __init__(
+            self,
+            start: int,
+            frequency: str,
+            interval: int = 1,
+            until: Union[int, None] = None) -> None:
+        """
+        Parameters
+        ----------
+        start : int
+            Date ordinal of the first occurrence, which later ones are
+            counted from
+        frequency : str
+            "daily", "weekly" or "monthly"
+        interval : int, default: 1
+            Number of days, weeks or months between occurrences
+        until : int or None, default: None
+            Date ordinal of the last day an occurrence may fall on,
+            None if the task recurs forever
+
+        Raises
+        ----------
+        ValueError
+            If frequency is unknown or interval is less than 1
+        """
+
+        if frequency not in FREQUENCIES:
+            raise ValueError(f"Unknown frequency {frequency}")
+
+        if not isinstance(interval, int) or interval < 1:
+            raise ValueError("interval must be a positive integer")
+
+        self.start = start
+        self.frequency = frequency
+        self.interval = interval
+        self.until = until
+
+    @classmethod
+    def from_dict(cls, rule_entry: dict) -> "RecurrenceRule":
+        until: Union[int, None] = None
+        if rule_entry.get("until"):
+            until = deadline_to_ordinal(rule_entry["until"])
+
+        return cls(
+            start=deadline_to_ordinal(rule_entry["start"]),
+            frequency=rule_entry["frequency"],
+            interval=rule_entry.get("interval", 1),
+            until=until
+        )
+
+    def to_dict(self) -> dict:
+        until: Union[str, None] = None
+        if self.until is not None:
+            until = ordinal_to_deadline(self.until)
+
+        return {"start": ordinal_to_deadline(self.start),
+                "frequency": self.frequency, "interval": self.interval,
+                "until": until}
+
+    def occurrence(self, number: int) -> int:
+        """
+        Returns the deadline of an occurrence
+
+        Parameters
+        ----------
+        number : int
+            Number of the occurrence, 0 for the first one
+
+        Returns
+        ----------
+        deadline : int
+            Date ordinal of the occurrence. Monthly occurrences fall on
+            the last day of months shorter than the first occurrence's
+            day
+        """
+
+        if self.frequency == "daily":
+            return self.start + number * self.interval
+
+        if self.frequency == "weekly":
+            return self.start + number * self.interval * 7
+
+        start_date: datetime.date = datetime.date.fromordinal(self.start)
+        month_index: int = start_date.month - 1 + number * self.interval
+        year: int = start_date.year + month_index // 12
+        month: int = month_index % 12 + 1
+        day: int = min(start_date.day, calendar.monthrange(year, month)[1])
+
+        return datetime.date(year, month, day).toordinal()
+
+    def first_number_from(self, first_day: int) -> int:
+        """
+        Returns the number of the first occurrence on or after a day
+
+        Parameters
+        ----------
+        first_day : int
+            Date ordinal of the day
+
+        Returns
+        ----------
+        number : int
+            Number of the occurrence, 0 if first_day is before start
+        """
+
+        if first_day <= self.start:
+            return 0
+
+        if self.frequency != "monthly":
+            step: int = self.interval * (7 if self.frequency == "weekly"
+                                         else 1)
+
+            return -((self.start - first_day) // step)
+
+        start_date: datetime.date = datetime.date.fromordinal(self.start)
+        first_date: datetime.date = datetime.date.fromordinal(first_day)
+        months: int = ((first_date.year - start_date.year) * 12
+                       + first_date.month - start_date.month)
+        number: int = max(months // self.interval, 0)
+
+        # Shortened months can put the estimate an occurrence early
+        while self.occurrence(number=number) < first_day:
+            number += 1
+
+        return number
+
+    def occurrences(self, first_day: int, end_day: int) -> Iterator[int]:
+        """
+        Generates the deadlines of occurrences in a range of days
+
+        Parameters
+        ----------
+        first_day : int
+            Date ordinal of the first day of the range
+        end_day : int
+            Date ordinal of the day after the range
+
+        Returns
+        ----------
+        deadlines : Iterator[int]
+            Yields date ordinals of occurrences, earliest first
+        """
+
+        if self.until is not None:
+            end_day = min(end_day, self.until + 1)
+
+        number: int = self.first_number_from(first_day=first_day)
+        deadline: int = self.occurrence(number=number)
+
+        while deadline < end_day:
+            yield deadline
+
+            number += 1
+            deadline = self.occurrence(number=number)
+
+
+class RecurrenceStore():
+    """
+    Recurrence rules of tasks, keyed by task ID, and the occurrences of
+    each task finished ahead of its deadline. Rules are saved to their
+    own JSON file, which holds one entry per recurring task.
+
+    Several app instances can share the file. Like task saves, a save
+    locks a version file next to it while writing, and merges by task
+    ID: only the entries of tasks whose rules changed since the last
+    save are written over the stored ones, so rules other instances
+    changed for other tasks are kept. If two instances change the rule
+    of the same task, the later save wins.
+
+    on_task_changed has to be added to the task store's listeners. It
+    keeps the rules of deleted tasks in memory, so undoing a deletion
+    makes the task recur again. Functions added with add_listener are
+    called after every change that has to be saved, like a finished
+    occurrence, which doesn't change the task store. They get the IDs of
+    the tasks whose rules changed and the rules' states before the
+    change, which are None for changes that follow changes of tasks.
+    """
+
+    def __init__(self, rules_dir: str) -> None:
+        """
+        Parameters
+        ----------
+        rules_dir : str
+            Path of the JSON file rules are saved to
+        """
+
+        self.rules_dir = rules_dir
+        self.version_file = VersionFile(f"{rules_dir}.lock")
+
+        self.rules: dict = {}
+        self.exceptions: dict = {}
+        self.removed_rules: dict = {}
+
+        # Increased by every change to rules or recurring tasks, so
+        # generated occurrences are only generated again after changes
+        self.version: int = 0
+        # IDs of tasks whose rules changed since the last save
+        self.unsaved_task_ids: set = set()
+        # Version of the file the rules were read at. Written by the
+        # autosave thread
+        self.loaded_file_version: int = 0
+
+        self.listeners: list = []
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self.rules
+
+    def read_rule_entries(self) -> dict:
+        """
+        Reads the JSON file. A missing file means there are no
+        recurring tasks
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        rule_entries : dict
+            Rules in the JSON file format, keyed by task ID
+        """
+
+        try:
+            with open(self.rules_dir, "r") as rules_file:
+                return json.load(rules_file)
+        except FileNotFoundError:
+            return {}
+
+    def rule_entry(self, task_id: str) -> Union[dict, None]:
+        rule: Union[RecurrenceRule, None] = self.rules.get(task_id)
+
+        if rule is None:
+            return None
+
+        rule_entry: dict = rule.to_dict()
+        rule_entry["exceptions"] = [
+            ordinal_to_deadline(deadline)
+            for deadline in sorted(self.exceptions[task_id])
+        ]
+
+        return rule_entry
+
+    def rule_state(self, task_id: str) -> Union[tuple, None]:
+        """
+        Returns the rule and finished occurrences of a task, also of a
+        deleted task
+
+        Parameters
+        ----------
+        task_id : str
+            Unique ID of the task
+
+        Returns
+        ----------
+        state : tuple or None
+            The task's RecurrenceRule and a frozenset of date ordinals
+            of its exceptions, None if the task doesn't recur
+        """
+
+        if task_id in self.removed_rules:
+            rule, exceptions = self.removed_rules[task_id]
+        elif task_id in self.rules:
+            rule, exceptions = self.rules[task_id], self.exceptions[task_id]
+        else:
+            return None
+
+        return rule, frozenset(exceptions)
+
+    def restore_rule_states(
+            self,
+            task_ids: Iterable[str],
+            states: Iterable[Union[tuple, None]]) -> None:
+        """
+        Gives tasks the rules and finished occurrences they had, like
+        when a change is undone
+
+        Parameters
+        ----------
+        task_ids : Iterable[str]
+            Unique IDs of the tasks
+        states : Iterable[tuple or None]
+            States returned by rule_state, in the order of task_ids
+
+        Returns
+        ----------
+        None
+        """
+
+        previous_states: list = []
+        changed_task_ids: list = []
+
+        for task_id, state in zip(task_ids, states):
+            previous_states.append(self.rule_state(task_id))
+            changed_task_ids.append(task_id)
+
+            if task_id in self.removed_rules:
+                if state is None:
+                    del self.removed_rules[task_id]
+                else:
+                    self.removed_rules[task_id] = (state[0], set(state[1]))
+            elif state is None:
+                self.rules.pop(task_id, None)
+                self.exceptions.pop(task_id, None)
+            else:
+                self.rules[task_id] = state[0]
+                self.exceptions[task_id] = set(state[1])
+
+        if changed_task_ids:
+            self.mark_changed(changed_task_ids, previous_states)
+
+    def load(self) -> None:
+        """
+        Reads rules saved to the JSON file. Rules of tasks with unsaved
+        changes are kept as they are, so it can also be called again
+        after another program changed the file
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        file_version: int = self.version_file.read()
+        rule_entries: dict = self.read_rule_entries()
+
+        for task_id in set(self.rules) - set(rule_entries):
+            if task_id not in self.unsaved_task_ids:
+                del self.rules[task_id]
+                del self.exceptions[task_id]
+
+        for task_id, rule_entry in rule_entries.items():
+            if task_id in self.unsaved_task_ids:
+                continue
+
+            self.removed_rules.pop(task_id, None)
+            self.rules[task_id] = RecurrenceRule.from_dict(rule_entry)
+            self.exceptions[task_id] = {
+                deadline_to_ordinal(deadline)
+                for deadline in rule_entry.get("exceptions", ())
+            }
+
+        self.loaded_file_version = max(
+            self.loaded_file_version, file_version
+        )
+        self.version += 1
+
+    def prepare_save(self) -> Union[Callable[[], bool], None]:
+        """
+        Takes the rules changed since the last save as they are now,
+        returns a function that saves them. The returned function may
+        be called from another thread
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        save_job : Callable[[], bool] or None
+            Function that saves and returns what save returns, or None
+            if nothing changed since the last save
+        """
+
+        if not self.unsaved_task_ids:
+            return None
+
+        changed_entries: dict = {
+            task_id: self.rule_entry(task_id)
+            for task_id in self.unsaved_task_ids
+        }
+        self.unsaved_task_ids = set()
+
+        return lambda: self.save(changed_entries)
+
+    def save(self, changed_entries: dict) -> bool:
+        """
+        Writes changed rules over the stored ones while holding the
+        lock. Stored rules of other tasks are kept
+
+        Parameters
+        ----------
+        changed_entries : dict
+            Rules in the JSON file format, None for tasks that no
+            longer recur, keyed by task ID
+
+        Returns
+        ----------
+        changed_elsewhere : bool
+            True if another process had saved since the rules were
+            read
+        """
+
+        with self.version_file.locked() as file_version:
+            rule_entries: dict = self.read_rule_entries()
+
+            for task_id, rule_entry in changed_entries.items():
+                if rule_entry is None:
+                    rule_entries.pop(task_id, None)
+                else:
+                    rule_entries[task_id] = rule_entry
+
+            write_file_atomically(
+                file_dir=self.rules_dir,
+                write_contents=lambda rules_file: json.dump(
+                    rule_entries, rules_file
+                )
+            )
+            self.version_file.write(file_version + 1)
+
+        # Other processes' changes are only in memory once they are
+        # loaded
+        changed_elsewhere: bool = file_version != self.loaded_file_version
+        if not changed_elsewhere:
+            self.loaded_file_version = file_version + 1
+
+        return changed_elsewhere
+
+    def add_listener(
+            self,
+            listener: Callable[[list, Union[list, None]], None]) -> None:
+        self.listeners.append(listener)
+
+    def mark_changed(
+            self,
+            task_ids: list,
+            previous_states: Union[list, None] = None) -> None:
+        self.version += 1
+        self.unsaved_task_ids.update(task_ids)
+
+        for listener in self.listeners:
+            listener(task_ids, previous_states)
+
+    def set_rule(
+            self,
+            task_id: str,
+            rule: Union[RecurrenceRule, None]) -> None:
+        """
+        Makes a task recur, or stop recurring. Nothing changes if the
+        task already has the same rule
+
+        Parameters
+        ----------
+        task_id : str
+            Unique ID of the task
+        rule : RecurrenceRule or None
+            New rule of the task, None to stop it from recurring
+
+        Returns
+        ----------
+        None
+        """
+
+        previous_state: Union[tuple, None] = self.rule_state(task_id)
+
+        if (rule is not None and task_id in self.rules
+                and rule.to_dict() == self.rules[task_id].to_dict()):
+            return
+
+        if rule is None:
+            if task_id not in self.rules:
+                return
+
+            del self.rules[task_id]
+            del self.exceptions[task_id]
+        else:
+            self.rules[task_id] = rule
+            self.exceptions.setdefault(task_id, set())
+
+        self.mark_changed([task_id], [previous_state])
+
+    def on_task_changed(
+            self,
+            operation: str,
+            tasks: list,
+            previous_states: list) -> None:
+        """
+        Drops the rules of deleted tasks, brings them back when the
+        tasks are added again. Added to TaskStore as a listener
+
+        Parameters
+        ----------
+        operation : str
+            "add", "edit", "toggle" or "delete"
+        tasks : list
+            Changed tasks
+        previous_states : list
+            Tasks' states before the change, None for added tasks
+
+        Returns
+        ----------
+        None
+        """
+
+        changed_rule_ids: list = []
+        tasks_changed: bool = False
+
+        for task in tasks:
+            task_id: str = task.task_id
+
+            if operation == "delete" and task_id in self.rules:
+                self.removed_rules[task_id] = (
+                    self.rules.pop(task_id), self.exceptions.pop(task_id)
+                )
+                changed_rule_ids.append(task_id)
+            elif operation == "add" and task_id in self.removed_rules:
+                self.rules[task_id], self.exceptions[task_id] = (
+                    self.removed_rules.pop(task_id)
+                )
+                changed_rule_ids.append(task_id)
+            elif task_id in self.rules:
+                tasks_changed = True
+
+        if changed_rule_ids:
+            self.mark_changed(changed_rule_ids)
+        elif tasks_changed:
+            self.version += 1
+
+    def next_deadline(self, task: Task, after: int) -> Union[int, None]:
+        """
+        Returns the deadline of the first unfinished occurrence of a
+        recurring task after a day. Exceptions before it are dropped,
+        since the task's deadline is about to move past them
+
+        Parameters
+        ----------
+        task : Task
+            Recurring task
+        after : int
+            Date ordinal of the day
+
+        Returns
+        ----------
+        deadline : int or None
+            Date ordinal of the occurrence, None if the task doesn't
+            recur after the day
+        """
+
+        rule: RecurrenceRule = self.rules[task.task_id]
+        exceptions: set = self.exceptions[task.task_id]
+        first_day: int = after + 1
+
+        while True:
+            deadline: Union[int, None] = next(
+                rule.occurrences(
+                    first_day=first_day,
+                    end_day=datetime.date.max.toordinal()
+                ),
+                None
+            )
+
+            if deadline is None or deadline not in exceptions:
+                break
+
+            first_day = deadline + 1
+
+        passed_exceptions: set = {
+            exception for exception in exceptions
+            if deadline is None or exception < deadline
+        }
+        if passed_exceptions:
+            previous_state: tuple = self.rule_state(task.task_id)
+            exceptions -= passed_exceptions
+            self.mark_changed([task.task_id], [previous_state])
+
+        return deadline
+
+    def set_occurrence_completed(
+            self,
+            task_id: str,
+            deadline: int,
+            completed: bool) -> None:
+        """
+        Marks an occurrence after the task's deadline as finished or
+        unfinished, leaving the task and its other occurrences as they
+        are
+
+        Parameters
+        ----------
+        task_id : str
+            Unique ID of the recurring task
+        deadline : int
+            Date ordinal of the occurrence
+        completed : bool
+            True if the occurrence is marked as finished
+
+        Returns
+        ----------
+        None
+        """
+
+        exceptions: set = self.exceptions[task_id]
+
+        if completed == (deadline in exceptions):
+            return
+
+        previous_state: tuple = self.rule_state(task_id)
+
+        if completed:
+            exceptions.add(deadline)
+        else:
+            exceptions.discard(deadline)
+
+        self.mark_changed([task_id], [previous_state])
+
+    def occurrences(
+            self,
+            task: Task,
+            first_day: int,
+            end_day: int) -> Iterator[Task]:
+        """
+        Generates the unfinished occurrences of a recurring task in a
+        range of days, after the task's own deadline. The occurrence
+        on the deadline is the task itself
+
+        Parameters
+        ----------
+        task : Task
+            Recurring task
+        first_day : int
+            Date ordinal of the first day of the range
+        end_day : int
+            Date ordinal of the day after the range
+
+        Returns
+        ----------
+        occurrences : Iterator[Task]
+            Yields tasks that aren't in the task store, with IDs made
+            by occurrence_id
+        """
+
+        if task.completed:
+            return
+
+        exceptions: set = self.exceptions[task.task_id]
+
+        for deadline in self.rules[task.task_id].occurrences(
+                first_day=max(first_day, task.deadline + 1),
+                end_day=end_day):
+            if deadline not in exceptions:
+                yield Task(
+                    task_id=occurrence_id(task.task_id, deadline),
+                    task_name=task.task_name, deadline=deadline
+                )
+
+
+class RecurringRange():
+    """
+    A DeadlineRange with the generated occurrences of recurring tasks
+    in its days merged in, as a read-only sequence. Occurrences are
+    generated again only after recurring tasks or rules changed, and
+    follow tasks due on the same day. Like DeadlineRange, positions are
+    found with binary searches on every access, so the cost of an
+    access depends on the number of occurrences in the range, not on
+    the number of tasks or how far the series extend.
+    """
+
+    def __init__(
+            self,
+            deadline_range: DeadlineRange,
+            recurrences: RecurrenceStore,
+            task_store: TaskStore) -> None:
+        """
+        Parameters
+        ----------
+        deadline_range : DeadlineRange
+            Range of unfinished tasks with a first and an end deadline
+        recurrences : RecurrenceStore
+            Rules of recurring tasks
+        task_store : TaskStore
+            Store the recurring tasks are in
+        """
+
+        self.deadline_range = deadline_range
+        self.recurrences = recurrences
+        self.task_store = task_store
+
+        self.occurrence_tasks: list = []
+        # Recurring task ID and deadline of each generated occurrence,
+        # keyed by the occurrence's ID
+        self.occurrence_ids: dict = {}
+        self.occurrences_version: Union[int, None] = None
+
+    def current_occurrences(self) -> list:
+        if self.occurrences_version == self.recurrences.version:
+            return self.occurrence_tasks
+
+        occurrence_tasks: list = []
+        occurrence_ids: dict = {}
+
+        for task_id in self.recurrences.rules:
+            task: Union[Task, None] = self.task_store.tasks_by_id.get(task_id)
+
+            if task is None:
+                continue
+
+            for occurrence in self.recurrences.occurrences(
+                    task=task,
+                    first_day=self.deadline_range.first_deadline,
+                    end_day=self.deadline_range.end_deadline):
+                occurrence_tasks.append(occurrence)
+                occurrence_ids[occurrence.task_id] = (
+                    task_id, occurrence.deadline
+                )
+
+        occurrence_tasks.sort(key=lambda task: task.deadline)
+
+        self.occurrence_tasks = occurrence_tasks
+        self.occurrence_ids = occurrence_ids
+        self.occurrences_version = self.recurrences.version
+
+        return occurrence_tasks
+
+    def find_occurrence(self, task_id: str) -> Union[tuple, None]:
+        """
+        Looks up a generated occurrence by its ID. IDs of tasks in the
+        task store are never taken for occurrence IDs
+
+        Parameters
+        ----------
+        task_id : str
+            ID of a task shown in the range
+
+        Returns
+        ----------
+        occurrence : tuple or None
+            ID of the recurring task and deadline of the occurrence as
+            a date ordinal, None if the ID isn't the ID of an occurrence
+            generated by the range
+        """
+
+        if task_id in self.task_store:
+            return None
+
+        return self.occurrence_ids.get(task_id)
+
+    def bounds(self) -> tuple:
+        """
+        Returns the entries of the deadline range, the generated
+        occurrences and where each occurrence is in the merged sequence
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        entries : list
+            Sorted entries of the deadline index
+        start : int
+            Position of the first entry in the deadline range
+        stop : int
+            Position after the last entry in the deadline range
+        occurrence_tasks : list
+            Generated occurrences, earliest first
+        positions : list
+            Index of each occurrence in the merged sequence
+        """
+
+        entries, start, stop = self.deadline_range.bounds()
+        occurrence_tasks: list = self.current_occurrences()
+
+        positions: list = [
+            number + bisect.bisect_left(
+                entries, (task.deadline + 1,), start, stop
+            ) - start
+            for number, task in enumerate(occurrence_tasks)
+        ]
+
+        return entries, start, stop, occurrence_tasks, positions
+
+    def select(self, tasks: Iterable[Task]) -> list:
+        """
+        Returns the given tasks that are in this range, with the
+        generated occurrences of the recurring ones among them, in the
+        order the range shows them
+
+        Parameters
+        ----------
+        tasks : Iterable[Task]
+            Tasks indexed by the deadline index, like search results
+
+        Returns
+        ----------
+        selected_tasks : list
+            Tasks and occurrences in the range, earliest deadline first
+        """
+
+        tasks = list(tasks)
+        occurrence_tasks: list = self.current_occurrences()
+
+        if not occurrence_tasks:
+            return self.deadline_range.select(tasks)
+
+        selected_task_ids: set = {task.task_id for task in tasks}
+        selected_occurrences: list = [
+            occurrence for occurrence in occurrence_tasks
+            if self.occurrence_ids[occurrence.task_id][0] in selected_task_ids
+        ]
+
+        # Occurrences follow tasks due on the same day
+        return list(heapq.merge(
+            self.deadline_range.select(tasks), selected_occurrences,
+            key=lambda task: task.deadline
+        ))
+
+    def __len__(self) -> int:
+        _, start, stop, occurrence_tasks, _ = self.bounds()
+
+        return stop - start + len(occurrence_tasks)
+
+    def __getitem__(self, index: int) -> Task:
+        entries, start, stop, occurrence_tasks, positions = self.bounds()
+        length: int = stop - start + len(occurrence_tasks)
+
+        if index < 0:
+            index += length
+
+        if not 0 <= index < length:
+            raise IndexError("RecurringRange index out of range")
+
+        number: int = bisect.bisect_left(positions, index)
+
+        if number < len(positions) and positions[number] == index:
+            return occurrence_tasks[number]
+
+        return entries[start + index - number][2]
+
+    def __iter__(self) -> Iterator[Task]:
+        entries, start, stop, occurrence_tasks, positions = self.bounds()
+        number: int = 0
+
+        for index in range(stop - start + len(occurrence_tasks)):
+            if number < len(positions) and positions[number] == index:
+                yield occurrence_tasks[number]
+                number += 1
+            else:
+                yield entries[start + index - number][2]
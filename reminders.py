@@ -0,0 +1,292 @@
+"""
+Reminders for tasks that fall due.
+
+ReminderScheduler keeps unfinished tasks with a deadline still ahead in
+a min-heap ordered by deadline and arms a single root.after timer for
+the earliest one, so nothing runs between reminders no matter how many
+tasks there are. Changed tasks are pushed to the heap again instead of
+being searched for, and entries of tasks that changed since are skipped
+when they reach the top.
+"""
+
+import time
+import heapq
+import datetime
+import tkinter as tk
+
+from task_store import Task
+from typing import Callable, Iterable, Union
+
+# Longest time a timer is armed for. Timers for later reminders wake up
+# after this time and arm again, so changes of the system clock or the
+# computer sleeping don't delay reminders by more than this
+MAX_TIMER_DELAY: int = 3600 * 1000
+
+
+class ReminderScheduler():
+    def __init__(
+            self,
+            root: tk.Tk,
+            on_due: Callable[[list], None],
+            reminder_time: datetime.time) -> None:
+        """
+        Parameters
+        ----------
+        root : tk.Tk
+            Main window, used to arm the timer
+        on_due : Callable[[list], None]
+            Called with the tasks that fell due, in deadline order
+        reminder_time : datetime.time
+            Time of day on the deadline at which a task falls due
+        """
+
+        self.root = root
+        self.on_due = on_due
+        self.reminder_time = reminder_time
+
+        # Heap entries are (deadline, sequence, task_id). An entry is
+        # current only while scheduled maps task_id to the same
+        # deadline and sequence
+        self.heap: list = []
+        self.scheduled: dict = {}
+        self.stale_entries_count: int = 0
+        self.next_sequence: int = 0
+
+        self.timer_id: Union[str, None] = None
+        self.armed_due_time: Union[float, None] = None
+
+    def due_time(self, deadline: int) -> float:
+        return datetime.datetime.combine(
+            datetime.date.fromordinal(deadline), self.reminder_time
+        ).timestamp()
+
+    def first_upcoming_deadline(self) -> int:
+        """
+        Returns the earliest deadline whose reminder time hasn't passed
+        yet
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        deadline : int
+            Date ordinal of today, or of tomorrow if today's reminder
+            time has passed
+        """
+
+        today: int = datetime.date.today().toordinal()
+
+        if self.due_time(today) > time.time():
+            return today
+
+        return today + 1
+
+    def rebuild(self, tasks: Iterable[Task]) -> None:
+        """
+        Replaces scheduled reminders with reminders of the given tasks.
+        Tasks that are finished or whose reminder time has passed are
+        left out
+
+        Parameters
+        ----------
+        tasks : Iterable[Task]
+            All tasks
+
+        Returns
+        ----------
+        None
+        """
+
+        first_deadline: int = self.first_upcoming_deadline()
+
+        self.heap = []
+        self.scheduled = {}
+        self.stale_entries_count = 0
+
+        for task in tasks:
+            if task.completed or task.deadline < first_deadline:
+                continue
+
+            entry: tuple = (task.deadline, self.next_sequence, task.task_id)
+            self.next_sequence += 1
+            self.heap.append(entry)
+            self.scheduled[task.task_id] = (task.deadline, entry[1], task)
+
+        heapq.heapify(self.heap)
+
+        self.arm()
+
+    def schedule(self, task: Task) -> None:
+        """
+        Schedules the reminder of a task, replacing its earlier one. The
+        timer is only armed again if the task is due before the reminder
+        it is armed for
+
+        Parameters
+        ----------
+        task : Task
+            Unfinished task
+
+        Returns
+        ----------
+        None
+        """
+
+        scheduled_entry: Union[tuple, None] = self.scheduled.get(task.task_id)
+
+        if scheduled_entry is not None and scheduled_entry[0] == task.deadline:
+            return
+
+        self.unschedule(task.task_id)
+
+        if task.deadline < self.first_upcoming_deadline():
+            return
+
+        entry: tuple = (task.deadline, self.next_sequence, task.task_id)
+        self.next_sequence += 1
+        heapq.heappush(self.heap, entry)
+        self.scheduled[task.task_id] = (task.deadline, entry[1], task)
+
+        if (self.armed_due_time is None
+                or self.due_time(task.deadline) < self.armed_due_time):
+            self.arm()
+
+    def unschedule(self, task_id: str) -> None:
+        """
+        Cancels the reminder of a task. Its heap entry is left in place
+        and skipped later, and the heap is rebuilt once most of its
+        entries are cancelled ones
+
+        Parameters
+        ----------
+        task_id : str
+            Unique ID of the task
+
+        Returns
+        ----------
+        None
+        """
+
+        if self.scheduled.pop(task_id, None) is None:
+            return
+
+        self.stale_entries_count += 1
+
+        if self.stale_entries_count > max(len(self.scheduled), 1024):
+            self.heap = [
+                (deadline, sequence, scheduled_task_id)
+                for scheduled_task_id, (deadline, sequence, _)
+                in self.scheduled.items()
+            ]
+            heapq.heapify(self.heap)
+            self.stale_entries_count = 0
+
+    def on_task_changed(
+            self,
+            operation: str,
+            tasks: list,
+            previous_states: list) -> None:
+        """
+        Updates reminders after tasks changed. Added to TaskStore as a
+        listener
+
+        Parameters
+        ----------
+        operation : str
+            "add", "edit", "toggle" or "delete"
+        tasks : list
+            Changed tasks
+        previous_states : list
+            Tasks' states before the change, None for added tasks
+
+        Returns
+        ----------
+        None
+        """
+
+        for task in tasks:
+            if operation == "delete" or task.completed:
+                self.unschedule(task.task_id)
+            else:
+                self.schedule(task)
+
+    def is_current(self, entry: tuple) -> bool:
+        scheduled_entry: Union[tuple, None] = self.scheduled.get(entry[2])
+
+        return (scheduled_entry is not None
+                and scheduled_entry[:2] == entry[:2])
+
+    def arm(self) -> None:
+        """
+        Arms the timer for the earliest scheduled reminder, or cancels
+        it if there is none. Cancelled entries at the top of the heap
+        are dropped first
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        while self.heap and not self.is_current(self.heap[0]):
+            heapq.heappop(self.heap)
+            self.stale_entries_count -= 1
+
+        if self.timer_id is not None:
+            self.root.after_cancel(self.timer_id)
+            self.timer_id = None
+            self.armed_due_time = None
+
+        if not self.heap:
+            return
+
+        self.armed_due_time = self.due_time(self.heap[0][0])
+        delay: int = int((self.armed_due_time - time.time()) * 1000)
+
+        self.timer_id = self.root.after(
+            min(max(delay, 0), MAX_TIMER_DELAY), self.fire
+        )
+
+    def fire(self) -> None:
+        """
+        Timer callback. Passes the tasks whose reminder time has come to
+        on_due, arms the timer for the next reminder
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        self.timer_id = None
+        self.armed_due_time = None
+
+        now: float = time.time()
+        due_tasks: list = []
+
+        while self.heap and self.due_time(self.heap[0][0]) <= now:
+            entry: tuple = heapq.heappop(self.heap)
+
+            if not self.is_current(entry):
+                self.stale_entries_count -= 1
+                continue
+
+            due_tasks.append(self.scheduled.pop(entry[2])[2])
+
+        self.arm()
+
+        if due_tasks:
+            self.on_due(due_tasks)
+
+    def close(self) -> None:
+        if self.timer_id is not None:
+            self.root.after_cancel(self.timer_id)
+            self.timer_id = None
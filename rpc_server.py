@@ -0,0 +1,747 @@
+"""
+Local JSON-RPC endpoint for scripting a running TODO_App_GUI.
+
+RpcServer listens on a Unix socket, or on a localhost TCP port where
+Unix sockets aren't available, with an asyncio event loop running in a
+background thread. Requests are JSON-RPC 2.0 objects (or batches of
+them), one per line, and so are responses.
+
+Tasks may only be touched on the Tk thread, so the server doesn't run
+methods itself. Calls are queued, and the first call queued while the
+queue is empty wakes the Tk thread through a pipe watched with a Tk
+file handler. The Tk thread then drains everything queued so far from
+a single after_idle callback, and on_drained is called once for the
+whole drain. A script that sends thousands of calls therefore causes
+one redraw instead of one per call. Where Tk file handlers can't be
+used, the Tk thread polls the queue instead.
+
+RpcClient is a small blocking client for scripts and tests.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import logging
+import threading
+import tkinter as tk
+
+from typing import Callable, Iterable, Union
+
+logger = logging.getLogger(__name__)
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR: int = -32700
+INVALID_REQUEST: int = -32600
+METHOD_NOT_FOUND: int = -32601
+INVALID_PARAMS: int = -32602
+INTERNAL_ERROR: int = -32603
+
+
+class RpcError(Exception):
+    """
+    Error response of a JSON-RPC call. Raised by RpcClient when the
+    server answers with an error.
+    """
+
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(f"{message} ({code})")
+        self.code = code
+        self.message = message
+
+
+class RpcServer():
+    def __init__(
+            self,
+            root: tk.Tk,
+            methods: dict,
+            on_drained: Callable[[], None],
+            address: Union[str, tuple],
+            drain_time_budget: int,
+            poll_interval: int,
+            max_request_size: int) -> None:
+        """
+        Parameters
+        ----------
+        root : tk.Tk
+            Main window, methods are run on its thread
+        methods : dict
+            Functions that take a dict of parameters and return a
+            result that can be written as JSON, keyed by method name.
+            ValueError, KeyError and TypeError raised by them are
+            reported as invalid parameters
+        on_drained : Callable[[], None]
+            Called on the Tk thread after queued calls were run
+        address : str or tuple
+            Path of a Unix socket, or (host, port) of a TCP socket
+        drain_time_budget : int
+            Milliseconds one drain may run before the rest of the queue
+            is left for the next one, so the window keeps responding
+        poll_interval : int
+            Milliseconds between checks of the queue when the Tk thread
+            can't be woken up through a pipe
+        max_request_size : int
+            Maximum length of a request line in bytes
+        """
+
+        self.root = root
+        self.methods = methods
+        self.on_drained = on_drained
+        self.address = address
+        self.drain_time_budget = drain_time_budget
+        self.poll_interval = poll_interval
+        self.max_request_size = max_request_size
+
+        # (method, params, future) of calls waiting for the Tk thread
+        self.pending_calls: list = []
+        self.pending_calls_lock = threading.Lock()
+        self.drain_scheduled: bool = False
+
+        self.loop: Union[asyncio.AbstractEventLoop, None] = None
+        self.server: Union[asyncio.AbstractServer, None] = None
+        self.loop_thread: Union[threading.Thread, None] = None
+
+        self.wakeup_fds: Union[tuple, None] = None
+        self.poll_timer_id: Union[str, None] = None
+
+        self.calls_count: int = 0
+        self.drains_count: int = 0
+
+    def start(self) -> None:
+        """
+        Starts the event loop thread and waits until the server listens
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+
+        Raises
+        ----------
+        OSError
+            If the server can't listen on the address
+        """
+
+        if not self.start_wakeup_pipe():
+            self.poll_timer_id = self.root.after(self.poll_interval, self.poll)
+
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+        start_errors: list = []
+
+        self.loop_thread = threading.Thread(
+            target=self.run_loop, args=(started, start_errors),
+            name="rpc_server", daemon=True
+        )
+        self.loop_thread.start()
+        started.wait()
+
+        if start_errors:
+            self.loop_thread.join()
+            self.loop_thread = None
+            self.close()
+            raise start_errors[0]
+
+    def start_wakeup_pipe(self) -> bool:
+        """
+        Creates the pipe the event loop thread writes to when calls are
+        queued, and lets Tk call on_wakeup when it is readable
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        started : bool
+            False if Tk can't watch the pipe, in which case the queue
+            has to be polled
+        """
+
+        if sys.platform.startswith("win"):
+            return False
+
+        read_fd, write_fd = os.pipe()
+        os.set_blocking(read_fd, False)
+        os.set_blocking(write_fd, False)
+
+        try:
+            self.root.tk.createfilehandler(
+                read_fd, tk.READABLE, self.on_wakeup
+            )
+        except (AttributeError, tk.TclError, RuntimeError):
+            os.close(read_fd)
+            os.close(write_fd)
+            return False
+
+        self.wakeup_fds = (read_fd, write_fd)
+
+        return True
+
+    def run_loop(self, started: threading.Event, start_errors: list) -> None:
+        asyncio.set_event_loop(self.loop)
+
+        try:
+            self.server = self.loop.run_until_complete(self.start_server())
+        except OSError as error:
+            start_errors.append(error)
+            started.set()
+            self.loop.close()
+            return
+
+        started.set()
+
+        try:
+            self.loop.run_forever()
+        finally:
+            self.server.close()
+
+            # Connections that are still open, and calls they wait for
+            connection_tasks: set = asyncio.all_tasks(self.loop)
+            for connection_task in connection_tasks:
+                connection_task.cancel()
+
+            self.loop.run_until_complete(asyncio.gather(
+                self.server.wait_closed(), *connection_tasks,
+                return_exceptions=True
+            ))
+            self.loop.close()
+
+    async def start_server(self) -> asyncio.AbstractServer:
+        if isinstance(self.address, str):
+            if os.path.exists(self.address):
+                self.remove_stale_socket()
+
+            return await asyncio.start_unix_server(
+                self.handle_connection, path=self.address,
+                limit=self.max_request_size
+            )
+
+        host, port = self.address
+
+        return await asyncio.start_server(
+            self.handle_connection, host=host, port=port,
+            limit=self.max_request_size
+        )
+
+    def remove_stale_socket(self) -> None:
+        """
+        Removes a socket file left by an instance that crashed
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+
+        Raises
+        ----------
+        OSError
+            If another instance is listening on the socket
+        """
+
+        probe = socket.socket(socket.AF_UNIX)
+
+        try:
+            probe.connect(self.address)
+        except OSError:
+            os.remove(self.address)
+            return
+        finally:
+            probe.close()
+
+        raise OSError(f"Another instance is listening on {self.address}")
+
+    async def handle_connection(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter) -> None:
+        """
+        Answers requests of one client until it disconnects. Runs on the
+        event loop thread
+
+        Parameters
+        ----------
+        reader : asyncio.StreamReader
+            Reads request lines
+        writer : asyncio.StreamWriter
+            Writes response lines
+
+        Returns
+        ----------
+        None
+        """
+
+        try:
+            while True:
+                try:
+                    line: bytes = await reader.readline()
+                except ValueError:
+                    # Longer than max_request_size, the rest of the
+                    # stream can't be split into lines anymore
+                    writer.write(self.encode(self.error_response(
+                        request_id=None, code=INVALID_REQUEST,
+                        message="Request too large"
+                    )))
+                    break
+
+                if not line:
+                    break
+
+                if not line.strip():
+                    continue
+
+                response: Union[dict, list, None] = await self.handle_line(
+                    line
+                )
+
+                if response is not None:
+                    writer.write(self.encode(response))
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def encode(response: Union[dict, list]) -> bytes:
+        return (json.dumps(response, separators=(",", ":")) + "\n").encode(
+            "utf-8"
+        )
+
+    @staticmethod
+    def error_response(
+            request_id: Union[int, str, None],
+            code: int,
+            message: str) -> dict:
+        return {"jsonrpc": "2.0", "id": request_id,
+                "error": {"code": code, "message": message}}
+
+    async def handle_line(self, line: bytes) -> Union[dict, list, None]:
+        """
+        Runs the calls of one request line, a single request or a batch.
+        All calls of a batch are queued together, so they are run in
+        the same drain
+
+        Parameters
+        ----------
+        line : bytes
+            Request line
+
+        Returns
+        ----------
+        response : dict, list or None
+            Response, list of responses for a batch, or None if all
+            requests were notifications
+        """
+
+        try:
+            message: Union[dict, list] = json.loads(line)
+        except ValueError as error:
+            return self.error_response(
+                request_id=None, code=PARSE_ERROR, message=str(error)
+            )
+
+        is_batch: bool = isinstance(message, list)
+        requests: list = message if is_batch else [message]
+
+        if not requests:
+            return self.error_response(
+                request_id=None, code=INVALID_REQUEST, message="Empty batch"
+            )
+
+        responses: list = []
+        calls: list = []
+        waiting: list = []
+
+        for request in requests:
+            if (not isinstance(request, dict)
+                    or request.get("jsonrpc") != "2.0"
+                    or not isinstance(request.get("method"), str)):
+                responses.append(self.error_response(
+                    request_id=None, code=INVALID_REQUEST,
+                    message="Invalid request"
+                ))
+                continue
+
+            params: object = request.get("params", {})
+            if not isinstance(params, dict):
+                if "id" in request:
+                    responses.append(self.error_response(
+                        request_id=request["id"], code=INVALID_PARAMS,
+                        message="params must be an object"
+                    ))
+                continue
+
+            future: asyncio.Future = self.loop.create_future()
+            calls.append((request["method"], params, future))
+
+            if "id" in request:
+                waiting.append((request["id"], future))
+
+        self.queue_calls(calls)
+
+        for request_id, future in waiting:
+            try:
+                responses.append({"jsonrpc": "2.0", "id": request_id,
+                                  "result": await future})
+            except RpcError as error:
+                responses.append(self.error_response(
+                    request_id=request_id, code=error.code,
+                    message=error.message
+                ))
+
+        if not responses:
+            return None
+
+        return responses if is_batch else responses[0]
+
+    def queue_calls(self, calls: Iterable[tuple]) -> None:
+        """
+        Queues calls for the Tk thread. Wakes the Tk thread up only if
+        the queue was empty, a drain that is already coming runs the new
+        calls too. Runs on the event loop thread
+
+        Parameters
+        ----------
+        calls : Iterable[tuple]
+            (method name, params, future) tuples
+
+        Returns
+        ----------
+        None
+        """
+
+        with self.pending_calls_lock:
+            was_empty: bool = not self.pending_calls
+            self.pending_calls.extend(calls)
+
+            if not was_empty or not self.pending_calls:
+                return
+
+        if self.wakeup_fds is not None:
+            try:
+                os.write(self.wakeup_fds[1], b"\0")
+            except BlockingIOError:
+                # The pipe is full, so the Tk thread will wake up anyway
+                pass
+
+    def on_wakeup(self, read_fd: int, mask: int) -> None:
+        try:
+            while os.read(read_fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+        self.schedule_drain()
+
+    def poll(self) -> None:
+        self.poll_timer_id = self.root.after(self.poll_interval, self.poll)
+
+        with self.pending_calls_lock:
+            has_pending_calls: bool = bool(self.pending_calls)
+
+        if has_pending_calls:
+            self.schedule_drain()
+
+    def schedule_drain(self) -> None:
+        if not self.drain_scheduled:
+            self.drain_scheduled = True
+            self.root.after_idle(self.drain)
+
+    def drain(self) -> None:
+        """
+        Runs queued calls on the Tk thread until the queue is empty or
+        the drain time budget runs out, then calls on_drained once.
+        Calls left in the queue are run by another drain after Tk has
+        handled pending events
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        self.drain_scheduled = False
+        self.drains_count += 1
+        drain_deadline: float = time.perf_counter() + (
+            self.drain_time_budget / 1000
+        )
+
+        while time.perf_counter() < drain_deadline:
+            with self.pending_calls_lock:
+                calls: list = self.pending_calls
+                self.pending_calls = []
+
+            if not calls:
+                break
+
+            for call_index, (method_name, params, future) in enumerate(
+                    calls):
+                if time.perf_counter() >= drain_deadline:
+                    with self.pending_calls_lock:
+                        self.pending_calls[:0] = calls[call_index:]
+                    break
+
+                self.run_call(
+                    method_name=method_name, params=params, future=future
+                )
+
+        self.on_drained()
+
+        with self.pending_calls_lock:
+            has_pending_calls: bool = bool(self.pending_calls)
+
+        if has_pending_calls:
+            self.drain_scheduled = True
+            self.root.after(1, self.drain)
+
+    def run_call(
+            self,
+            method_name: str,
+            params: dict,
+            future: asyncio.Future) -> None:
+        self.calls_count += 1
+        method: Union[Callable[[dict], object], None] = self.methods.get(
+            method_name
+        )
+
+        try:
+            if method is None:
+                raise RpcError(
+                    code=METHOD_NOT_FOUND,
+                    message=f"Method {method_name} not found"
+                )
+
+            try:
+                result: object = method(params)
+            except (ValueError, KeyError, TypeError) as error:
+                raise RpcError(code=INVALID_PARAMS, message=str(error))
+            except RpcError:
+                raise
+            except Exception as error:
+                logger.exception("RPC method %s failed", method_name)
+                raise RpcError(code=INTERNAL_ERROR, message=str(error))
+        except RpcError as error:
+            self.loop.call_soon_threadsafe(
+                self.resolve_future, future, None, error
+            )
+            return
+
+        self.loop.call_soon_threadsafe(
+            self.resolve_future, future, result, None
+        )
+
+    @staticmethod
+    def resolve_future(
+            future: asyncio.Future,
+            result: object,
+            error: Union[RpcError, None]) -> None:
+        # The client may have disconnected in the meantime
+        if future.done():
+            return
+
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def stats(self) -> dict:
+        with self.pending_calls_lock:
+            pending_count: int = len(self.pending_calls)
+
+        return {"calls": self.calls_count, "drains": self.drains_count,
+                "pending": pending_count}
+
+    def close(self) -> None:
+        """
+        Stops the server. Calls that are still queued are dropped
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        if self.loop_thread is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.loop_thread.join()
+            self.loop_thread = None
+
+        # The socket file may belong to another instance if the server
+        # didn't start
+        if (self.server is not None and isinstance(self.address, str)
+                and os.path.exists(self.address)):
+            os.remove(self.address)
+        self.server = None
+
+        if self.poll_timer_id is not None:
+            self.root.after_cancel(self.poll_timer_id)
+            self.poll_timer_id = None
+
+        if self.wakeup_fds is not None:
+            self.root.tk.deletefilehandler(self.wakeup_fds[0])
+            for wakeup_fd in self.wakeup_fds:
+                os.close(wakeup_fd)
+            self.wakeup_fds = None
+
+
+class RpcClient():
+    """
+    Blocking JSON-RPC client of RpcServer, used as a context manager.
+    """
+
+    def __init__(
+            self, address: Union[str, tuple], timeout: float = 60.0) -> None:
+        """
+        Parameters
+        ----------
+        address : str or tuple
+            Path of a Unix socket, or (host, port) of a TCP socket
+        timeout : float, default: 60.0
+            Seconds to wait for a response
+        """
+
+        if isinstance(address, str):
+            self.connection = socket.socket(socket.AF_UNIX)
+        else:
+            self.connection = socket.socket(socket.AF_INET)
+
+        self.connection.settimeout(timeout)
+        self.connection.connect(address)
+        self.response_file = self.connection.makefile("rb")
+        self.next_id: int = 1
+
+    def __enter__(self) -> "RpcClient":
+        return self
+
+    def __exit__(self, *exception_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.response_file.close()
+        self.connection.close()
+
+    def send(self, message: Union[dict, list]) -> Union[dict, list]:
+        self.connection.sendall(
+            (json.dumps(message, separators=(",", ":")) + "\n").encode(
+                "utf-8"
+            )
+        )
+
+        line: bytes = self.response_file.readline()
+        if not line:
+            raise ConnectionError("Server closed the connection")
+
+        return json.loads(line)
+
+    def request(self, method: str, params: dict) -> dict:
+        request: dict = {"jsonrpc": "2.0", "id": self.next_id,
+                         "method": method, "params": params}
+        self.next_id += 1
+
+        return request
+
+    @staticmethod
+    def result(response: dict) -> object:
+        if "error" in response:
+            raise RpcError(
+                code=response["error"]["code"],
+                message=response["error"]["message"]
+            )
+
+        return response["result"]
+
+    def call(self, method: str, **params) -> object:
+        """
+        Calls one method and waits for its result
+
+        Parameters
+        ----------
+        method : str
+            Method name
+        **params
+            Parameters of the method
+
+        Returns
+        ----------
+        result : object
+            Result of the method
+
+        Raises
+        ----------
+        RpcError
+            If the server answered with an error
+        """
+
+        return self.result(self.send(self.request(method, params)))
+
+    def notify(self, method: str, **params) -> None:
+        """
+        Calls one method as a notification, without waiting for it to
+        run. The server sends no response. Later calls on the same
+        client are run after it
+
+        Parameters
+        ----------
+        method : str
+            Method name
+        **params
+            Parameters of the method
+
+        Returns
+        ----------
+        None
+        """
+
+        self.connection.sendall(
+            (json.dumps({"jsonrpc": "2.0", "method": method,
+                         "params": params}, separators=(",", ":"))
+             + "\n").encode("utf-8")
+        )
+
+    def call_batch(self, calls: Iterable[tuple]) -> list:
+        """
+        Sends several calls as one batch, which the server runs in the
+        same drain
+
+        Parameters
+        ----------
+        calls : Iterable[tuple]
+            (method name, params dict) tuples
+
+        Returns
+        ----------
+        results : list
+            Result of each call in the order of calls, or the RpcError
+            of a call that failed
+        """
+
+        requests: list = [
+            self.request(method, params) for method, params in calls
+        ]
+        responses_by_id: dict = {
+            response["id"]: response for response in self.send(requests)
+        }
+
+        results: list = []
+        for request in requests:
+            try:
+                results.append(self.result(responses_by_id[request["id"]]))
+            except RpcError as error:
+                results.append(error)
+
+        return results
@@ -0,0 +1,162 @@
+"""
+Index of task names for searching tasks by a part of their name.
+
+Every task name is split into overlapping character n-grams (trigrams
+by default), and each n-gram maps to the set of tasks whose name
+includes it. A query at least n characters long only looks at tasks
+that include all of its n-grams, so searching costs about as much as
+the number of tasks that match. Shorter queries look through the
+distinct n-grams instead of the tasks. Matching ignores case.
+"""
+
+from task_store import Task
+from typing import Iterable, Union
+
+
+class TaskNameIndex():
+    def __init__(self, ngram_length: int = 3) -> None:
+        """
+        Parameters
+        ----------
+        ngram_length : int, default: 3
+            Number of characters in an n-gram
+        """
+
+        self.ngram_length = ngram_length
+        self.postings: dict = {}
+
+    def ngrams(self, text: str) -> set:
+        """
+        Returns the n-grams of a text. Texts shorter than ngram_length
+        are one n-gram by themselves, so short names can be found too
+
+        Parameters
+        ----------
+        text : str
+            Case folded text
+
+        Returns
+        ----------
+        ngrams : set
+            Distinct n-grams of the text
+        """
+
+        if len(text) <= self.ngram_length:
+            return {text} if text else set()
+
+        return {
+            text[start:start + self.ngram_length]
+            for start in range(len(text) - self.ngram_length + 1)
+        }
+
+    def rebuild(self, tasks: Iterable[Task]) -> None:
+        self.postings = {}
+
+        for task in tasks:
+            self.add(task=task, task_name=task.task_name)
+
+    def add(self, task: Task, task_name: str) -> None:
+        for ngram in self.ngrams(task_name.casefold()):
+            tasks: Union[set, None] = self.postings.get(ngram)
+
+            if tasks is None:
+                self.postings[ngram] = {task}
+            else:
+                tasks.add(task)
+
+    def remove(self, task: Task, task_name: str) -> None:
+        for ngram in self.ngrams(task_name.casefold()):
+            tasks: Union[set, None] = self.postings.get(ngram)
+
+            if tasks is None:
+                continue
+
+            tasks.discard(task)
+
+            if not tasks:
+                del self.postings[ngram]
+
+    def on_task_changed(
+            self,
+            operation: str,
+            tasks: list,
+            previous_states: list) -> None:
+        """
+        Updates the index after tasks changed. Added to TaskStore as a
+        listener
+
+        Parameters
+        ----------
+        operation : str
+            "add", "edit", "toggle" or "delete"
+        tasks : list
+            Changed tasks
+        previous_states : list
+            Tasks' states before the change, None for added tasks
+
+        Returns
+        ----------
+        None
+        """
+
+        for task, previous_state in zip(tasks, previous_states):
+            if operation == "add":
+                self.add(task=task, task_name=task.task_name)
+            elif operation == "delete":
+                self.remove(task=task, task_name=previous_state[0])
+            elif previous_state[0] != task.task_name:
+                self.remove(task=task, task_name=previous_state[0])
+                self.add(task=task, task_name=task.task_name)
+
+    def search(self, query: str) -> set:
+        """
+        Returns tasks whose name includes the query
+
+        Parameters
+        ----------
+        query : str
+            Text to search for. Case is ignored
+
+        Returns
+        ----------
+        tasks : set
+            Matching tasks. Empty if the query is empty
+        """
+
+        query = query.casefold()
+
+        if not query:
+            return set()
+
+        if len(query) < self.ngram_length:
+            matches: set = set()
+
+            for ngram, tasks in self.postings.items():
+                if query in ngram:
+                    matches.update(tasks)
+
+            return matches
+
+        postings: list = []
+
+        for ngram in self.ngrams(query):
+            tasks = self.postings.get(ngram)
+
+            if tasks is None:
+                return set()
+
+            postings.append(tasks)
+
+        postings.sort(key=len)
+        candidates: set = postings[0].intersection(*postings[1:])
+
+        # Only a query that is one n-gram matches every task including
+        # its n-grams. Longer ones, like "aaaa" whose only n-gram is
+        # "aaa", may have their n-grams in another order or count
+        if len(query) == self.ngram_length:
+            return set(candidates)
+
+        return {
+            task for task in candidates
+            if query in task.task_name.casefold()
+        }
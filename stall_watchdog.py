@@ -0,0 +1,159 @@
+"""
+Detection of event loop stalls.
+
+StallWatchdog keeps a heartbeat running on the Tk thread with
+root.after, and a watchdog thread checks that the heartbeat keeps
+coming. If the Tk thread hasn't run the heartbeat for longer than the
+stall threshold, it is busy with something that freezes the window, and
+the watchdog logs the Tk thread's current stack so the cause can be
+found. Once the heartbeat comes again the stall's duration is logged
+and counted.
+"""
+
+import sys
+import time
+import logging
+import threading
+import traceback
+import tkinter as tk
+
+from typing import Callable, Union
+
+logger = logging.getLogger(__name__)
+
+
+class StallWatchdog():
+    def __init__(
+            self,
+            root: tk.Tk,
+            heartbeat_interval: int,
+            stall_threshold: int,
+            on_stall_end: Union[Callable[[float], None], None] = None) -> None:
+        """
+        Parameters
+        ----------
+        root : tk.Tk
+            Main window. Has to be created on the thread that runs
+            mainloop, which is the thread the watchdog is created on
+        heartbeat_interval : int
+            Milliseconds between heartbeats, also how often the
+            watchdog thread checks for stalls
+        stall_threshold : int
+            Milliseconds without a heartbeat after which the event loop
+            is stalled
+        on_stall_end : Callable[[float], None] or None, default: None
+            Called on the Tk thread with the duration of a stall in
+            seconds once it has ended
+        """
+
+        self.root = root
+        self.heartbeat_interval = heartbeat_interval
+        self.stall_threshold = stall_threshold
+        self.on_stall_end = on_stall_end
+
+        self.tk_thread_id: int = threading.get_ident()
+        self.last_heartbeat: float = time.monotonic()
+        self.timer_id: Union[str, None] = None
+
+        # Heartbeat whose lateness was last reported, so each stall is
+        # reported once. Only used by the watchdog thread
+        self.reported_heartbeat: Union[float, None] = None
+
+        self.stalls_count: int = 0
+        self.total_stall_time: float = 0.0
+        self.longest_stall: float = 0.0
+
+        self.stopped = threading.Event()
+        self.watchdog_thread = threading.Thread(
+            target=self.watch, name="stall watchdog", daemon=True
+        )
+
+    def start(self) -> None:
+        self.last_heartbeat = time.monotonic()
+        self.timer_id = self.root.after(self.heartbeat_interval, self.beat)
+        self.watchdog_thread.start()
+
+    def beat(self) -> None:
+        """
+        Heartbeat, runs on the Tk thread. Counts the time since the
+        previous heartbeat as a stall if it was longer than the stall
+        threshold
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        now: float = time.monotonic()
+        stall_time: float = now - self.last_heartbeat - (
+            self.heartbeat_interval / 1000
+        )
+        self.last_heartbeat = now
+
+        if stall_time * 1000 >= self.stall_threshold:
+            self.stalls_count += 1
+            self.total_stall_time += stall_time
+            self.longest_stall = max(self.longest_stall, stall_time)
+
+            logger.warning(
+                "Event loop was stalled for %.0f ms (%d stalls, %.0f ms "
+                "in total)", stall_time * 1000, self.stalls_count,
+                self.total_stall_time * 1000
+            )
+
+            if self.on_stall_end is not None:
+                self.on_stall_end(stall_time)
+
+        self.timer_id = self.root.after(self.heartbeat_interval, self.beat)
+
+    def watch(self) -> None:
+        """
+        Runs on the watchdog thread. Logs the Tk thread's stack once
+        per stall, when the heartbeat is late by more than the stall
+        threshold
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        while not self.stopped.wait(self.heartbeat_interval / 1000):
+            last_heartbeat: float = self.last_heartbeat
+            late: float = time.monotonic() - last_heartbeat - (
+                self.heartbeat_interval / 1000
+            )
+
+            if (last_heartbeat == self.reported_heartbeat
+                    or late * 1000 < self.stall_threshold):
+                continue
+
+            self.reported_heartbeat = last_heartbeat
+            frame = sys._current_frames().get(self.tk_thread_id)
+
+            if frame is None:
+                continue
+
+            logger.warning(
+                "Event loop stalled for %.0f ms so far, Tk thread is at:\n%s",
+                late * 1000, "".join(traceback.format_stack(frame))
+            )
+
+    def stats(self) -> dict:
+        return {"stalls": self.stalls_count,
+                "total_stall_ms": round(self.total_stall_time * 1000, 3),
+                "longest_stall_ms": round(self.longest_stall * 1000, 3)}
+
+    def close(self) -> None:
+        self.stopped.set()
+
+        if self.timer_id is not None:
+            self.root.after_cancel(self.timer_id)
+            self.timer_id = None
@@ -0,0 +1,240 @@
+"""
+Fonts and colors shared by all widgets of TODO_App_GUI.
+
+StyleRegistry is built once from the YAML config file. Fonts are named
+tkinter fonts, so every widget that uses one refers to the same Tk
+object and changing its size is a single call that Tk propagates to
+all widgets. Colors are resolved to #rrggbb once per theme. Widgets
+styled through the registry are remembered, so switching to another
+theme reconfigures only them, and listeners reconfigure widgets whose
+colors depend on state, like task rows.
+"""
+
+import weakref
+import tkinter as tk
+import tkinter.font as tkfont
+
+from typing import Callable, Union
+
+DEFAULT_THEME: str = "default"
+
+# Font sizes are never made smaller than this many points
+MIN_FONT_SIZE: int = 6
+
+
+class StyleRegistry():
+    def __init__(self, root: tk.Tk, config_dict: dict) -> None:
+        """
+        Parameters
+        ----------
+        root : tk.Tk
+            Main window, fonts and colors belong to its Tk interpreter
+        config_dict : dict
+            Content of the YAML config file. bg_color and text_color
+            are the default theme, themes holds other themes that
+            override some of their colors and fonts holds the options
+            of each named font
+        """
+
+        self.root = root
+        self.config_dict = config_dict
+
+        self.fonts: dict = {}
+        self.font_sizes: dict = {}
+        self.font_size_offset: int = 0
+
+        for font_name, font_options in config_dict["fonts"].items():
+            self.fonts[font_name] = tkfont.Font(root=root, **font_options)
+            self.font_sizes[font_name] = font_options["size"]
+
+        self.theme_name: str = DEFAULT_THEME
+        self.bg_colors: dict = {}
+        self.text_colors: dict = {}
+        self.resolve_colors(theme_name=config_dict["style"]["theme"])
+
+        # Widget -> (bg color name, text color name), dropped when the
+        # widget is destroyed
+        self.styled_widgets = weakref.WeakKeyDictionary()
+        self.listeners: list = []
+
+    def theme_names(self) -> list:
+        return [DEFAULT_THEME] + list(self.config_dict["themes"])
+
+    def resolve_colors(self, theme_name: str) -> None:
+        """
+        Looks up the colors of a theme and converts them to #rrggbb
+
+        Parameters
+        ----------
+        theme_name : str
+            "default" or a key of the themes section
+
+        Returns
+        ----------
+        None
+
+        Raises
+        ----------
+        ValueError
+            If there's no theme with the given name
+        tk.TclError
+            If a color name is not known to Tk
+        """
+
+        if theme_name not in self.theme_names():
+            raise ValueError(f"Unknown theme {theme_name}")
+
+        theme: dict = self.config_dict["themes"].get(theme_name) or {}
+        bg_colors: dict = dict(self.config_dict["bg_color"])
+        bg_colors.update(theme.get("bg_color") or {})
+        text_colors: dict = dict(self.config_dict["text_color"])
+        text_colors.update(theme.get("text_color") or {})
+
+        self.bg_colors = {
+            name: self.resolve_color(color)
+            for name, color in bg_colors.items()
+        }
+        self.text_colors = {
+            name: self.resolve_color(color)
+            for name, color in text_colors.items()
+        }
+        self.theme_name = theme_name
+
+    def resolve_color(self, color: str) -> str:
+        red, green, blue = self.root.winfo_rgb(color)
+
+        return f"#{red >> 8:02x}{green >> 8:02x}{blue >> 8:02x}"
+
+    def bg(self, color_name: str) -> str:
+        return self.bg_colors[color_name]
+
+    def fg(self, color_name: str) -> str:
+        return self.text_colors[color_name]
+
+    def font(self, font_name: str) -> tkfont.Font:
+        return self.fonts[font_name]
+
+    def style(
+            self,
+            widget: tk.Misc,
+            bg: Union[str, None] = None,
+            fg: Union[str, None] = None,
+            font: Union[str, None] = None) -> tk.Misc:
+        """
+        Gives a widget colors and a font of the registry. The widget is
+        recolored when the theme changes
+
+        Parameters
+        ----------
+        widget : tk.Misc
+            Widget to style
+        bg : str or None, default: None
+            Name of the background color, from bg_color
+        fg : str or None, default: None
+            Name of the text color, from text_color
+        font : str or None, default: None
+            Name of the font, from fonts
+
+        Returns
+        ----------
+        widget : tk.Misc
+            The same widget, so styling can wrap widget creation
+        """
+
+        if bg is not None or fg is not None:
+            self.styled_widgets[widget] = (bg, fg)
+            self.apply_colors(widget=widget, bg=bg, fg=fg)
+
+        if font is not None:
+            widget.config(font=self.fonts[font])
+
+        return widget
+
+    def apply_colors(
+            self,
+            widget: tk.Misc,
+            bg: Union[str, None],
+            fg: Union[str, None]) -> None:
+        colors: dict = {}
+
+        if bg is not None:
+            colors["bg"] = self.bg_colors[bg]
+        if fg is not None:
+            colors["fg"] = self.text_colors[fg]
+
+        widget.config(**colors)
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        self.listeners.append(listener)
+
+    def notify_listeners(self) -> None:
+        for listener in self.listeners:
+            listener()
+
+    def set_theme(self, theme_name: str) -> None:
+        """
+        Switches to another theme. Styled widgets are recolored, then
+        listeners are called
+
+        Parameters
+        ----------
+        theme_name : str
+            "default" or a key of the themes section
+
+        Returns
+        ----------
+        None
+        """
+
+        if theme_name == self.theme_name:
+            return
+
+        self.resolve_colors(theme_name=theme_name)
+
+        for widget, (bg, fg) in list(self.styled_widgets.items()):
+            try:
+                self.apply_colors(widget=widget, bg=bg, fg=fg)
+            except tk.TclError:
+                # Destroyed, but the Python object is still referenced
+                del self.styled_widgets[widget]
+
+        self.notify_listeners()
+
+    def change_font_size(self, step: int) -> None:
+        """
+        Makes all fonts larger or smaller. Tk updates every widget that
+        uses them, then listeners are called
+
+        Parameters
+        ----------
+        step : int
+            Points added to the size of every font, negative to make
+            fonts smaller. 0 resets fonts to the sizes in the config
+            file
+
+        Returns
+        ----------
+        None
+        """
+
+        if step == 0:
+            font_size_offset: int = 0
+        else:
+            font_size_offset = self.font_size_offset + step
+
+        # Fonts stop shrinking once the smallest reaches the minimum
+        if (step < 0 and min(self.font_sizes.values()) + font_size_offset
+                < MIN_FONT_SIZE):
+            return
+
+        if font_size_offset == self.font_size_offset:
+            return
+
+        self.font_size_offset = font_size_offset
+
+        for font_name, font in self.fonts.items():
+            font.configure(
+                size=self.font_sizes[font_name] + font_size_offset
+            )
+
+        self.notify_listeners()
@@ -0,0 +1,256 @@
+"""
+Cold storage for old finished tasks.
+
+TaskArchive appends tasks to a gzip compressed NDJSON file, one task
+per line. Every append writes a new gzip member at the end of the file,
+so archived tasks are never rewritten and appending costs as much as
+the tasks appended. The archive is only read when it is browsed or
+searched, one line at a time, so it can grow without being loaded into
+memory or slowing down loading and saving the tasks in use. A member
+left incomplete by a crash while appending is skipped by looking for
+the start of the next member, so later appends stay readable.
+"""
+
+import os
+import gzip
+import json
+import zlib
+import logging
+
+from typing import BinaryIO, Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+# First bytes of every gzip member: ID1, ID2 and the deflate method
+GZIP_MAGIC: bytes = b"\x1f\x8b\x08"
+
+# zlib window bits that make zlib read a gzip header and trailer
+GZIP_WBITS: int = 16 + zlib.MAX_WBITS
+
+READ_SIZE: int = 65536
+
+
+class TaskArchive():
+    def __init__(self, archive_dir: str) -> None:
+        """
+        Parameters
+        ----------
+        archive_dir : str
+            Path of the archive file. It is created by the first append
+        """
+
+        self.archive_dir = archive_dir
+
+    def append(self, tasks: Iterable[dict]) -> int:
+        """
+        Appends tasks to the archive as one gzip member, and makes sure
+        they are on disk before returning, so tasks can be removed from
+        the task files afterwards
+
+        Parameters
+        ----------
+        tasks : Iterable[dict]
+            Tasks in the JSON file format
+
+        Returns
+        ----------
+        appended_count : int
+            Number of tasks appended
+        """
+
+        lines: list = [json.dumps(task) + "\n" for task in tasks]
+
+        if not lines:
+            return 0
+
+        with open(self.archive_dir, "ab") as archive_file:
+            archive_size: int = archive_file.tell()
+
+            try:
+                with gzip.GzipFile(
+                        fileobj=archive_file, mode="wb") as gzip_file:
+                    gzip_file.write("".join(lines).encode("utf-8"))
+
+                archive_file.flush()
+                os.fsync(archive_file.fileno())
+            except BaseException:
+                # Leaves no incomplete member behind if writing failed
+                archive_file.truncate(archive_size)
+                raise
+
+        return len(lines)
+
+    @staticmethod
+    def read_member(archive_file: BinaryIO) -> Iterator[bytes]:
+        """
+        Decompresses the gzip member at the current position of the
+        file a chunk at a time
+
+        Parameters
+        ----------
+        archive_file : BinaryIO
+            Archive file, positioned at the start of a member
+
+        Returns
+        ----------
+        lines : Iterator[bytes]
+            Yields the lines of the member without line endings. The
+            generator returns the position where the next member starts
+
+        Raises
+        ----------
+        EOFError
+            If the file ends inside the member
+        zlib.error
+            If the member is damaged
+        """
+
+        decompressor = zlib.decompressobj(wbits=GZIP_WBITS)
+        partial_line: bytes = b""
+
+        while not decompressor.eof:
+            chunk: bytes = archive_file.read(READ_SIZE)
+
+            if not chunk:
+                raise EOFError("Archive ends inside a gzip member")
+
+            lines: list = (
+                partial_line + decompressor.decompress(chunk)
+            ).split(b"\n")
+            partial_line = lines.pop()
+
+            yield from lines
+
+        if partial_line:
+            yield partial_line
+
+        return archive_file.tell() - len(decompressor.unused_data)
+
+    @staticmethod
+    def find_member(archive_file: BinaryIO, position: int) -> int:
+        """
+        Looks for the start of a gzip member from a position on
+
+        Parameters
+        ----------
+        archive_file : BinaryIO
+            Archive file
+        position : int
+            Position to start looking from
+
+        Returns
+        ----------
+        member_position : int
+            Position of the first member start found, -1 if there is
+            none
+        """
+
+        archive_file.seek(position)
+        overlap: bytes = b""
+
+        while True:
+            chunk: bytes = archive_file.read(READ_SIZE)
+
+            if not chunk:
+                return -1
+
+            found_position: int = (overlap + chunk).find(GZIP_MAGIC)
+
+            if found_position >= 0:
+                return position - len(overlap) + found_position
+
+            position += len(chunk)
+            overlap = chunk[-(len(GZIP_MAGIC) - 1):]
+
+    def iter_lines(self) -> Iterator[bytes]:
+        """
+        Reads the lines of all gzip members of the archive. Damaged
+        members, like one left incomplete by a crash while appending,
+        are skipped
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        lines : Iterator[bytes]
+            Yields lines without line endings
+        """
+
+        try:
+            archive_file: BinaryIO = open(self.archive_dir, "rb")
+        except FileNotFoundError:
+            return
+
+        with archive_file:
+            position: int = 0
+
+            while True:
+                archive_file.seek(position)
+
+                if not archive_file.read(1):
+                    return
+
+                archive_file.seek(position)
+
+                try:
+                    position = yield from self.read_member(archive_file)
+                except (EOFError, zlib.error) as error:
+                    logger.warning(
+                        "Skipping damaged part of archive %s at byte %d: %s",
+                        self.archive_dir, position, error
+                    )
+
+                    position = self.find_member(
+                        archive_file=archive_file, position=position + 1
+                    )
+                    if position < 0:
+                        return
+
+    def iter_tasks(self) -> Iterator[dict]:
+        """
+        Reads archived tasks one line at a time. A task archived more
+        than once, for example after being restored and finished again,
+        is yielded every time
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        tasks : Iterator[dict]
+            Yields archived tasks in the JSON file format, oldest first
+        """
+
+        for line in self.iter_lines():
+            try:
+                task: object = json.loads(line)
+            except ValueError:
+                continue
+
+            if isinstance(task, dict) and isinstance(
+                    task.get("task_name"), str):
+                yield task
+
+    def search(self, query: str) -> Iterator[dict]:
+        """
+        Reads archived tasks whose name includes a text, one line at a
+        time. Matching ignores case
+
+        Parameters
+        ----------
+        query : str
+            Case folded text to look for. An empty text matches all
+            tasks
+
+        Returns
+        ----------
+        tasks : Iterator[dict]
+            Yields matching tasks in the JSON file format, oldest first
+        """
+
+        for task in self.iter_tasks():
+            if query in task["task_name"].casefold():
+                yield task
@@ -0,0 +1,441 @@
+"""
+Command-line import, export and statistics of stored tasks, run with
+main.py import|export|stats without starting Tk.
+
+Tasks are streamed from the input file to the storage backend and from
+the backend to the output file through generators, so files of any size
+are handled in constant memory. Two formats are supported:
+
+- "ndjson": one JSON object per line
+- "csv": a header line with task_name, deadline and optionally task_id
+  and completed columns, followed by one task per line
+
+Deadlines have to be written as %d-%m-%Y, like in the JSON file. Tasks
+that don't pass validation are reported and skipped.
+"""
+
+import sys
+import csv
+import json
+import datetime
+
+from task_journal import write_file_atomically
+from task_storage import TaskStorage
+from typing import Callable, Iterable, Iterator, TextIO, Union
+
+CSV_FIELDS: tuple = ("task_id", "task_name", "deadline", "completed")
+
+# Number of invalid tasks reported one by one, later ones are only
+# counted
+MAX_REPORTED_ERRORS: int = 20
+
+
+def parse_completed(completed: Union[str, bool, None]) -> bool:
+    """
+    Returns completion state of a task read from a file
+
+    Parameters
+    ----------
+    completed : str, bool or None
+        Value of the completed field. Strings "true", "yes" and "1"
+        mean True, "false", "no", "0" and an empty string mean False,
+        ignoring case
+
+    Returns
+    ----------
+    completed : bool
+        True if the task is finished
+
+    Raises
+    ----------
+    ValueError
+        If the value is not one of the accepted values
+    """
+
+    if completed is None or isinstance(completed, bool):
+        return bool(completed)
+
+    if isinstance(completed, str):
+        if completed.strip().lower() in ("true", "yes", "1"):
+            return True
+        if completed.strip().lower() in ("false", "no", "0", ""):
+            return False
+
+    raise ValueError(f"completed must be true or false, not {completed!r}")
+
+
+def validate_task(row: dict) -> dict:
+    """
+    Checks a task read from a file, returns it in the JSON file format
+
+    Parameters
+    ----------
+    row : dict
+        Task read from an NDJSON or CSV file
+
+    Returns
+    ----------
+    task : dict
+        Task with task_id, task_name, deadline and completed keys. The
+        deadline is written with two-digit days and months
+
+    Raises
+    ----------
+    ValueError
+        If the task name is missing or empty, or the deadline is not a
+        date written as %d-%m-%Y
+    """
+
+    task_name: Union[str, None] = row.get("task_name")
+    if not isinstance(task_name, str) or not task_name.strip():
+        raise ValueError("task_name is missing or empty")
+
+    deadline: Union[str, None] = row.get("deadline")
+    if not isinstance(deadline, str):
+        raise ValueError("deadline is missing")
+
+    try:
+        deadline_date: datetime.datetime = datetime.datetime.strptime(
+            deadline, "%d-%m-%Y"
+        )
+    except ValueError:
+        raise ValueError(f"deadline {deadline!r} is not in %d-%m-%Y format")
+
+    task_id: Union[str, None] = row.get("task_id")
+    if task_id is not None and not isinstance(task_id, str):
+        raise ValueError("task_id must be a string")
+
+    # strptime also accepts days and months without leading zeros, the
+    # deadline is stored written the way the app writes it
+    return {"task_id": task_id or "", "task_name": task_name,
+            "deadline": deadline_date.strftime("%d-%m-%Y"),
+            "completed": parse_completed(row.get("completed"))}
+
+
+def read_ndjson(input_file: TextIO) -> Iterator[tuple]:
+    """
+    Yields rows of an NDJSON file. Empty lines are skipped
+
+    Parameters
+    ----------
+    input_file : TextIO
+        File to read
+
+    Returns
+    ----------
+    rows : Iterator[tuple]
+        (line number, row) pairs. row is the error raised while
+        parsing the line if the line is not a JSON object
+    """
+
+    for line_number, line in enumerate(input_file, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            row: Union[dict, Exception] = json.loads(line)
+        except json.JSONDecodeError as error:
+            row = ValueError(f"invalid JSON: {error.msg}")
+
+        if not isinstance(row, (dict, Exception)):
+            row = ValueError("line is not a JSON object")
+
+        yield line_number, row
+
+
+def read_csv(input_file: TextIO) -> Iterator[tuple]:
+    """
+    Yields rows of a CSV file with a header line
+
+    Parameters
+    ----------
+    input_file : TextIO
+        File to read, opened with newline=""
+
+    Returns
+    ----------
+    rows : Iterator[tuple]
+        (line number, row) pairs
+    """
+
+    csv_reader = csv.DictReader(input_file)
+
+    for row in csv_reader:
+        yield csv_reader.line_num, row
+
+
+def validated_tasks(
+        rows: Iterable[tuple],
+        on_error: Callable[[int, Exception], None]) -> Iterator[dict]:
+    """
+    Yields valid tasks, reports invalid ones
+
+    Parameters
+    ----------
+    rows : Iterable[tuple]
+        (line number, row) pairs yielded by read_ndjson or read_csv
+    on_error : Callable[[int, Exception], None]
+        Called with the line number and the error of an invalid task
+
+    Returns
+    ----------
+    tasks : Iterator[dict]
+        Valid tasks in the JSON file format
+    """
+
+    for line_number, row in rows:
+        if isinstance(row, Exception):
+            on_error(line_number, row)
+            continue
+
+        try:
+            yield validate_task(row)
+        except ValueError as error:
+            on_error(line_number, error)
+
+
+def open_input(input_dir: str) -> TextIO:
+    if input_dir == "-":
+        return sys.stdin
+
+    return open(input_dir, "r", encoding="utf-8", newline="")
+
+
+def write_tasks(
+        output_file: TextIO,
+        tasks: Iterable[dict],
+        file_format: str,
+        batch_size: int) -> int:
+    """
+    Writes tasks to a file, batch_size lines at a time
+
+    Parameters
+    ----------
+    output_file : TextIO
+        File to write to
+    tasks : Iterable[dict]
+        Tasks in the JSON file format
+    file_format : str
+        "ndjson" or "csv"
+    batch_size : int
+        Number of tasks written at a time
+
+    Returns
+    ----------
+    written_count : int
+        Number of tasks written
+    """
+
+    written_count: int = 0
+    batch: list = []
+
+    if file_format == "csv":
+        csv_writer = csv.writer(output_file)
+        csv_writer.writerow(CSV_FIELDS)
+        write_batch: Callable[[list], None] = csv_writer.writerows
+    else:
+        write_batch = lambda lines: output_file.write("".join(lines))
+
+    for task in tasks:
+        if file_format == "csv":
+            batch.append([task.get(field) for field in CSV_FIELDS])
+        else:
+            batch.append(json.dumps(task) + "\n")
+
+        written_count += 1
+
+        if len(batch) >= batch_size:
+            write_batch(batch)
+            batch = []
+
+    write_batch(batch)
+
+    return written_count
+
+
+def run_import(
+        task_storage: TaskStorage,
+        input_dir: str,
+        file_format: str,
+        batch_size: int) -> int:
+    """
+    Imports tasks from an NDJSON or CSV file to the storage backend.
+    Invalid tasks are reported on stderr and skipped
+
+    Parameters
+    ----------
+    task_storage : TaskStorage
+        Storage backend tasks are added to
+    input_dir : str
+        Path of the file to read, "-" reads stdin
+    file_format : str
+        "ndjson" or "csv"
+    batch_size : int
+        Number of tasks saved at a time
+
+    Returns
+    ----------
+    exit_status : int
+        0 if all tasks were imported, 1 if some were invalid or the
+        file couldn't be read
+    """
+
+    invalid_count: int = 0
+
+    def report_error(line_number: int, error: Exception) -> None:
+        nonlocal invalid_count
+
+        invalid_count += 1
+
+        if invalid_count <= MAX_REPORTED_ERRORS:
+            print(f"{input_dir}:{line_number}: {error}", file=sys.stderr)
+
+    try:
+        input_file: TextIO = open_input(input_dir)
+    except OSError as error:
+        print(f"Can't read {input_dir}: {error.strerror}", file=sys.stderr)
+        return 1
+
+    try:
+        rows: Iterator[tuple] = (
+            read_csv(input_file) if file_format == "csv"
+            else read_ndjson(input_file)
+        )
+        imported_count: int = task_storage.import_tasks(
+            tasks=validated_tasks(rows=rows, on_error=report_error),
+            batch_size=batch_size
+        )
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+
+    print(f"Imported {imported_count} tasks")
+
+    if invalid_count:
+        print(f"Skipped {invalid_count} invalid tasks", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+def run_export(
+        task_storage: TaskStorage,
+        output_dir: str,
+        file_format: str,
+        batch_size: int) -> int:
+    """
+    Exports stored tasks to an NDJSON or CSV file. The file is replaced
+    atomically, so it is never left half written
+
+    Parameters
+    ----------
+    task_storage : TaskStorage
+        Storage backend tasks are read from
+    output_dir : str
+        Path of the file to write, "-" writes to stdout
+    file_format : str
+        "ndjson" or "csv"
+    batch_size : int
+        Number of tasks written at a time
+
+    Returns
+    ----------
+    exit_status : int
+        Always 0
+    """
+
+    exported_count: int = 0
+
+    def write_contents(output_file: TextIO) -> None:
+        nonlocal exported_count
+
+        exported_count = write_tasks(
+            output_file=output_file,
+            tasks=task_storage.iter_current_tasks(),
+            file_format=file_format,
+            batch_size=batch_size
+        )
+
+    if output_dir == "-":
+        write_contents(sys.stdout)
+        sys.stdout.flush()
+        return 0
+
+    write_file_atomically(file_dir=output_dir, write_contents=write_contents)
+
+    print(f"Exported {exported_count} tasks")
+
+    return 0
+
+
+def run_stats(task_storage: TaskStorage) -> int:
+    """
+    Prints the number of stored tasks, finished, overdue and due tasks
+    and the range of deadlines, reading tasks one at a time
+
+    Parameters
+    ----------
+    task_storage : TaskStorage
+        Storage backend tasks are read from
+
+    Returns
+    ----------
+    exit_status : int
+        Always 0
+    """
+
+    today: int = datetime.date.today().toordinal()
+    deadline_ordinals: dict = {}
+
+    tasks_count: int = 0
+    completed_count: int = 0
+    overdue_count: int = 0
+    due_today_count: int = 0
+    due_this_week_count: int = 0
+    first_deadline: Union[int, None] = None
+    last_deadline: Union[int, None] = None
+
+    for task in task_storage.iter_current_tasks():
+        # Deadlines repeat a lot, so each is parsed once
+        deadline: Union[int, None] = deadline_ordinals.get(task["deadline"])
+        if deadline is None:
+            deadline = datetime.datetime.strptime(
+                task["deadline"], "%d-%m-%Y"
+            ).toordinal()
+
+            if len(deadline_ordinals) < 100000:
+                deadline_ordinals[task["deadline"]] = deadline
+
+        tasks_count += 1
+
+        if first_deadline is None or deadline < first_deadline:
+            first_deadline = deadline
+        if last_deadline is None or deadline > last_deadline:
+            last_deadline = deadline
+
+        if task.get("completed"):
+            completed_count += 1
+        elif deadline < today:
+            overdue_count += 1
+        elif deadline < today + 7:
+            due_this_week_count += 1
+
+            if deadline == today:
+                due_today_count += 1
+
+    print(f"{'tasks':<16}{tasks_count:>12}")
+    print(f"{'completed':<16}{completed_count:>12}")
+    print(f"{'open':<16}{tasks_count - completed_count:>12}")
+    print(f"{'overdue':<16}{overdue_count:>12}")
+    print(f"{'due today':<16}{due_today_count:>12}")
+    print(f"{'due this week':<16}{due_this_week_count:>12}")
+
+    if first_deadline is not None:
+        for label, ordinal in (("first deadline", first_deadline),
+                               ("last deadline", last_deadline)):
+            deadline_text: str = datetime.date.fromordinal(
+                ordinal
+            ).strftime("%d-%m-%Y")
+            print(f"{label:<16}{deadline_text:>12}")
+
+    return 0
@@ -0,0 +1,422 @@
+"""
+Append-only journal persistence for tasks.
+
+Tasks are stored as a JSON snapshot plus a journal file next to it.
+Every change to a task (add, edit, toggle, delete) is written to the
+journal as one JSON line, so saving costs as much as the changes made
+since the last save instead of the whole task list. Loading reads the
+snapshot and replays the journal on top of it. Once the journal grows
+past a threshold it is folded into a new snapshot and emptied.
+
+Several app instances can share the same files. VersionFile is a small
+file next to the snapshot that holds a version counter, increased by
+every save, and is locked while a save writes, so saves of different
+processes don't interleave.
+"""
+
+import os
+import json
+import codecs
+import contextlib
+
+from typing import Callable, Iterable, Iterator, TextIO, Union
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+def write_file_atomically(
+        file_dir: str,
+        write_contents: Callable[[TextIO], None],
+        binary: bool = False) -> None:
+    """
+    Writes a file by writing a temporary file next to it and renaming
+    it over the original, so the file is either fully replaced or left
+    untouched if writing fails or the app crashes
+
+    Parameters
+    ----------
+    file_dir : str
+        Path of file to write
+    write_contents : Callable[[TextIO], None]
+        Function that writes the contents to the file object it is given
+    binary : bool, default: False
+        If True, the file is opened in binary mode
+
+    Returns
+    ----------
+    None
+    """
+
+    temporary_dir: str = f"{file_dir}.{os.getpid()}.tmp"
+
+    try:
+        with open(temporary_dir, "wb" if binary else "w") as temporary_file:
+            write_contents(temporary_file)
+            temporary_file.flush()
+            os.fsync(temporary_file.fileno())
+
+        os.replace(temporary_dir, file_dir)
+    except BaseException:
+        if os.path.exists(temporary_dir):
+            os.remove(temporary_dir)
+
+        raise
+
+
+class VersionFile():
+    """
+    Version counter of stored tasks, shared by all processes that use
+    the same task files through an advisory lock on the version file.
+    The lock is only held while a save writes, not while tasks are
+    read or changed. On systems without flock the counter is kept but
+    not locked.
+    """
+
+    def __init__(self, version_dir: str) -> None:
+        """
+        Parameters
+        ----------
+        version_dir : str
+            Path of the version file. Created on first use
+        """
+
+        self.version_dir = version_dir
+        self.locked_file: Union[TextIO, None] = None
+
+    @contextlib.contextmanager
+    def locked(self, exclusive: bool = True) -> Iterator[int]:
+        """
+        Locks the version file for the duration of a with block
+
+        Parameters
+        ----------
+        exclusive : bool, default: True
+            If False, other processes may read the version at the same
+            time but not change it
+
+        Returns
+        ----------
+        version : Iterator[int]
+            Yields the current version, 0 if no version was written yet
+        """
+
+        with open(self.version_dir, "a+") as version_file:
+            if fcntl is not None:
+                fcntl.flock(
+                    version_file.fileno(),
+                    fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+                )
+            elif msvcrt is not None:
+                version_file.seek(0)
+                msvcrt.locking(version_file.fileno(), msvcrt.LK_LOCK, 1)
+
+            try:
+                version_file.seek(0)
+                version_text: str = version_file.read().strip()
+                self.locked_file = version_file
+
+                yield int(version_text) if version_text.isdigit() else 0
+            finally:
+                self.locked_file = None
+
+                if fcntl is not None:
+                    fcntl.flock(version_file.fileno(), fcntl.LOCK_UN)
+                elif msvcrt is not None:
+                    version_file.seek(0)
+                    msvcrt.locking(version_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def read(self) -> int:
+        with self.locked(exclusive=False) as version:
+            return version
+
+    def write(self, version: int) -> None:
+        """
+        Stores a new version. Has to be called inside an exclusive
+        locked() block
+
+        Parameters
+        ----------
+        version : int
+            New version
+
+        Returns
+        ----------
+        None
+        """
+
+        # The file is opened for appending, so emptying it makes the
+        # next write start at the beginning
+        self.locked_file.seek(0)
+        self.locked_file.truncate()
+        self.locked_file.write(f"{version}\n")
+        self.locked_file.flush()
+        os.fsync(self.locked_file.fileno())
+
+
+class TaskJournal():
+    def __init__(
+            self,
+            snapshot_dir: str,
+            journal_dir: str,
+            compaction_threshold: int) -> None:
+        """
+        Parameters
+        ----------
+        snapshot_dir : str
+            Path of JSON file that includes the last snapshot of tasks
+        journal_dir : str
+            Path of journal file that includes changes made after the
+            last snapshot, one JSON object per line
+        compaction_threshold : int
+            Size of journal file in bytes after which the journal is
+            folded into a new snapshot
+        """
+
+        self.snapshot_dir = snapshot_dir
+        self.journal_dir = journal_dir
+        self.compaction_threshold = compaction_threshold
+
+    def has_records(self) -> bool:
+        return os.path.exists(self.journal_dir)
+
+    def read_records(self) -> Iterable[dict]:
+        """
+        Yields journal records in the order they were written. Lines
+        that were only partly written, for example because the app was
+        closed during a save, are skipped
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        records : Iterable[dict]
+            Journal records
+        """
+
+        with open(self.journal_dir, "r") as journal_file:
+            for line in journal_file:
+                if not line.strip():
+                    continue
+
+                try:
+                    record: dict = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+                yield record
+
+    @staticmethod
+    def apply_record(tasks_by_id: dict, record: dict) -> None:
+        """
+        Applies one journal record to tasks
+
+        Parameters
+        ----------
+        tasks_by_id : dict
+            Tasks keyed by task ID, changed in place
+        record : dict
+            Journal record. Its "op" key is one of "add", "edit",
+            "toggle" or "delete"
+
+        Returns
+        ----------
+        None
+        """
+
+        operation: str = record.get("op")
+
+        if operation == "add":
+            task: dict = record["task"]
+            tasks_by_id[task["task_id"]] = task
+            return
+
+        task = tasks_by_id.get(record.get("task_id"))
+        if task is None:
+            return
+
+        if operation == "edit":
+            task["task_name"] = record["task_name"]
+            task["deadline"] = record["deadline"]
+        elif operation == "toggle":
+            task["completed"] = record["completed"]
+        elif operation == "delete":
+            del tasks_by_id[record["task_id"]]
+
+    def append(self, records: list) -> None:
+        """
+        Appends records to the journal file. If the file doesn't end
+        with a line break because the previous save was interrupted,
+        one is written first so new records start on their own line
+
+        Parameters
+        ----------
+        records : list
+            Journal records to write, in the order changes were made
+
+        Returns
+        ----------
+        None
+        """
+
+        if not records:
+            return
+
+        lines: str = "".join(
+            json.dumps(record, separators=(",", ":")) + "\n"
+            for record in records
+        )
+
+        with open(self.journal_dir, "ab+") as journal_file:
+            if journal_file.tell() > 0:
+                journal_file.seek(-1, os.SEEK_END)
+                if journal_file.read(1) != b"\n":
+                    lines = "\n" + lines
+
+            journal_file.write(lines.encode("utf-8"))
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+
+    def needs_compaction(self) -> bool:
+        try:
+            journal_size: int = os.path.getsize(self.journal_dir)
+        except OSError:
+            return False
+
+        return journal_size > self.compaction_threshold
+
+    def clear(self) -> None:
+        with open(self.journal_dir, "w"):
+            pass
+
+    @staticmethod
+    def add_record(task: dict) -> dict:
+        return {"op": "add", "task": dict(task)}
+
+    @staticmethod
+    def edit_record(task: dict) -> dict:
+        return {"op": "edit", "task_id": task["task_id"],
+                "task_name": task["task_name"], "deadline": task["deadline"]}
+
+    @staticmethod
+    def toggle_record(task: dict) -> dict:
+        return {"op": "toggle", "task_id": task["task_id"],
+                "completed": task["completed"]}
+
+    @staticmethod
+    def delete_record(task_id: str) -> dict:
+        return {"op": "delete", "task_id": task_id}
+
+
+class SnapshotReader():
+    """
+    Reads tasks from a JSON snapshot one task at a time, without
+    parsing the whole file at once. bytes_read and total_bytes show how
+    far reading has got.
+    """
+
+    def __init__(self, snapshot_dir: str, chunk_size: int = 65536) -> None:
+        """
+        Parameters
+        ----------
+        snapshot_dir : str
+            Path of JSON file that includes a list of tasks
+        chunk_size : int, default: 65536
+            Number of bytes read from the file at a time
+        """
+
+        self.snapshot_dir = snapshot_dir
+        self.chunk_size = chunk_size
+        self.bytes_read: int = 0
+        self.total_bytes: int = os.path.getsize(snapshot_dir)
+
+    def progress(self) -> float:
+        if not self.total_bytes:
+            return 1.0
+
+        return min(self.bytes_read / self.total_bytes, 1.0)
+
+    def __iter__(self) -> Iterator[dict]:
+        """
+        Yields tasks in the order they appear in the snapshot
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        tasks : Iterator[dict]
+            Tasks read from the snapshot
+
+        Raises
+        ----------
+        json.JSONDecodeError
+            If the snapshot is not a JSON list of objects
+        """
+
+        json_decoder = json.JSONDecoder()
+        utf8_decoder = codecs.getincrementaldecoder("utf-8")()
+
+        buffer: str = ""
+        position: int = 0
+        list_started: bool = False
+        end_of_file: bool = False
+
+        with open(self.snapshot_dir, "rb") as json_file:
+            while True:
+                chunk: bytes = json_file.read(self.chunk_size)
+                self.bytes_read += len(chunk)
+                end_of_file = not chunk
+
+                buffer = buffer[position:] + utf8_decoder.decode(
+                    chunk, final=end_of_file
+                )
+                position = 0
+
+                while True:
+                    while (position < len(buffer)
+                           and buffer[position] in " \t\r\n,"):
+                        position += 1
+
+                    if position >= len(buffer):
+                        break
+
+                    if not list_started:
+                        if buffer[position] != "[":
+                            raise json.JSONDecodeError(
+                                "Expecting '['", buffer, position
+                            )
+
+                        list_started = True
+                        position += 1
+                        continue
+
+                    if buffer[position] == "]":
+                        return
+
+                    try:
+                        task, position = json_decoder.raw_decode(
+                            buffer, position
+                        )
+                    except json.JSONDecodeError:
+                        if end_of_file:
+                            raise
+
+                        break
+
+                    yield task
+
+                if end_of_file:
+                    raise json.JSONDecodeError(
+                        "Expecting ']'", buffer, position
+                    )
@@ -0,0 +1,849 @@
+"""
+Virtualized task list for TODO_App_GUI.
+
+Only the rows that fit in the visible part of the list are real tkinter
+widgets. When the user scrolls, the same rows are rebound to different
+tasks, so the number of widgets depends on the window height instead of
+the number of tasks.
+"""
+
+import math
+import tkinter as tk
+
+from style_registry import StyleRegistry
+from task_store import Task
+from typing import Callable, Union
+
+
+class TaskRow():
+    """
+    A reusable task row: a frame that includes a checkbox, task info and
+    edit and delete buttons. A row is not tied to one task, bind_task
+    is called to show another task with the same widgets.
+    """
+
+    def __init__(self, list_view: "VirtualTaskList") -> None:
+        config_dict: dict = list_view.config_dict
+        styles: StyleRegistry = list_view.styles
+
+        self.list_view = list_view
+        self.index: Union[int, None] = None
+        self.task: Union[Task, None] = None
+        self.shown_state: Union[tuple, None] = None
+        self.shown_selected: bool = False
+        self.y: Union[int, None] = None
+
+        # Backgrounds of the row depend on whether it is selected and the
+        # task name's color on the task's state, so they are set by
+        # show_selected and bind_task instead of the style registry
+        self.task_frame = tk.Frame(
+            master=list_view.canvas,
+            bg=styles.bg("frame_bg_2")
+        )
+
+        self.checkbutton_variable = tk.IntVar(master=self.task_frame)
+
+        task_finished_checkbutton = tk.Checkbutton(
+            master=self.task_frame,
+            bg=styles.bg("frame_bg_2"),
+            variable=self.checkbutton_variable,
+            command=self.toggle,
+            name="task_finished_checkbox"
+        )
+        task_finished_checkbutton.pack(fill=tk.NONE, side=tk.LEFT, padx=5)
+
+        task_info_frame = tk.Frame(
+            master=self.task_frame,
+            bg=styles.bg("frame_bg_2"),
+            name="task_info_frame"
+        )
+        task_info_frame.pack(fill=tk.NONE, side=tk.LEFT, padx=5, ipadx=2)
+
+        self.task_name_label = tk.Label(
+            master=task_info_frame,
+            bg=styles.bg("frame_bg_2"),
+            fg=styles.fg("primary"),
+            font=styles.font("task_name"),
+            name="task_name_label"
+        )
+        self.task_name_label.pack(fill=tk.NONE, side=tk.TOP)
+
+        self.task_deadline_label = styles.style(
+            tk.Label(
+                master=task_info_frame,
+                bg=styles.bg("frame_bg_2"),
+                font=styles.font("task_deadline"),
+                name="task_deadline_label"
+            ),
+            fg="secondary"
+        )
+        self.task_deadline_label.pack(fill=tk.NONE, side=tk.TOP)
+
+        task_buttons_frame = tk.Frame(
+            master=self.task_frame,
+            bg=styles.bg("frame_bg_2"),
+            name="buttons_frame"
+        )
+        task_buttons_frame.pack(fill=tk.NONE, side=tk.RIGHT, padx=5)
+
+        task_delete_button = styles.style(
+            tk.Button(
+                master=task_buttons_frame,
+                font=styles.font("button"),
+                text=config_dict["button_texts"]["delete_task_button"],
+                relief=tk.FLAT,
+                command=self.delete,
+                name="delete_button"
+            ),
+            bg="frame_bg_1", fg="inverted"
+        )
+        task_delete_button.pack(fill=tk.NONE, side=tk.RIGHT, padx=1)
+
+        task_edit_button = styles.style(
+            tk.Button(
+                master=task_buttons_frame,
+                font=styles.font("button"),
+                text=config_dict["button_texts"]["edit_task_button"],
+                relief=tk.FLAT,
+                command=self.edit,
+                name="edit_button"
+            ),
+            bg="button_bg", fg="primary"
+        )
+        task_edit_button.pack(fill=tk.NONE, side=tk.RIGHT, padx=1)
+
+        for widget in (self.task_frame, task_finished_checkbutton,
+                       task_info_frame, self.task_name_label,
+                       self.task_deadline_label, task_buttons_frame,
+                       task_delete_button, task_edit_button):
+            list_view.add_scroll_bindtag(widget)
+
+        self.background_widgets: tuple = (
+            self.task_frame, task_finished_checkbutton, task_info_frame,
+            self.task_name_label, self.task_deadline_label, 
+            task_buttons_frame
+        )
+
+        for widget in (self.task_frame, task_info_frame, 
+                       self.task_name_label, self.task_deadline_label):
+            widget.bind(
+                "<Button-1>", 
+                lambda event: list_view.click_row(self, "replace")
+            )
+            widget.bind(
+                "<Control-Button-1>",
+                lambda event: list_view.click_row(self, "toggle")
+            )
+            widget.bind(
+                "<Shift-Button-1>",
+                lambda event: list_view.click_row(self, "extend")
+            )
+
+        self.window_id: int = list_view.canvas.create_window(
+            0, 0, anchor=tk.NW, window=self.task_frame, state=tk.HIDDEN
+        )
+
+    def bind_task(self, index: int, task: Task) -> None:
+        """
+        Shows a task in this row. Widgets are only reconfigured if the
+        task shown differs from what the row already displays
+
+        Parameters
+        ----------
+        index : int
+            Index of task in the list shown by the list view
+        task : Task
+            Task to show. Its task_id is passed to callbacks when the
+            user interacts with this row
+
+        Returns
+        ----------
+        None
+        """
+
+        self.index = index
+        self.task = task
+
+        selected: bool = task.task_id in self.list_view.selected_task_ids
+        if selected != self.shown_selected:
+            self.show_selected(selected)
+
+        new_state: tuple = task.state()
+        if new_state == self.shown_state:
+            return
+
+        self.shown_state = new_state
+        task_name, _, task_completed = new_state
+        styles: StyleRegistry = self.list_view.styles
+
+        self.task_name_label.config(text=task_name)
+        self.task_deadline_label.config(text=task.deadline_text())
+        self.checkbutton_variable.set(1 if task_completed else 0)
+
+        if task_completed:
+            self.task_name_label.config(
+                font=styles.font("task_name_completed"),
+                fg=styles.fg("secondary")
+            )
+        else:
+            self.task_name_label.config(
+                font=styles.font("task_name"),
+                fg=styles.fg("primary")
+            )
+
+    def show_selected(self, selected: bool) -> None:
+        background: str = self.list_view.styles.bg(
+            "selected_bg" if selected else "frame_bg_2"
+        )
+
+        for widget in self.background_widgets:
+            widget.config(bg=background)
+
+        self.shown_selected = selected
+
+    def restyle(self) -> None:
+        """
+        Reapplies the colors that depend on the row's task and whether
+        it is selected, after the theme changed
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        self.show_selected(self.shown_selected)
+        self.shown_state = None
+
+        if self.task is not None:
+            self.bind_task(index=self.index, task=self.task)
+
+    def unbind_task(self) -> None:
+        """
+        Detaches this row from its task and hides it
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        self.index = None
+        self.task = None
+        self.shown_state = None
+        self.y = None
+        self.list_view.canvas.itemconfigure(self.window_id, state=tk.HIDDEN)
+
+    def place(self, y: int) -> None:
+        """
+        Shows this row at the given height of the canvas. The row is
+        only moved if it isn't there already
+
+        Parameters
+        ----------
+        y : int
+            Canvas y coordinate of the top of the row
+
+        Returns
+        ----------
+        None
+        """
+
+        if y == self.y:
+            return
+
+        canvas: tk.Canvas = self.list_view.canvas
+        canvas.coords(self.window_id, self.list_view.row_padx, y)
+
+        if self.y is None:
+            canvas.itemconfigure(self.window_id, state=tk.NORMAL)
+
+        self.y = y
+
+    def destroy(self) -> None:
+        self.list_view.canvas.delete(self.window_id)
+        self.task_frame.destroy()
+
+    def toggle(self) -> None:
+        if self.task is not None:
+            self.list_view.on_toggle(
+                self.task.task_id, bool(self.checkbutton_variable.get())
+            )
+
+    def edit(self) -> None:
+        if self.task is not None:
+            self.list_view.on_edit(self.task.task_id)
+
+    def delete(self) -> None:
+        if self.task is not None:
+            self.list_view.on_delete(self.task.task_id)
+
+
+class TaskRowPool():
+    """
+    Keeps task rows that are not shown at the moment, so they can be
+    reused instead of building and destroying widgets. At most max_size
+    idle rows are kept, extra rows are destroyed. hits and misses count
+    how many rows were reused and how many had to be built.
+    """
+
+    def __init__(
+            self, 
+            create_row: Callable[[], TaskRow], 
+            max_size: int) -> None:
+        """
+        Parameters
+        ----------
+        create_row : Callable[[], TaskRow]
+            Builds a new task row when the pool is empty
+        max_size : int
+            Maximum number of idle rows kept in the pool
+        """
+
+        self.create_row = create_row
+        self.max_size = max_size
+        self.idle_rows: list = []
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.destroyed: int = 0
+
+    def prefill(self, count: int) -> None:
+        """
+        Builds rows ahead of time, up to max_size
+
+        Parameters
+        ----------
+        count : int
+            Number of rows to build
+
+        Returns
+        ----------
+        None
+        """
+
+        while len(self.idle_rows) < min(count, self.max_size):
+            self.idle_rows.append(self.create_row())
+
+    def acquire(self) -> TaskRow:
+        """
+        Returns an idle row, or a new row if there's no idle row
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        row : TaskRow
+            Row that is not bound to a task and is hidden
+        """
+
+        if self.idle_rows:
+            self.hits += 1
+            return self.idle_rows.pop()
+
+        self.misses += 1
+
+        return self.create_row()
+
+    def release(self, row: TaskRow) -> None:
+        """
+        Hides a row and keeps it for reuse. The row is destroyed if the
+        pool is full
+
+        Parameters
+        ----------
+        row : TaskRow
+            Row that is no longer shown
+
+        Returns
+        ----------
+        None
+        """
+
+        row.unbind_task()
+
+        if len(self.idle_rows) < self.max_size:
+            self.idle_rows.append(row)
+        else:
+            row.destroy()
+            self.destroyed += 1
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses,
+                "destroyed": self.destroyed, "idle": len(self.idle_rows),
+                "max_size": self.max_size}
+
+
+class VirtualTaskList():
+    """
+    A scrollable list of tasks that only creates widgets for the rows
+    on screen. The list doesn't own the tasks, it shows whatever
+    sequence is given to set_tasks and reports user actions through
+    on_toggle, on_edit and on_delete callbacks with the task_id of the
+    task.
+    """
+
+    def __init__(
+            self,
+            master: tk.Misc,
+            config_dict: dict,
+            styles: StyleRegistry,
+            on_toggle: Callable[[str, bool], None],
+            on_edit: Callable[[str], None],
+            on_delete: Callable[[str], None]) -> None:
+        self.config_dict = config_dict
+        self.styles = styles
+        self.on_toggle = on_toggle
+        self.on_edit = on_edit
+        self.on_delete = on_delete
+
+        self.row_padx: int = 6
+        self.row_pady: int = 3
+        self.row_height: int = self.fitting_row_height()
+
+        self.tasks: list = []
+        self.rows: list = []
+        self.top: int = 0
+
+        self.selected_task_ids: set = set()
+        self.selection_anchor: Union[int, None] = None
+
+        self.row_pool = TaskRowPool(
+            create_row=lambda: TaskRow(list_view=self),
+            max_size=config_dict["task_row_pool"]["max_size"]
+        )
+
+        self.scroll_bindtag: str = f"VirtualTaskList{id(self)}"
+
+        self.list_frame = styles.style(
+            tk.Frame(master=master, name="task_list_frame"),
+            bg="frame_bg_3"
+        )
+
+        self.scrollbar = tk.Scrollbar(
+            master=self.list_frame,
+            orient=tk.VERTICAL,
+            command=self.yview,
+            name="task_list_scrollbar"
+        )
+        self.scrollbar.pack(fill=tk.Y, side=tk.RIGHT)
+
+        self.canvas = styles.style(
+            tk.Canvas(
+                master=self.list_frame,
+                highlightthickness=0,
+                name="task_list_canvas"
+            ),
+            bg="frame_bg_3"
+        )
+        self.canvas.pack(fill=tk.BOTH, side=tk.LEFT, expand=True)
+        self.add_scroll_bindtag(self.canvas)
+
+        self.row_pool.prefill(config_dict["task_row_pool"]["prefill"])
+
+        self.canvas.bind("<Configure>", self.on_resize)
+        self.canvas.bind_class(
+            self.scroll_bindtag, "<MouseWheel>", self.on_mouse_wheel
+        )
+        self.canvas.bind_class(
+            self.scroll_bindtag, "<Button-4>",
+            lambda event: self.scroll_rows(-1)
+        )
+        self.canvas.bind_class(
+            self.scroll_bindtag, "<Button-5>",
+            lambda event: self.scroll_rows(1)
+        )
+
+        styles.add_listener(self.on_style_change)
+
+    def pack(self, **pack_options) -> None:
+        self.list_frame.pack(**pack_options)
+
+    def fitting_row_height(self) -> int:
+        """
+        Returns the row height set in the YAML file, or the height the
+        task name and deadline need with the current fonts if that is
+        larger
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        row_height : int
+            Height of a row and the space around it, in pixels
+        """
+
+        # Labels add a border and padding of 2 pixels on each side
+        text_height: int = sum(
+            self.styles.font(font_name).metrics("linespace") + 4
+            for font_name in ("task_name", "task_deadline")
+        )
+
+        return max(
+            self.config_dict["task_row_height"],
+            text_height + 2 * self.row_pady
+        )
+
+    def on_style_change(self) -> None:
+        """
+        Recolors rows after the theme changed and resizes them to fit
+        the fonts after the font size changed. Only the rows on screen
+        and in the row pool exist, so this doesn't depend on the number
+        of tasks. The list stays scrolled to the same task
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        for row in self.rows + self.row_pool.idle_rows:
+            row.restyle()
+
+        row_height: int = self.fitting_row_height()
+        if row_height == self.row_height:
+            return
+
+        self.top = self.top * row_height // self.row_height
+        self.row_height = row_height
+        self.on_resize()
+
+    def add_scroll_bindtag(self, widget: tk.Misc) -> None:
+        """
+        Makes mouse wheel events over a widget scroll this list
+
+        Parameters
+        ----------
+        widget : tk.Misc
+            Widget inside the list, such as a row label or button
+
+        Returns
+        ----------
+        None
+        """
+
+        widget.bindtags((self.scroll_bindtag,) + widget.bindtags())
+
+    def set_tasks(self, tasks: list) -> None:
+        """
+        Replaces the list of tasks shown in the list view and redraws
+        the visible rows
+
+        Parameters
+        ----------
+        tasks : list
+            Tasks to show. The list view keeps a reference to it, so
+            after changing the list in place refresh should be called
+
+        Returns
+        ----------
+        None
+        """
+
+        self.tasks = tasks
+        self.refresh()
+
+    def append_task(self, task: Task) -> None:
+        """
+        Adds a task to the end of the list view and scrolls to it
+
+        Parameters
+        ----------
+        task : Task
+            Task to add
+
+        Returns
+        ----------
+        None
+        """
+
+        self.tasks.append(task)
+        self.see(len(self.tasks) - 1)
+
+    def extend_tasks(self, tasks: list) -> None:
+        """
+        Adds tasks to the end of the list view without scrolling
+
+        Parameters
+        ----------
+        tasks : list
+            Tasks to add
+
+        Returns
+        ----------
+        None
+        """
+
+        self.tasks.extend(tasks)
+        self.refresh()
+
+    def remove_task(self, task: Task) -> None:
+        """
+        Removes a task from the list view, redraws the visible rows.
+        Tasks are usually deleted from their own row, so visible rows
+        are checked before searching the whole list
+
+        Parameters
+        ----------
+        task : Task
+            Task to remove. Compared by identity, so tasks with equal
+            content are not mixed up
+
+        Returns
+        ----------
+        None
+        """
+
+        task_index: Union[int, None] = None
+
+        for row in self.rows:
+            if row.task is task:
+                task_index = row.index
+                break
+
+        if task_index is None:
+            for index, shown_task in enumerate(self.tasks):
+                if shown_task is task:
+                    task_index = index
+                    break
+
+        if task_index is not None:
+            del self.tasks[task_index]
+
+        self.refresh()
+
+    def click_row(self, row: TaskRow, selection_mode: str) -> None:
+        """
+        Changes selected tasks after the user clicked a row
+
+        Parameters
+        ----------
+        row : TaskRow
+            Clicked row
+        selection_mode : str
+            "replace" selects only the row's task, "toggle" adds it to
+            or removes it from the selection, and "extend" selects the
+            tasks between the last clicked task and this one
+
+        Returns
+        ----------
+        None
+        """
+
+        if row.task is None:
+            return
+
+        if (selection_mode == "extend" 
+                and self.selection_anchor is not None
+                and self.selection_anchor < len(self.tasks)):
+            first_index, last_index = sorted(
+                (self.selection_anchor, row.index)
+            )
+            self.selected_task_ids = {
+                self.tasks[task_index].task_id
+                for task_index in range(first_index, last_index + 1)
+            }
+        elif selection_mode == "toggle":
+            self.selected_task_ids ^= {row.task.task_id}
+            self.selection_anchor = row.index
+        else:
+            self.selected_task_ids = {row.task.task_id}
+            self.selection_anchor = row.index
+
+        self.refresh()
+
+    def select_all(self) -> None:
+        self.selected_task_ids = {task.task_id for task in self.tasks}
+        self.refresh()
+
+    def clear_selection(self) -> None:
+        self.selected_task_ids = set()
+        self.selection_anchor = None
+        self.refresh()
+
+    def total_height(self) -> int:
+        return len(self.tasks) * self.row_height
+
+    def viewport_height(self) -> int:
+        return max(self.canvas.winfo_height(), 1)
+
+    def on_resize(self, event: Union[tk.Event, None] = None) -> None:
+        """
+        Takes rows that are needed to fill the visible area of the list
+        from the row pool, gives rows that no longer fit back to it, 
+        resizes rows to the width of the list
+
+        Parameters
+        ----------
+        event : tk.Event or None, default: None
+            Configure event of the canvas. Default is None
+
+        Returns
+        ----------
+        None
+        """
+
+        rows_needed: int = math.ceil(
+            self.viewport_height() / self.row_height
+        ) + 1
+
+        while len(self.rows) < rows_needed:
+            self.rows.append(self.row_pool.acquire())
+
+        for row in self.rows[rows_needed:]:
+            self.row_pool.release(row)
+
+        del self.rows[rows_needed:]
+
+        row_width: int = max(
+            self.canvas.winfo_width() - 2 * self.row_padx, 1
+        )
+        for row in self.rows:
+            self.canvas.itemconfigure(
+                row.window_id,
+                width=row_width,
+                height=self.row_height - 2 * self.row_pady
+            )
+
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        Binds visible rows to the tasks at the current scroll position,
+        hides rows below the last task, updates the scrollbar. A task
+        that is already shown keeps its row, which is only moved if the
+        task's position changed, so re-ordering the shown tasks, for
+        example by switching to another view, doesn't reconfigure rows
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        self.top = self.clamp_top(self.top)
+
+        first_index: int = self.top // self.row_height
+        offset: int = self.top % self.row_height
+        visible_tasks: list = [
+            self.tasks[task_index] for task_index in range(
+                first_index, min(first_index + len(self.rows), len(self.tasks))
+            )
+        ]
+
+        rows_by_task: dict = {
+            id(row.task): row for row in self.rows if row.task is not None
+        }
+        slot_rows: list = [
+            rows_by_task.pop(id(task), None) for task in visible_tasks
+        ]
+        free_rows: list = [
+            row for row in self.rows 
+            if row.task is None or id(row.task) in rows_by_task
+        ]
+
+        for slot, task in enumerate(visible_tasks):
+            row: Union[TaskRow, None] = slot_rows[slot] or free_rows.pop()
+
+            row.bind_task(index=first_index + slot, task=task)
+            row.place(slot * self.row_height - offset + self.row_pady)
+
+        for row in free_rows:
+            if row.task is not None:
+                row.unbind_task()
+
+        total_height: int = self.total_height()
+        if total_height <= self.viewport_height():
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(
+                self.top / total_height,
+                (self.top + self.viewport_height()) / total_height
+            )
+
+    def clamp_top(self, top: int) -> int:
+        max_top: int = max(self.total_height() - self.viewport_height(), 0)
+
+        return min(max(int(top), 0), max_top)
+
+    def scroll_to(self, top: int) -> None:
+        self.top = self.clamp_top(top)
+        self.refresh()
+
+    def scroll_rows(self, rows: int) -> None:
+        self.scroll_to(self.top + rows * self.row_height)
+
+    def see(self, index: int) -> None:
+        """
+        Scrolls the list so that task at the given index is visible
+
+        Parameters
+        ----------
+        index : int
+            Index of the task in the shown sequence
+
+        Returns
+        ----------
+        None
+        """
+
+        task_top: int = index * self.row_height
+        task_bottom: int = task_top + self.row_height
+
+        if task_top < self.top:
+            self.scroll_to(task_top)
+        elif task_bottom > self.top + self.viewport_height():
+            self.scroll_to(task_bottom - self.viewport_height())
+        else:
+            self.refresh()
+
+    def yview(self, *args) -> None:
+        """
+        Scrollbar command. Handles "moveto" and "scroll" requests sent
+        by tk.Scrollbar
+
+        Parameters
+        ----------
+        *args
+            Scroll request, like ("moveto", "0.5") or
+            ("scroll", "1", "units")
+
+        Returns
+        ----------
+        None
+        """
+
+        if not args:
+            return
+
+        if args[0] == tk.MOVETO:
+            self.scroll_to(float(args[1]) * self.total_height())
+        elif args[0] == tk.SCROLL:
+            amount: int = int(args[1])
+
+            if args[2] == tk.PAGES:
+                self.scroll_to(self.top + amount * self.viewport_height())
+            else:
+                self.scroll_rows(amount)
+
+    def on_mouse_wheel(self, event: tk.Event) -> None:
+        if event.delta > 0:
+            self.scroll_rows(-max(event.delta // 120, 1))
+        elif event.delta < 0:
+            self.scroll_rows(max(-event.delta // 120, 1))
@@ -0,0 +1,1105 @@
+"""
+Storage backends that TODO_App_GUI loads tasks from and saves changes
+to. The backend is chosen with the storage.backend key of the YAML
+config file:
+
+- "json" keeps tasks in a JSON snapshot and an append-only journal
+- "binary" keeps tasks in a binary snapshot (see binary_snapshot) and
+  an append-only journal
+- "sqlite" keeps tasks in an SQLite database with indexes on deadline
+  and completion state, and can be queried a page at a time
+
+Changes to tasks are passed to backends as journal records (see
+TaskJournal), so every backend saves the same kind of change list. JSON
+files can be imported to and exported from every backend.
+
+Several app instances may use the same files. The JSON and binary
+backends keep a version counter in a lock file next to the snapshot
+(see VersionFile). A save that finds the version changed since tasks
+were loaded merges its changes with the stored tasks task by task and
+raises SaveConflictError for changes that can't be merged. SQLite
+databases are locked by SQLite itself.
+"""
+
+import os
+import json
+import uuid
+import datetime
+import itertools
+import threading
+
+from binary_snapshot import BinarySnapshotReader, write_binary_snapshot
+from task_journal import (
+    SnapshotReader, TaskJournal, VersionFile, write_file_atomically
+)
+from typing import Iterable, Iterator, TextIO, Union
+
+
+def deadline_to_ordinal(deadline: str) -> int:
+    return datetime.datetime.strptime(deadline, "%d-%m-%Y").toordinal()
+
+
+def ordinal_to_deadline(ordinal: int) -> str:
+    return datetime.date.fromordinal(ordinal).strftime("%d-%m-%Y")
+
+
+def write_json_list(
+        json_file: TextIO, tasks: Iterable[dict], batch_size: int = 1000) -> int:
+    """
+    Writes tasks to a file as a JSON list, one task per line. Lines are
+    written batch_size at a time, so tasks can be streamed from another
+    file or a database
+
+    Parameters
+    ----------
+    json_file : TextIO
+        File to write to
+    tasks : Iterable[dict]
+        Tasks to write
+    batch_size : int, default: 1000
+        Number of tasks written at a time
+
+    Returns
+    ----------
+    written_count : int
+        Number of tasks written
+    """
+
+    written_count: int = 0
+    lines: list = []
+
+    json_file.write("[")
+
+    for task in tasks:
+        lines.append(("\n  " if not written_count else ",\n  ")
+                     + json.dumps(task))
+        written_count += 1
+
+        if len(lines) >= batch_size:
+            json_file.write("".join(lines))
+            lines = []
+
+    json_file.write("".join(lines) + "\n]\n")
+
+    return written_count
+
+
+class SaveConflictError(Exception):
+    """
+    Raised by save when changes were made to tasks that another process
+    changed differently or deleted since they were loaded. The other
+    process's changes are kept, the other changes of the save are
+    saved.
+    """
+
+    def __init__(self, conflicted_task_names: list) -> None:
+        """
+        Parameters
+        ----------
+        conflicted_task_names : list
+            Names of the tasks whose changes weren't saved
+        """
+
+        super().__init__(
+            f"{len(conflicted_task_names)} tasks were changed by another "
+            "program at the same time"
+        )
+        self.conflicted_task_names = conflicted_task_names
+
+
+class TaskStorage():
+    """
+    Base class of storage backends.
+    """
+
+    def iter_tasks(self) -> Iterator[dict]:
+        """
+        Yields stored tasks in the order they were added. Tasks are read
+        lazily, so callers can show tasks while the rest is being read
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        tasks : Iterator[dict]
+            Stored tasks
+        """
+
+        raise NotImplementedError
+
+    def load_progress(self) -> float:
+        """
+        Returns how much of the stored tasks iter_tasks has read, as a
+        number between 0 and 1
+        """
+
+        raise NotImplementedError
+
+    def read_pending_records(self) -> Iterable[dict]:
+        """
+        Yields changes that were saved but are not part of the tasks
+        yielded by iter_tasks yet. They should be applied after
+        iter_tasks is exhausted
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        records : Iterable[dict]
+            Journal records
+        """
+
+        return ()
+
+    def iter_current_tasks(self) -> Iterator[dict]:
+        """
+        Yields stored tasks with pending changes (see 
+        read_pending_records) applied, without loading all tasks in 
+        memory. Used by exports and other tools that don't load tasks 
+        to a TaskStore
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        tasks : Iterator[dict]
+            Stored tasks in the order they were added
+        """
+
+        return self.iter_tasks()
+
+    def needs_compaction(self) -> bool:
+        """
+        Returns True if the next save should rewrite all tasks instead
+        of saving only the changes
+        """
+
+        return False
+
+    def watched_files(self) -> list:
+        """
+        Returns the files that change when tasks are saved, so changes
+        other programs make to them can be detected
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        file_dirs : list
+            Paths of the files. Empty if changes can't be detected
+        """
+
+        return []
+
+    def save(self, records: list, tasks: Iterable[dict],
+             full_rewrite: bool = False,
+             base_states: Union[dict, None] = None) -> bool:
+        """
+        Saves changes made to tasks. May be called from a thread other
+        than the one that created the backend
+
+        Parameters
+        ----------
+        records : list
+            Journal records of changes made since the last save
+        tasks : Iterable[dict]
+            All current tasks. Only used if full_rewrite is True
+        full_rewrite : bool, default: False
+            If True, stored tasks are replaced with tasks instead of
+            applying records
+        base_states : dict or None, default: None
+            States (see Task.state) of the changed tasks before they
+            were changed, keyed by task ID, None for added tasks. Used
+            to merge with changes of other processes
+
+        Returns
+        ----------
+        changed_elsewhere : bool
+            True if another process had saved changes since tasks were
+            loaded, so they have to be reloaded. False if the backend
+            can't tell
+
+        Raises
+        ----------
+        SaveConflictError
+            If some changes conflicted with changes of another process
+        """
+
+        raise NotImplementedError
+
+    def import_tasks(self, tasks: Iterable[dict], batch_size: int = 1000) -> int:
+        """
+        Adds tasks to stored tasks. Tasks are read from the iterable 
+        and saved batch_size at a time, so any number of tasks can be
+        imported in constant memory. Tasks without an ID are given one
+
+        Parameters
+        ----------
+        tasks : Iterable[dict]
+            Tasks to add, in the JSON file format
+        batch_size : int, default: 1000
+            Number of tasks saved at a time
+
+        Returns
+        ----------
+        imported_count : int
+            Number of tasks imported
+        """
+
+        imported_count: int = 0
+        records: list = []
+
+        for task in tasks:
+            task["task_id"] = task.get("task_id") or uuid.uuid4().hex
+            records.append(TaskJournal.add_record(task))
+            imported_count += 1
+
+            if len(records) >= batch_size:
+                self.save(records=records, tasks=())
+                records = []
+
+        if records:
+            self.save(records=records, tasks=())
+
+        return imported_count
+
+    def import_json(self, json_dir: str) -> int:
+        """
+        Adds tasks in a JSON file to stored tasks. Tasks without an ID
+        are given one
+
+        Parameters
+        ----------
+        json_dir : str
+            Path of JSON file that includes a list of tasks
+
+        Returns
+        ----------
+        imported_count : int
+            Number of tasks imported
+        """
+
+        return self.import_tasks(SnapshotReader(json_dir))
+
+    def export_json(self, json_dir: str) -> int:
+        """
+        Writes stored tasks to a JSON file
+
+        Parameters
+        ----------
+        json_dir : str
+            Path of JSON file to write
+
+        Returns
+        ----------
+        exported_count : int
+            Number of tasks exported
+        """
+
+        exported_count: int = 0
+
+        def write_tasks(json_file: TextIO) -> None:
+            nonlocal exported_count
+
+            exported_count = write_json_list(
+                json_file=json_file, tasks=self.iter_current_tasks()
+            )
+
+        write_file_atomically(file_dir=json_dir, write_contents=write_tasks)
+
+        return exported_count
+
+    def close(self) -> None:
+        pass
+
+
+class JsonJournalStorage(TaskStorage):
+    """
+    Keeps tasks in a JSON snapshot and saves changes to a journal file
+    that is folded into the snapshot once it grows past a threshold.
+    """
+
+    def __init__(self, task_journal: TaskJournal) -> None:
+        self.task_journal = task_journal
+        self.snapshot_reader: Union[SnapshotReader, None] = None
+
+        self.version_file = VersionFile(f"{task_journal.snapshot_dir}.lock")
+        # Version of the stored tasks the app's tasks were read from.
+        # Read by the autosave thread, so only changed while holding the lock
+        self.loaded_version: int = 0
+        self.loaded_version_lock = threading.Lock()
+
+    def open_snapshot(self) -> SnapshotReader:
+        return SnapshotReader(self.task_journal.snapshot_dir)
+
+    def write_snapshot(
+            self,
+            tasks: Iterable[dict],
+            batch_size: int = 1000,
+            snapshot_dir: Union[str, None] = None) -> None:
+        """
+        Replaces the snapshot with the given tasks atomically. Tasks are
+        streamed to the file, so they don't have to fit in memory
+
+        Parameters
+        ----------
+        tasks : Iterable[dict]
+            Tasks in the JSON file format
+        batch_size : int, default: 1000
+            Number of tasks written to the file at a time
+        snapshot_dir : str or None, default: None
+            Path of the file to write, the snapshot if None
+
+        Returns
+        ----------
+        None
+        """
+
+        write_file_atomically(
+            file_dir=snapshot_dir or self.task_journal.snapshot_dir,
+            write_contents=lambda json_file: write_json_list(
+                json_file=json_file, tasks=tasks, batch_size=batch_size
+            )
+        )
+
+    def track_version(self, tasks: Iterable[dict]) -> Iterator[dict]:
+        """
+        Yields tasks read from the files. Once all are read, the version
+        they were read at becomes the loaded version, unless another
+        process saved while they were read
+
+        Parameters
+        ----------
+        tasks : Iterable[dict]
+            Tasks being read from the snapshot and journal
+
+        Returns
+        ----------
+        tasks : Iterator[dict]
+            The same tasks
+        """
+
+        version: int = self.version_file.read()
+
+        yield from tasks
+
+        if self.version_file.read() != version:
+            return
+
+        with self.loaded_version_lock:
+            self.loaded_version = max(self.loaded_version, version)
+
+    def iter_tasks(self) -> Iterator[dict]:
+        self.snapshot_reader = self.open_snapshot()
+
+        return self.track_version(self.snapshot_reader)
+
+    def load_progress(self) -> float:
+        if self.snapshot_reader is None:
+            return 0.0
+
+        return self.snapshot_reader.progress()
+
+    def read_pending_records(self) -> Iterable[dict]:
+        if not self.task_journal.has_records():
+            return ()
+
+        return self.task_journal.read_records()
+
+    def needs_compaction(self) -> bool:
+        return self.task_journal.needs_compaction()
+
+    def watched_files(self) -> list:
+        return [self.task_journal.snapshot_dir, self.task_journal.journal_dir]
+
+    def save(self, records: list, tasks: Iterable[dict],
+             full_rewrite: bool = False,
+             base_states: Union[dict, None] = None) -> bool:
+        """
+        Appends records to the journal, or writes tasks to a new
+        snapshot if full_rewrite is True. The version file is locked
+        only while the journal is appended to or the new snapshot is
+        renamed over the old one. If another process saved since tasks
+        were loaded, a full rewrite would drop its changes, so only
+        records are saved, merged with the stored tasks (see
+        merge_records). Changes of earlier saves that failed are lost
+        in that case
+
+        Parameters
+        ----------
+        records : list
+            Journal records of changes made since the last save
+        tasks : Iterable[dict]
+            All current tasks. Only used if full_rewrite is True
+        full_rewrite : bool, default: False
+            If True, stored tasks are replaced with tasks
+        base_states : dict or None, default: None
+            States of the changed tasks before they were changed, keyed
+            by task ID. If None, records are appended without merging
+
+        Returns
+        ----------
+        changed_elsewhere : bool
+            True if another process had saved since tasks were loaded
+
+        Raises
+        ----------
+        SaveConflictError
+            If some records conflicted with changes of another process
+        """
+
+        with self.loaded_version_lock:
+            checked_version: int = self.loaded_version
+
+        if full_rewrite and self.replace_snapshot(
+                tasks=tasks, expected_version=checked_version):
+            return False
+
+        changed_elsewhere: bool = full_rewrite
+        conflicted_task_names: list = []
+
+        while records:
+            with self.version_file.locked() as version:
+                if version == checked_version or base_states is None:
+                    self.task_journal.append(records=records)
+                    self.version_file.write(version + 1)
+                    self.advance_loaded_version(version)
+                    changed_elsewhere |= version != checked_version
+                    break
+
+            changed_elsewhere = True
+
+            # The stored tasks are read without holding the lock, and
+            # read again if another process saved in the meantime
+            stored_tasks: dict = self.read_stored_tasks(
+                task_ids=base_states.keys()
+            )
+            if self.version_file.read() != version:
+                continue
+
+            records, conflicted_tasks = self.merge_records(
+                records=records, base_states=base_states,
+                stored_tasks=stored_tasks
+            )
+            conflicted_task_names.extend(conflicted_tasks)
+            checked_version = version
+
+        if conflicted_task_names:
+            raise SaveConflictError(conflicted_task_names)
+
+        return changed_elsewhere
+
+    def advance_loaded_version(self, saved_version: int) -> None:
+        # Tasks in the app include the saved changes, but only include
+        # the changes of other processes if they were loaded before
+        with self.loaded_version_lock:
+            if self.loaded_version == saved_version:
+                self.loaded_version = saved_version + 1
+
+    def replace_snapshot(
+            self, tasks: Iterable[dict], expected_version: int) -> bool:
+        """
+        Writes tasks to a new snapshot next to the current one without
+        holding the lock, then replaces the snapshot and empties the
+        journal if no other process saved in the meantime
+
+        Parameters
+        ----------
+        tasks : Iterable[dict]
+            All current tasks
+        expected_version : int
+            Version the tasks are based on
+
+        Returns
+        ----------
+        replaced : bool
+            False if the version changed and the snapshot was left as
+            it was
+        """
+
+        new_snapshot_dir: str = (
+            f"{self.task_journal.snapshot_dir}.{os.getpid()}.new"
+        )
+
+        try:
+            self.write_snapshot(tasks=tasks, snapshot_dir=new_snapshot_dir)
+
+            with self.version_file.locked() as version:
+                if version != expected_version:
+                    return False
+
+                os.replace(new_snapshot_dir, self.task_journal.snapshot_dir)
+                self.task_journal.clear()
+                self.version_file.write(version + 1)
+                self.advance_loaded_version(version)
+        finally:
+            if os.path.exists(new_snapshot_dir):
+                os.remove(new_snapshot_dir)
+
+        return True
+
+    @staticmethod
+    def record_task_id(record: dict) -> Union[str, None]:
+        if record.get("op") == "add":
+            return record["task"].get("task_id")
+
+        return record.get("task_id")
+
+    @staticmethod
+    def task_state(task: dict) -> tuple:
+        return (task["task_name"], deadline_to_ordinal(task["deadline"]),
+                bool(task.get("completed")))
+
+    def read_stored_tasks(self, task_ids: Iterable[str]) -> dict:
+        task_ids = set(task_ids)
+
+        return {
+            task["task_id"]: task for task in self.read_current_tasks()
+            if task.get("task_id") in task_ids
+        }
+
+    def merge_records(
+            self,
+            records: list,
+            base_states: dict,
+            stored_tasks: dict) -> tuple:
+        """
+        Merges records with changes another process saved. Records of
+        tasks the other process didn't change are kept. Records of tasks
+        it changed are replaced with records that set the fields only
+        this process changed. A task conflicts if both processes changed
+        the same field to different values, or one deleted a task the
+        other changed. Its records are dropped, so the other process's
+        changes are kept
+
+        Parameters
+        ----------
+        records : list
+            Journal records to save
+        base_states : dict
+            States of the changed tasks before they were changed, keyed
+            by task ID. Updated to the stored states of merged tasks,
+            conflicted tasks are removed
+        stored_tasks : dict
+            Stored tasks with changed IDs, keyed by task ID
+
+        Returns
+        ----------
+        merged : tuple
+            Records to save and names of the conflicted tasks
+        """
+
+        final_tasks: dict = {}
+        for task_id, base_state in base_states.items():
+            if base_state is not None:
+                final_tasks[task_id] = {
+                    "task_id": task_id, "task_name": base_state[0],
+                    "deadline": ordinal_to_deadline(base_state[1]),
+                    "completed": base_state[2]
+                }
+
+        for record in records:
+            TaskJournal.apply_record(tasks_by_id=final_tasks, record=record)
+
+        unchanged_task_ids: set = set()
+        merged_records: list = []
+        merged_states: dict = {}
+        dropped_task_ids: list = []
+        conflicted_task_names: list = []
+
+        for task_id, base_state in base_states.items():
+            stored_task: Union[dict, None] = stored_tasks.get(task_id)
+            final_task: Union[dict, None] = final_tasks.get(task_id)
+
+            if base_state is None:
+                unchanged_task_ids.add(task_id)
+                continue
+
+            if stored_task is None:
+                dropped_task_ids.append(task_id)
+                if final_task is not None:
+                    conflicted_task_names.append(final_task["task_name"])
+                continue
+
+            stored_state: tuple = self.task_state(stored_task)
+
+            if stored_state == base_state:
+                unchanged_task_ids.add(task_id)
+                continue
+
+            if final_task is None:
+                dropped_task_ids.append(task_id)
+                conflicted_task_names.append(stored_task["task_name"])
+                continue
+
+            final_state: tuple = self.task_state(final_task)
+            merged_state: list = []
+
+            for base_field, stored_field, final_field in zip(
+                    base_state, stored_state, final_state):
+                if final_field == base_field:
+                    merged_state.append(stored_field)
+                elif stored_field in (base_field, final_field):
+                    merged_state.append(final_field)
+                else:
+                    break
+
+            if len(merged_state) < len(base_state):
+                dropped_task_ids.append(task_id)
+                conflicted_task_names.append(final_task["task_name"])
+                continue
+
+            merged_task: dict = {
+                "task_id": task_id, "task_name": merged_state[0],
+                "deadline": ordinal_to_deadline(merged_state[1]),
+                "completed": merged_state[2]
+            }
+
+            if merged_state[:2] != list(stored_state[:2]):
+                merged_records.append(TaskJournal.edit_record(merged_task))
+            if merged_state[2] != stored_state[2]:
+                merged_records.append(TaskJournal.toggle_record(merged_task))
+
+            merged_states[task_id] = stored_state
+
+        base_states.update(merged_states)
+        for task_id in dropped_task_ids:
+            del base_states[task_id]
+
+        kept_records: list = [
+            record for record in records
+            if self.record_task_id(record) in unchanged_task_ids
+        ]
+
+        return kept_records + merged_records, conflicted_task_names
+
+    def iter_current_tasks(self) -> Iterator[dict]:
+        """
+        Yields tasks of the snapshot with the journal applied. Only the
+        journal is kept in memory, which is small since it is folded 
+        into the snapshot once it grows past the compaction threshold.
+        Tasks added in the journal come after the snapshot's tasks
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        tasks : Iterator[dict]
+            Current tasks
+        """
+
+        return self.track_version(self.read_current_tasks())
+
+    def read_current_tasks(self) -> Iterator[dict]:
+        records_by_id: dict = {}
+
+        for record in self.read_pending_records():
+            records_by_id.setdefault(
+                self.record_task_id(record), []
+            ).append(record)
+
+        if os.path.exists(self.task_journal.snapshot_dir):
+            for task in self.open_snapshot():
+                if not task.get("task_id"):
+                    yield task
+                    continue
+
+                task_records: Union[list, None] = records_by_id.pop(
+                    task["task_id"], None
+                )
+
+                if task_records is None:
+                    yield task
+                    continue
+
+                yield from self.replay_records(
+                    tasks_by_id={task["task_id"]: task}, records=task_records
+                )
+
+        for task_records in records_by_id.values():
+            yield from self.replay_records(tasks_by_id={}, records=task_records)
+
+    @staticmethod
+    def replay_records(tasks_by_id: dict, records: list) -> Iterator[dict]:
+        for record in records:
+            TaskJournal.apply_record(tasks_by_id=tasks_by_id, record=record)
+
+        yield from tasks_by_id.values()
+
+    def import_tasks(self, tasks: Iterable[dict], batch_size: int = 1000) -> int:
+        """
+        Writes a new snapshot that includes the current tasks followed
+        by the imported tasks, empties the journal. Both are streamed, 
+        so memory use doesn't depend on the number of tasks. Tasks 
+        without an ID are given one. Unlike other backends, an imported
+        task whose ID is already used doesn't replace the stored task
+        but is given a new ID when tasks are loaded
+
+        Parameters
+        ----------
+        tasks : Iterable[dict]
+            Tasks to add, in the JSON file format
+        batch_size : int, default: 1000
+            Number of tasks written to the file at a time
+
+        Returns
+        ----------
+        imported_count : int
+            Number of tasks imported
+        """
+
+        imported_count: int = 0
+
+        def imported_tasks() -> Iterator[dict]:
+            nonlocal imported_count
+
+            for task in tasks:
+                task["task_id"] = task.get("task_id") or uuid.uuid4().hex
+                imported_count += 1
+                yield task
+
+        # Imported tasks may be streamed from stdin and can't be read
+        # twice, so the version file stays locked until the snapshot is
+        # written. Saves of running apps wait for the import
+        with self.version_file.locked() as version:
+            self.write_snapshot(
+                tasks=itertools.chain(
+                    self.read_current_tasks(), imported_tasks()
+                ),
+                batch_size=batch_size
+            )
+            self.task_journal.clear()
+            self.version_file.write(version + 1)
+
+        return imported_count
+
+
+class BinaryJournalStorage(JsonJournalStorage):
+    """
+    Keeps tasks in a binary snapshot with fixed-width records instead
+    of a JSON snapshot, and saves changes to a journal like
+    JsonJournalStorage. The snapshot is about half the size of a JSON
+    one and is read through mmap. Loading decodes the snapshot a page
+    of records at a time through read_range.
+    """
+
+    def __init__(
+            self,
+            task_journal: TaskJournal,
+            page_size: int = 1000) -> None:
+        super().__init__(task_journal=task_journal)
+
+        self.page_size = page_size
+
+    def open_snapshot(self) -> BinarySnapshotReader:
+        return BinarySnapshotReader(self.task_journal.snapshot_dir)
+
+    def read_pages(
+            self,
+            snapshot_reader: BinarySnapshotReader) -> Iterator[dict]:
+        """
+        Yields the tasks of the snapshot in order, decoding page_size
+        records at a time by their position
+
+        Parameters
+        ----------
+        snapshot_reader : BinarySnapshotReader
+            Reader of the snapshot, opened here and closed once all
+            tasks are read
+
+        Returns
+        ----------
+        tasks : Iterator[dict]
+            Tasks in the JSON file format
+        """
+
+        with snapshot_reader:
+            snapshot_reader.records_read = 0
+
+            for start in range(0, len(snapshot_reader), self.page_size):
+                page: list = snapshot_reader.read_range(
+                    start=start, stop=start + self.page_size
+                )
+                snapshot_reader.records_read += len(page)
+
+                yield from page
+
+    def iter_tasks(self) -> Iterator[dict]:
+        self.snapshot_reader = self.open_snapshot()
+
+        return self.track_version(self.read_pages(self.snapshot_reader))
+
+    def write_snapshot(
+            self,
+            tasks: Iterable[dict],
+            batch_size: int = 1000,
+            snapshot_dir: Union[str, None] = None) -> None:
+        write_file_atomically(
+            file_dir=snapshot_dir or self.task_journal.snapshot_dir,
+            write_contents=lambda snapshot_file: write_binary_snapshot(
+                snapshot_file=snapshot_file, tasks=tasks,
+                batch_size=batch_size
+            ),
+            binary=True
+        )
+
+
+class SQLiteStorage(TaskStorage):
+    """
+    Keeps tasks in an SQLite database. Deadlines are stored as date
+    ordinals, so the indexes on deadline and completed columns can be
+    used for sorting and range queries. Every save is written in one
+    transaction. The connection is shared between the Tk thread and
+    the autosave thread, so it is only used while holding a lock.
+    """
+
+    def __init__(self, database_dir: str, page_size: int = 1000) -> None:
+        """
+        Parameters
+        ----------
+        database_dir : str
+            Path of SQLite database file. Created if it doesn't exist
+        page_size : int, default: 1000
+            Number of tasks iter_tasks reads with one query
+        """
+
+        self.database_dir = database_dir
+        self.page_size = page_size
+        self.tasks_read: int = 0
+        self.tasks_to_read: int = 0
+
+        import sqlite3
+
+        self.connection_lock = threading.RLock()
+        self.connection = sqlite3.connect(
+            database_dir, check_same_thread=False
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                "position INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "task_id TEXT NOT NULL UNIQUE, "
+                "task_name TEXT NOT NULL, "
+                "deadline INTEGER NOT NULL, "
+                "completed INTEGER NOT NULL)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS tasks_deadline "
+                "ON tasks (deadline)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS tasks_completed "
+                "ON tasks (completed, deadline)"
+            )
+
+    @staticmethod
+    def row_to_task(row: tuple) -> dict:
+        return {"task_id": row[0], "task_name": row[1],
+                "deadline": ordinal_to_deadline(row[2]),
+                "completed": bool(row[3])}
+
+    @staticmethod
+    def task_to_row(task: dict) -> tuple:
+        return (task["task_id"], task["task_name"],
+                deadline_to_ordinal(task["deadline"]),
+                int(bool(task.get("completed"))))
+
+    def count_tasks(self) -> int:
+        with self.connection_lock:
+            tasks_count: int = self.connection.execute(
+                "SELECT COUNT(*) FROM tasks"
+            ).fetchone()[0]
+
+        return tasks_count
+
+    def iter_tasks(self) -> Iterator[dict]:
+        self.tasks_read = 0
+        self.tasks_to_read = self.count_tasks()
+        last_position: int = 0
+
+        while True:
+            with self.connection_lock:
+                rows: list = self.connection.execute(
+                    "SELECT task_id, task_name, deadline, completed, "
+                    "position FROM tasks WHERE position > ? "
+                    "ORDER BY position LIMIT ?",
+                    (last_position, self.page_size)
+                ).fetchall()
+
+            if not rows:
+                return
+
+            last_position = rows[-1][4]
+
+            for row in rows:
+                self.tasks_read += 1
+                yield self.row_to_task(row)
+
+    def load_progress(self) -> float:
+        if not self.tasks_to_read:
+            return 1.0
+
+        return min(self.tasks_read / self.tasks_to_read, 1.0)
+
+    def save(self, records: list, tasks: Iterable[dict],
+             full_rewrite: bool = False,
+             base_states: Union[dict, None] = None) -> bool:
+        with self.connection_lock, self.connection:
+            if full_rewrite:
+                self.connection.execute("DELETE FROM tasks")
+                self.connection.executemany(
+                    "INSERT INTO tasks "
+                    "(task_id, task_name, deadline, completed) "
+                    "VALUES (?, ?, ?, ?)",
+                    (self.task_to_row(task) for task in tasks)
+                )
+                return False
+
+            for record in records:
+                self.apply_record(record=record)
+
+        return False
+
+    def apply_record(self, record: dict) -> None:
+        """
+        Applies one journal record to the database. Has to be called
+        inside a transaction
+
+        Parameters
+        ----------
+        record : dict
+            Journal record. Its "op" key is one of "add", "edit",
+            "toggle" or "delete"
+
+        Returns
+        ----------
+        None
+        """
+
+        operation: str = record.get("op")
+
+        if operation == "add":
+            self.connection.execute(
+                "INSERT INTO tasks "
+                "(task_id, task_name, deadline, completed) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT (task_id) DO UPDATE SET "
+                "task_name = excluded.task_name, "
+                "deadline = excluded.deadline, "
+                "completed = excluded.completed",
+                self.task_to_row(record["task"])
+            )
+        elif operation == "edit":
+            self.connection.execute(
+                "UPDATE tasks SET task_name = ?, deadline = ? "
+                "WHERE task_id = ?",
+                (record["task_name"], deadline_to_ordinal(record["deadline"]),
+                 record["task_id"])
+            )
+        elif operation == "toggle":
+            self.connection.execute(
+                "UPDATE tasks SET completed = ? WHERE task_id = ?",
+                (int(record["completed"]), record["task_id"])
+            )
+        elif operation == "delete":
+            self.connection.execute(
+                "DELETE FROM tasks WHERE task_id = ?", (record["task_id"],)
+            )
+
+    def watched_files(self) -> list:
+        return [self.database_dir, f"{self.database_dir}-wal"]
+
+    def close(self) -> None:
+        with self.connection_lock:
+            self.connection.close()
+
+
+def create_task_storage(config_dict: dict, current_dir: str) -> TaskStorage:
+    """
+    Creates the storage backend chosen in the YAML config file. When
+    the SQLite or binary backend is used for the first time, tasks in
+    the JSON file are imported to the new database or snapshot
+
+    Parameters
+    ----------
+    config_dict : dict
+        Content of the YAML config file
+    current_dir : str
+        Directory that storage file names are relative to
+
+    Returns
+    ----------
+    task_storage : TaskStorage
+        Storage backend
+
+    Raises
+    ----------
+    ValueError
+        If storage.backend is not "json", "binary" or "sqlite"
+    """
+
+    storage_config: dict = config_dict["storage"]
+    json_dir: str = os.path.join(current_dir, storage_config["json_filename"])
+
+    json_storage = JsonJournalStorage(
+        task_journal=TaskJournal(
+            snapshot_dir=json_dir,
+            journal_dir=os.path.join(
+                current_dir, storage_config["journal_filename"]
+            ),
+            compaction_threshold=storage_config[
+                "journal_compaction_threshold"]
+        )
+    )
+
+    if storage_config["backend"] == "json":
+        return json_storage
+
+    if storage_config["backend"] == "binary":
+        binary_dir: str = os.path.join(
+            current_dir, storage_config["binary_filename"]
+        )
+
+        task_storage = BinaryJournalStorage(
+            task_journal=TaskJournal(
+                snapshot_dir=binary_dir,
+                journal_dir=os.path.join(
+                    current_dir, storage_config["binary_journal_filename"]
+                ),
+                compaction_threshold=storage_config[
+                    "journal_compaction_threshold"]
+            )
+        )
+
+        if not os.path.exists(binary_dir):
+            task_storage.write_snapshot(
+                tasks=json_storage.iter_current_tasks()
+            )
+
+        return task_storage
+
+    if storage_config["backend"] == "sqlite":
+        database_dir: str = os.path.join(
+            current_dir, storage_config["sqlite_filename"]
+        )
+        database_exists: bool = os.path.exists(database_dir)
+
+        task_storage = SQLiteStorage(database_dir=database_dir)
+
+        if not database_exists and os.path.exists(json_dir):
+            task_storage.import_json(json_dir)
+
+        return task_storage
+
+    raise ValueError(f"Unknown storage backend {storage_config['backend']}")
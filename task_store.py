@@ -0,0 +1,886 @@
+"""
+Tasks and the operations on them, independent of the GUI.
+
+TaskStore keeps tasks in the order they were added, together with an
+index from task ID to task and from task ID to position, so finding,
+editing, toggling and deleting a task doesn't depend on the number of
+tasks. Changes are kept as journal records until they are saved to a
+storage backend (see task_storage).
+"""
+
+import uuid
+import datetime
+
+from task_journal import TaskJournal
+from task_storage import TaskStorage
+from typing import Callable, Iterable, Iterator, Union
+
+
+class Task():
+    """
+    A task. Deadline is kept as a date ordinal (see
+    datetime.date.toordinal), so comparing and sorting deadlines doesn't
+    need parsing. __slots__ keeps each task small when there are many.
+    """
+
+    __slots__ = ("task_id", "task_name", "deadline", "completed")
+
+    def __init__(
+            self,
+            task_id: str,
+            task_name: str,
+            deadline: int,
+            completed: bool = False) -> None:
+        self.task_id = task_id
+        self.task_name = task_name
+        self.deadline = deadline
+        self.completed = completed
+
+    @classmethod
+    def from_dict(cls, task_entry: dict) -> "Task":
+        """
+        Creates a task from a dictionary in the JSON file format
+
+        Parameters
+        ----------
+        task_entry : dict
+            Dictionary with task_id, task_name, deadline (formatted as
+            %d-%m-%Y) and completed keys. task_id may be missing
+
+        Returns
+        ----------
+        task : Task
+            Created task. Its task_id is an empty string if task_entry
+            doesn't have one
+        """
+
+        # Splitting is several times faster than strptime, which adds
+        # up when millions of tasks are loaded
+        day, month, year = task_entry["deadline"].split("-")
+        deadline: int = datetime.date(
+            int(year), int(month), int(day)
+        ).toordinal()
+
+        return cls(
+            task_id=task_entry.get("task_id") or "",
+            task_name=task_entry["task_name"],
+            deadline=deadline,
+            completed=bool(task_entry.get("completed"))
+        )
+
+    def to_dict(self) -> dict:
+        return {"task_id": self.task_id, "task_name": self.task_name,
+                "deadline": self.deadline_text(),
+                "completed": self.completed}
+
+    def deadline_date(self) -> datetime.date:
+        return datetime.date.fromordinal(self.deadline)
+
+    def deadline_text(self) -> str:
+        return self.deadline_date().strftime("%d-%m-%Y")
+
+    def state(self) -> tuple:
+        return (self.task_name, self.deadline, self.completed)
+
+
+class TaskStore():
+    """
+    Tasks in the order they were added, with an index from task ID to
+    task and from task ID to position in tasks list. Removed tasks leave
+    an empty place in tasks list so other tasks' positions don't change,
+    empty places are cleared once they make up a quarter of the list.
+
+    Functions added with add_listener are called after every change
+    with the operation ("add", "edit", "toggle" or "delete"), a list of
+    changed tasks and a list of their states (see Task.state) before
+    the change, which are None for added tasks. Batch operations call
+    listeners once for the whole batch.
+    """
+
+    def __init__(self, task_storage: Union[TaskStorage, None] = None) -> None:
+        """
+        Parameters
+        ----------
+        task_storage : TaskStorage or None, default: None
+            Storage backend tasks are loaded from and saved to. Default
+            is None, which keeps tasks only in memory
+        """
+
+        self.task_storage = task_storage
+
+        self.tasks_list: list = []
+        self.tasks_by_id: dict = {}
+        self.task_positions: dict = {}
+        self.removed_tasks_count: int = 0
+
+        self.journal_records: list = []
+        self.storage_outdated: bool = False
+
+        # States of tasks with unsaved changes before their first
+        # unsaved change, None for added tasks. Used to find changes
+        # that conflict with changes other processes saved meanwhile
+        self.base_states: dict = {}
+
+        self.listeners: list = []
+
+    def __len__(self) -> int:
+        return len(self.tasks_by_id)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self.tasks_by_id
+
+    def __iter__(self) -> Iterator[Task]:
+        return (task for task in self.tasks_list if task is not None)
+
+    def add_listener(
+            self,
+            listener: Callable[[str, list, list], None]) -> None:
+        self.listeners.append(listener)
+
+    def notify_listeners(
+            self,
+            operation: str,
+            tasks: list,
+            previous_states: list) -> None:
+        if not tasks:
+            return
+
+        for listener in self.listeners:
+            listener(operation, tasks, previous_states)
+
+    def record_change(
+            self,
+            record: dict,
+            task_id: str,
+            previous_state: Union[tuple, None]) -> None:
+        self.journal_records.append(record)
+        self.base_states.setdefault(task_id, previous_state)
+
+    def get(self, task_id: str) -> Task:
+        """
+        Returns the task with the given ID
+
+        Parameters
+        ----------
+        task_id : str
+            Unique ID of the task
+
+        Returns
+        ----------
+        task : Task
+            Task with the given ID
+
+        Raises
+        ----------
+        ValueError
+            If there's no task with the given ID
+        """
+
+        try:
+            task: Task = self.tasks_by_id[task_id]
+        except KeyError:
+            raise ValueError(f"{task_id} not found in self.tasks_list")
+
+        return task
+
+    def add(
+            self,
+            task_name: str,
+            deadline: int,
+            completed: bool = False) -> Task:
+        """
+        Creates a task with a new ID, appends it to tasks list
+
+        Parameters
+        ----------
+        task_name : str
+            Name of task
+        deadline : int
+            Deadline of task as a date ordinal
+        completed : bool, default: False
+            Whether the task is marked as finished
+
+        Returns
+        ----------
+        task : Task
+            Created task
+        """
+
+        task = Task(
+            task_id=uuid.uuid4().hex, task_name=task_name,
+            deadline=deadline, completed=completed
+        )
+        self.insert(task=task)
+
+        self.record_change(
+            record=TaskJournal.add_record(task.to_dict()),
+            task_id=task.task_id, previous_state=None
+        )
+        self.notify_listeners("add", [task], [None])
+
+        return task
+
+    def add_many(self, new_tasks: Iterable[tuple]) -> list:
+        """
+        Creates tasks with new IDs as one batch. Listeners are called
+        once for the batch
+
+        Parameters
+        ----------
+        new_tasks : Iterable[tuple]
+            (task name, deadline as a date ordinal, completed) tuples
+
+        Returns
+        ----------
+        added_tasks : list
+            Created tasks
+        """
+
+        added_tasks: list = []
+
+        for task_name, deadline, completed in new_tasks:
+            task = Task(
+                task_id=uuid.uuid4().hex, task_name=task_name,
+                deadline=deadline, completed=completed
+            )
+            self.insert(task=task)
+            added_tasks.append(task)
+
+            self.record_change(
+                record=TaskJournal.add_record(task.to_dict()),
+                task_id=task.task_id, previous_state=None
+            )
+
+        self.notify_listeners("add", added_tasks, [None] * len(added_tasks))
+
+        return added_tasks
+
+    def restore_many(self, tasks: Iterable[Task]) -> list:
+        """
+        Appends removed tasks again as one batch, keeping their IDs,
+        for example when a deletion is undone. Listeners are called
+        once for the batch
+
+        Parameters
+        ----------
+        tasks : Iterable[Task]
+            Removed tasks. Tasks whose ID is used by another task are
+            skipped
+
+        Returns
+        ----------
+        restored_tasks : list
+            Appended tasks
+        """
+
+        restored_tasks: list = []
+
+        for task in tasks:
+            if task.task_id in self.tasks_by_id:
+                continue
+
+            self.insert(task=task)
+            restored_tasks.append(task)
+
+            self.record_change(
+                record=TaskJournal.add_record(task.to_dict()),
+                task_id=task.task_id, previous_state=None
+            )
+
+        self.notify_listeners(
+            "add", restored_tasks, [None] * len(restored_tasks)
+        )
+
+        return restored_tasks
+
+    def edit(self, task_id: str, task_name: str, deadline: int) -> Task:
+        """
+        Changes name and deadline of a task
+
+        Parameters
+        ----------
+        task_id : str
+            Unique ID of the task
+        task_name : str
+            New name of task
+        deadline : int
+            New deadline of task as a date ordinal
+
+        Returns
+        ----------
+        task : Task
+            Edited task
+
+        Raises
+        ----------
+        ValueError
+            If there's no task with the given ID
+        """
+
+        task: Task = self.get(task_id)
+        previous_state: tuple = task.state()
+
+        task.task_name = task_name
+        task.deadline = deadline
+
+        self.record_change(
+            record=TaskJournal.edit_record(task.to_dict()),
+            task_id=task_id, previous_state=previous_state
+        )
+        self.notify_listeners("edit", [task], [previous_state])
+
+        return task
+
+    def edit_many(self, changes: Iterable[tuple]) -> list:
+        """
+        Changes names and deadlines of tasks as one batch. Listeners are
+        called once for the batch
+
+        Parameters
+        ----------
+        changes : Iterable[tuple]
+            (task ID, task name, deadline as a date ordinal) tuples. IDs
+            of tasks that don't exist are skipped
+
+        Returns
+        ----------
+        changed_tasks : list
+            Tasks whose name or deadline changed
+        """
+
+        changed_tasks: list = []
+        previous_states: list = []
+
+        for task_id, task_name, deadline in changes:
+            task: Union[Task, None] = self.tasks_by_id.get(task_id)
+
+            if task is None or (task.task_name, task.deadline) == (
+                    task_name, deadline):
+                continue
+
+            previous_states.append(task.state())
+            task.task_name = task_name
+            task.deadline = deadline
+            changed_tasks.append(task)
+
+            self.record_change(
+                record=TaskJournal.edit_record(task.to_dict()),
+                task_id=task_id, previous_state=previous_states[-1]
+            )
+
+        self.notify_listeners("edit", changed_tasks, previous_states)
+
+        return changed_tasks
+
+    def toggle(self, task_id: str, completed: bool) -> Task:
+        """
+        Marks a task as finished or unfinished
+
+        Parameters
+        ----------
+        task_id : str
+            Unique ID of the task
+        completed : bool
+            True if the task is marked as finished
+
+        Returns
+        ----------
+        task : Task
+            Changed task
+
+        Raises
+        ----------
+        ValueError
+            If there's no task with the given ID
+        """
+
+        task: Task = self.get(task_id)
+        previous_state: tuple = task.state()
+
+        task.completed = completed
+
+        self.record_change(
+            record=TaskJournal.toggle_record(task.to_dict()),
+            task_id=task_id, previous_state=previous_state
+        )
+        self.notify_listeners("toggle", [task], [previous_state])
+
+        return task
+
+    def toggle_many(self, task_ids: Iterable[str], completed: bool) -> list:
+        """
+        Marks tasks as finished or unfinished as one batch. Listeners 
+        are called once for the batch
+
+        Parameters
+        ----------
+        task_ids : Iterable[str]
+            Unique IDs of the tasks. IDs of tasks that don't exist are
+            skipped
+        completed : bool
+            True if the tasks are marked as finished
+
+        Returns
+        ----------
+        changed_tasks : list
+            Tasks whose state changed
+        """
+
+        changed_tasks: list = []
+        previous_states: list = []
+
+        for task_id in task_ids:
+            task: Union[Task, None] = self.tasks_by_id.get(task_id)
+
+            if task is None or task.completed == completed:
+                continue
+
+            previous_states.append(task.state())
+            task.completed = completed
+            changed_tasks.append(task)
+
+            self.record_change(
+                record=TaskJournal.toggle_record(task.to_dict()),
+                task_id=task_id, previous_state=previous_states[-1]
+            )
+
+        self.notify_listeners("toggle", changed_tasks, previous_states)
+
+        return changed_tasks
+
+    def delete(self, task_id: str) -> Task:
+        """
+        Removes a task
+
+        Parameters
+        ----------
+        task_id : str
+            Unique ID of the task
+
+        Returns
+        ----------
+        task : Task
+            Removed task
+
+        Raises
+        ----------
+        ValueError
+            If there's no task with the given ID
+        """
+
+        task: Task = self.get(task_id)
+        self.remove(task_id=task_id)
+
+        self.record_change(
+            record=TaskJournal.delete_record(task_id),
+            task_id=task_id, previous_state=task.state()
+        )
+        self.notify_listeners("delete", [task], [task.state()])
+
+        return task
+
+    def delete_many(self, task_ids: Iterable[str]) -> list:
+        """
+        Removes tasks as one batch. The tasks list is compacted at most
+        once, and listeners are called once for the batch
+
+        Parameters
+        ----------
+        task_ids : Iterable[str]
+            Unique IDs of the tasks. IDs of tasks that don't exist are
+            skipped
+
+        Returns
+        ----------
+        deleted_tasks : list
+            Removed tasks
+        """
+
+        deleted_tasks: list = []
+
+        for task_id in task_ids:
+            task: Union[Task, None] = self.tasks_by_id.get(task_id)
+
+            if task is None:
+                continue
+
+            self.remove(task_id=task_id, allow_compaction=False)
+            deleted_tasks.append(task)
+
+            self.record_change(
+                record=TaskJournal.delete_record(task_id),
+                task_id=task_id, previous_state=task.state()
+            )
+
+        if self.removed_tasks_count * 4 > len(self.tasks_list):
+            self.compact()
+
+        self.notify_listeners(
+            "delete", deleted_tasks, [task.state() for task in deleted_tasks]
+        )
+
+        return deleted_tasks
+
+    def insert(self, task: Task) -> bool:
+        """
+        Appends a task to tasks list, adds it to task ID index and task
+        position map. Tasks loaded from files saved before tasks had
+        IDs, or with an ID that is already used, get a new ID. Doesn't
+        record a change
+
+        Parameters
+        ----------
+        task : Task
+            Task to add to tasks list
+
+        Returns
+        ----------
+        kept_task_id : bool
+            False if the task was given a new ID
+        """
+
+        kept_task_id: bool = True
+
+        if not task.task_id or task.task_id in self.tasks_by_id:
+            task.task_id = uuid.uuid4().hex
+            kept_task_id = False
+
+        self.task_positions[task.task_id] = len(self.tasks_list)
+        self.tasks_by_id[task.task_id] = task
+        self.tasks_list.append(task)
+
+        return kept_task_id
+
+    def insert_loaded(self, task_entry: dict) -> Task:
+        """
+        Adds a task read from storage. If the task had to be given a new
+        ID, stored tasks are marked as outdated so the next save writes
+        all tasks
+
+        Parameters
+        ----------
+        task_entry : dict
+            Task in the JSON file format
+
+        Returns
+        ----------
+        task : Task
+            Added task
+        """
+
+        task: Task = Task.from_dict(task_entry)
+
+        if not self.insert(task=task):
+            self.storage_outdated = True
+
+        return task
+
+    def remove(self, task_id: str, allow_compaction: bool = True) -> int:
+        """
+        Removes a task from tasks list using task ID. Doesn't record a
+        change
+
+        Parameters
+        ----------
+        task_id : str
+            Unique ID of the task to remove
+        allow_compaction : bool, default: True
+            If False, the tasks list isn't compacted even if removed
+            tasks make up a quarter of it, for example while removing
+            many tasks
+
+        Returns
+        ----------
+        removed_task_index : int
+            Index the removed task had in tasks list
+
+        Raises
+        ----------
+        ValueError
+            If there's no task with the given ID
+        """
+
+        try:
+            removed_task_index: int = self.task_positions.pop(task_id)
+        except KeyError:
+            raise ValueError(f"{task_id} not found in self.tasks_list")
+
+        del self.tasks_by_id[task_id]
+        self.tasks_list[removed_task_index] = None
+        self.removed_tasks_count += 1
+
+        if (allow_compaction 
+                and self.removed_tasks_count * 4 > len(self.tasks_list)):
+            self.compact()
+
+        return removed_task_index
+
+    def compact(self) -> None:
+        """
+        Clears places of removed tasks from tasks list, updates task
+        position map
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        self.tasks_list = [
+            task for task in self.tasks_list if task is not None
+        ]
+        self.task_positions = {
+            task.task_id: index
+            for index, task in enumerate(self.tasks_list)
+        }
+        self.removed_tasks_count = 0
+
+    def apply_record(self, record: dict) -> tuple:
+        """
+        Applies a saved journal record that is not part of the loaded
+        tasks yet, like a record from the JSON backend's journal. Doesn't
+        record a change, since the record is already saved
+
+        Parameters
+        ----------
+        record : dict
+            Journal record
+
+        Returns
+        ----------
+        operation : str or None
+            Operation that was applied, None if the record refers to a
+            task that doesn't exist
+        task : Task or None
+            Changed task
+        """
+
+        operation: str = record.get("op")
+
+        if operation == "add":
+            loaded_task: Task = Task.from_dict(record["task"])
+
+            if loaded_task.task_id not in self.tasks_by_id:
+                self.insert(task=loaded_task)
+                self.notify_listeners("add", [loaded_task], [None])
+
+                return operation, loaded_task
+
+            task: Task = self.tasks_by_id[loaded_task.task_id]
+            previous_state: tuple = task.state()
+            task.task_name = loaded_task.task_name
+            task.deadline = loaded_task.deadline
+            task.completed = loaded_task.completed
+            self.notify_listeners("edit", [task], [previous_state])
+
+            return "edit", task
+
+        task = self.tasks_by_id.get(record.get("task_id"))
+        if task is None:
+            return None, None
+
+        previous_state = task.state()
+
+        if operation == "edit":
+            task.task_name = record["task_name"]
+            task.deadline = Task.from_dict(record).deadline
+        elif operation == "toggle":
+            task.completed = record["completed"]
+        elif operation == "delete":
+            self.remove(task_id=task.task_id)
+        else:
+            return None, None
+
+        self.notify_listeners(operation, [task], [previous_state])
+
+        return operation, task
+
+    def unsaved_task_ids(self) -> set:
+        return set(self.base_states)
+
+    def apply_stored_tasks(
+            self,
+            stored_tasks: Iterable[Task],
+            kept_task_ids: Iterable[str] = ()) -> dict:
+        """
+        Brings tasks up to date with tasks read from storage after
+        another program changed it. Tasks are matched by ID: stored 
+        tasks that don't exist are added, tasks whose name, deadline or
+        state differ are changed and tasks that are not stored anymore
+        are removed. Tasks with unsaved changes keep their state, since
+        saving them will write it. Doesn't record changes. Listeners
+        are called once for each kind of change
+
+        Parameters
+        ----------
+        stored_tasks : Iterable[Task]
+            All stored tasks, in the order they were added
+        kept_task_ids : Iterable[str], default: ()
+            IDs of other tasks that keep their state, like tasks changed
+            while stored tasks were read
+
+        Returns
+        ----------
+        changes : dict
+            Added, edited, toggled and deleted tasks, keyed by "add", 
+            "edit", "toggle" and "delete"
+        """
+
+        kept_task_ids = self.unsaved_task_ids().union(kept_task_ids)
+        stored_task_ids: set = set()
+        changes: dict = {"add": [], "edit": [], "toggle": [], "delete": []}
+        previous_states: dict = {"edit": [], "toggle": []}
+
+        for stored_task in stored_tasks:
+            stored_task_ids.add(stored_task.task_id)
+
+            if stored_task.task_id in kept_task_ids:
+                continue
+
+            task: Union[Task, None] = self.tasks_by_id.get(
+                stored_task.task_id
+            )
+
+            if task is None:
+                if not self.insert(task=stored_task):
+                    self.storage_outdated = True
+
+                changes["add"].append(stored_task)
+                continue
+
+            if (task.task_name != stored_task.task_name
+                    or task.deadline != stored_task.deadline):
+                previous_states["edit"].append(task.state())
+                task.task_name = stored_task.task_name
+                task.deadline = stored_task.deadline
+                changes["edit"].append(task)
+
+            if task.completed != stored_task.completed:
+                previous_states["toggle"].append(task.state())
+                task.completed = stored_task.completed
+                changes["toggle"].append(task)
+
+        changes["delete"] = [
+            task for task in self
+            if task.task_id not in stored_task_ids
+            and task.task_id not in kept_task_ids
+        ]
+
+        for task in changes["delete"]:
+            self.remove(task_id=task.task_id, allow_compaction=False)
+
+        if self.removed_tasks_count * 4 > len(self.tasks_list):
+            self.compact()
+
+        self.notify_listeners(
+            "add", changes["add"], [None] * len(changes["add"])
+        )
+        self.notify_listeners(
+            "edit", changes["edit"], previous_states["edit"]
+        )
+        self.notify_listeners(
+            "toggle", changes["toggle"], previous_states["toggle"]
+        )
+        self.notify_listeners(
+            "delete", changes["delete"],
+            [task.state() for task in changes["delete"]]
+        )
+
+        return changes
+
+    def load(self) -> None:
+        """
+        Reads all stored tasks and changes saved after them at once.
+        The GUI loads tasks in batches instead, with insert_loaded and
+        apply_record
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        for task_entry in self.task_storage.iter_tasks():
+            self.insert_loaded(task_entry=task_entry)
+
+        for record in self.task_storage.read_pending_records():
+            self.apply_record(record=record)
+
+    def prepare_save(
+            self,
+            allow_full_rewrite: bool = True
+            ) -> Union[Callable[[], bool], None]:
+        """
+        Takes the changes made since the last save, returns a function
+        that saves them to the storage backend. All tasks are written
+        instead if the backend needs compaction or loaded tasks were
+        given new IDs. The returned function may be called from another
+        thread
+
+        Parameters
+        ----------
+        allow_full_rewrite : bool, default: True
+            If False, only changes are saved, for example while tasks
+            are still loading
+
+        Returns
+        ----------
+        save_job : Callable[[], bool] or None
+            Function that saves and returns what the backend's save
+            returns, or None if there's nothing to save
+        """
+
+        records: list = self.journal_records
+        base_states: dict = self.base_states
+        self.journal_records = []
+        self.base_states = {}
+
+        full_rewrite: bool = allow_full_rewrite and (
+            self.storage_outdated or self.task_storage.needs_compaction()
+        )
+
+        if not records and not full_rewrite:
+            return None
+
+        # Tasks are copied here, since the Tk thread may change them
+        # while the returned function writes them. Their fields don't
+        # change, so copying them is cheaper than formatting the tasks
+        saved_fields: list = []
+        if full_rewrite:
+            saved_fields = [
+                (task.task_id, task.task_name, task.deadline, task.completed)
+                for task in self
+            ]
+            self.storage_outdated = False
+
+        return lambda: self.task_storage.save(
+            records=records,
+            tasks=(Task(*fields).to_dict() for fields in saved_fields),
+            full_rewrite=full_rewrite,
+            base_states=base_states
+        )
+
+    def save(self) -> None:
+        """
+        Saves changes made since the last save to the storage backend
+        right away
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+        """
+
+        save_job: Union[Callable[[], None], None] = self.prepare_save()
+
+        if save_job is not None:
+            save_job()
@@ -0,0 +1,11 @@
+"""
+Shared setup of the unit tests. Tests are run with pytest from the
+repository root and don't need a display:
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,387 @@
+"""
+Tests of recurrence rules, occurrences generated for views, exceptions
+of finished occurrences and saving rules.
+"""
+
+import json
+import datetime
+import pytest
+
+from deadline_index import DeadlineIndex
+from recurrence import RecurrenceRule, RecurrenceStore, RecurringRange
+from task_store import Task, TaskStore
+from undo_history import UndoHistory
+
+# A Monday
+TODAY: int = datetime.date(2030, 1, 7).toordinal()
+
+
+def day(year: int, month: int, day_of_month: int) -> int:
+    return datetime.date(year, month, day_of_month).toordinal()
+
+
+@pytest.fixture
+def stores(tmp_path):
+    """
+    Task store with a deadline index, recurrence rules and an undo
+    history listening to it
+    """
+
+    task_store = TaskStore()
+    deadline_index = DeadlineIndex()
+    recurrences = RecurrenceStore(rules_dir=str(tmp_path / "rules.json"))
+    undo_history = UndoHistory(task_store=task_store, max_depth=10,
+                               recurrences=recurrences)
+
+    task_store.add_listener(deadline_index.on_task_changed)
+    task_store.add_listener(recurrences.on_task_changed)
+    task_store.add_listener(undo_history.on_task_changed)
+    recurrences.add_listener(undo_history.on_rules_changed)
+
+    return task_store, deadline_index, recurrences, undo_history
+
+
+def add_daily_task(
+        task_store: TaskStore,
+        recurrences: RecurrenceStore) -> Task:
+    task: Task = task_store.add(task_name="Chore", deadline=TODAY)
+    recurrences.set_rule(
+        task_id=task.task_id,
+        rule=RecurrenceRule(start=TODAY, frequency="daily")
+    )
+
+    return task
+
+
+def week_range(stores: tuple) -> RecurringRange:
+    task_store, deadline_index, recurrences, _ = stores
+
+    return RecurringRange(
+        deadline_range=deadline_index.due_this_week(today=TODAY),
+        recurrences=recurrences, task_store=task_store
+    )
+
+
+def test_daily_occurrences_with_interval_and_until():
+    rule = RecurrenceRule(
+        start=day(2030, 1, 1), frequency="daily", interval=3,
+        until=day(2030, 1, 12)
+    )
+
+    assert list(rule.occurrences(
+        first_day=day(2030, 1, 2), end_day=day(2031, 1, 1)
+    )) == [day(2030, 1, 4), day(2030, 1, 7), day(2030, 1, 10)]
+
+
+def test_weekly_occurrences():
+    rule = RecurrenceRule(start=day(2030, 1, 7), frequency="weekly",
+                          interval=2)
+
+    assert list(rule.occurrences(
+        first_day=day(2030, 1, 8), end_day=day(2030, 2, 20)
+    )) == [day(2030, 1, 21), day(2030, 2, 4), day(2030, 2, 18)]
+
+
+def test_monthly_occurrences_fall_on_last_day_of_short_months():
+    rule = RecurrenceRule(start=day(2032, 1, 31), frequency="monthly")
+
+    assert list(rule.occurrences(
+        first_day=day(2032, 1, 1), end_day=day(2032, 5, 1)
+    )) == [day(2032, 1, 31), day(2032, 2, 29), day(2032, 3, 31),
+           day(2032, 4, 30)]
+
+
+@pytest.mark.parametrize("interval", [1, 2, 5])
+def test_first_monthly_occurrence_from_any_day(interval):
+    for start in range(day(2030, 1, 25), day(2030, 2, 3)):
+        rule = RecurrenceRule(start=start, frequency="monthly",
+                              interval=interval)
+        deadlines: list = [rule.occurrence(number) for number in range(60)]
+
+        for first_day in range(start - 3, start + 400, 5):
+            assert next(rule.occurrences(
+                first_day=first_day, end_day=first_day + 1000
+            )) == next(
+                deadline for deadline in deadlines if deadline >= first_day
+            )
+
+
+def test_invalid_rules_are_rejected():
+    with pytest.raises(ValueError):
+        RecurrenceRule(start=TODAY, frequency="yearly")
+
+    with pytest.raises(ValueError):
+        RecurrenceRule(start=TODAY, frequency="daily", interval=0)
+
+
+def test_week_view_merges_occurrences_after_tasks_due_same_day(stores):
+    task_store, _, recurrences, _ = stores
+
+    task_store.add(task_name="Report", deadline=TODAY + 2)
+    chore: Task = add_daily_task(task_store, recurrences)
+    week: RecurringRange = week_range(stores)
+
+    assert len(week) == 8
+    assert [(task.task_name, task.deadline - TODAY) for task in week] == [
+        ("Chore", 0), ("Chore", 1), ("Report", 2), ("Chore", 2),
+        ("Chore", 3), ("Chore", 4), ("Chore", 5), ("Chore", 6)
+    ]
+    assert week[0] is chore
+    assert week[3].deadline == TODAY + 2
+    assert week[-1].deadline == TODAY + 6
+    assert all(task.task_id not in task_store for task in list(week)[1:]
+               if task.task_name == "Chore")
+
+
+def test_finished_occurrence_is_kept_as_exception(stores):
+    task_store, _, recurrences, _ = stores
+    chore: Task = add_daily_task(task_store, recurrences)
+
+    recurrences.set_occurrence_completed(
+        task_id=chore.task_id, deadline=TODAY + 3, completed=True
+    )
+
+    assert TODAY + 3 not in [task.deadline for task in week_range(stores)]
+    assert len(week_range(stores)) == 6
+
+    recurrences.set_occurrence_completed(
+        task_id=chore.task_id, deadline=TODAY + 3, completed=False
+    )
+
+    assert len(week_range(stores)) == 7
+
+
+def test_next_deadline_skips_and_drops_passed_exceptions(stores):
+    task_store, _, recurrences, _ = stores
+    chore: Task = add_daily_task(task_store, recurrences)
+
+    recurrences.set_occurrence_completed(
+        task_id=chore.task_id, deadline=TODAY + 1, completed=True
+    )
+    recurrences.set_occurrence_completed(
+        task_id=chore.task_id, deadline=TODAY + 4, completed=True
+    )
+
+    assert recurrences.next_deadline(task=chore, after=TODAY) == TODAY + 2
+    assert recurrences.exceptions[chore.task_id] == {TODAY + 4}
+
+    assert recurrences.next_deadline(task=chore, after=TODAY + 3) == TODAY + 5
+    assert recurrences.exceptions[chore.task_id] == set()
+
+
+def test_series_ends_after_until(stores):
+    task_store, _, recurrences, _ = stores
+    chore: Task = task_store.add(task_name="Chore", deadline=TODAY)
+    recurrences.set_rule(task_id=chore.task_id, rule=RecurrenceRule(
+        start=TODAY, frequency="daily", until=TODAY + 1
+    ))
+
+    assert recurrences.next_deadline(task=chore, after=TODAY) == TODAY + 1
+    assert recurrences.next_deadline(task=chore, after=TODAY + 1) is None
+    assert len(week_range(stores)) == 2
+
+
+def test_occurrences_are_regenerated_after_task_changes(stores):
+    task_store, _, recurrences, _ = stores
+    chore: Task = add_daily_task(task_store, recurrences)
+    week: RecurringRange = week_range(stores)
+
+    assert len(week) == 7
+
+    task_store.edit(task_id=chore.task_id, task_name="Chore",
+                    deadline=TODAY + 5)
+
+    assert [task.deadline - TODAY for task in week] == [5, 6]
+
+
+def test_search_results_include_occurrences_of_matching_tasks(stores):
+    task_store, _, recurrences, _ = stores
+
+    report: Task = task_store.add(task_name="Report", deadline=TODAY + 2)
+    task_store.add(task_name="Call", deadline=TODAY + 2)
+    chore: Task = add_daily_task(task_store, recurrences)
+    week: RecurringRange = week_range(stores)
+
+    selected_tasks: list = week.select([report, chore])
+
+    assert [(task.task_name, task.deadline - TODAY)
+            for task in selected_tasks] == [
+        ("Chore", 0), ("Chore", 1), ("Report", 2), ("Chore", 2),
+        ("Chore", 3), ("Chore", 4), ("Chore", 5), ("Chore", 6)
+    ]
+    assert week.find_occurrence(selected_tasks[1].task_id) == (
+        chore.task_id, TODAY + 1
+    )
+    assert week.select([report]) == [report]
+
+
+def test_occurrence_ids_are_looked_up_not_parsed(stores):
+    task_store, deadline_index, recurrences, _ = stores
+
+    imported_task = Task(task_id="imported:123", task_name="Imported",
+                         deadline=TODAY)
+    task_store.insert(imported_task)
+    deadline_index.rebuild(task_store)
+    chore: Task = add_daily_task(task_store, recurrences)
+    week: RecurringRange = week_range(stores)
+
+    occurrence: Task = next(
+        task for task in week if task.deadline == TODAY + 1
+    )
+
+    assert week.find_occurrence("imported:123") is None
+    assert week.find_occurrence(chore.task_id) is None
+    assert week.find_occurrence(occurrence.task_id) == (
+        chore.task_id, TODAY + 1
+    )
+    assert week.find_occurrence(f"{chore.task_id}:{TODAY + 30}") is None
+
+
+def test_undoing_delete_makes_task_recur_again(stores):
+    task_store, _, recurrences, undo_history = stores
+    chore: Task = add_daily_task(task_store, recurrences)
+
+    task_store.delete(task_id=chore.task_id)
+
+    assert chore.task_id not in recurrences
+    assert len(week_range(stores)) == 0
+
+    undo_history.undo()
+
+    assert chore.task_id in recurrences
+    assert len(week_range(stores)) == 7
+
+
+def test_listeners_are_called_for_rule_changes(stores):
+    task_store, _, recurrences, _ = stores
+    calls: list = []
+    recurrences.add_listener(
+        lambda task_ids, previous_states: calls.append(previous_states)
+    )
+
+    chore: Task = add_daily_task(task_store, recurrences)
+    task_store.edit(task_id=chore.task_id, task_name="Renamed",
+                    deadline=TODAY)
+    recurrences.set_occurrence_completed(
+        task_id=chore.task_id, deadline=TODAY + 1, completed=True
+    )
+
+    assert calls == [
+        [None], [(recurrences.rules[chore.task_id], frozenset())]
+    ]
+    assert recurrences.unsaved_task_ids == {chore.task_id}
+
+
+def test_finished_occurrence_is_undone_before_earlier_edits(stores):
+    task_store, _, recurrences, undo_history = stores
+    chore: Task = add_daily_task(task_store, recurrences)
+    task_store.edit(task_id=chore.task_id, task_name="Renamed",
+                    deadline=TODAY)
+
+    recurrences.set_occurrence_completed(
+        task_id=chore.task_id, deadline=TODAY + 3, completed=True
+    )
+    changes: dict = undo_history.undo()
+
+    assert changes["rules"] == [chore.task_id]
+    assert recurrences.exceptions[chore.task_id] == set()
+    assert chore.task_name == "Renamed"
+    assert len(week_range(stores)) == 7
+
+    undo_history.redo()
+
+    assert recurrences.exceptions[chore.task_id] == {TODAY + 3}
+
+
+def test_moving_to_next_occurrence_is_undone_as_one_step(stores):
+    task_store, _, recurrences, undo_history = stores
+    chore: Task = add_daily_task(task_store, recurrences)
+    recurrences.set_occurrence_completed(
+        task_id=chore.task_id, deadline=TODAY + 1, completed=True
+    )
+
+    # Like finishing the task's own occurrence in the task list
+    with undo_history.batch():
+        next_deadline: int = recurrences.next_deadline(
+            task=chore, after=chore.deadline
+        )
+        task_store.edit(task_id=chore.task_id, task_name="Chore",
+                        deadline=next_deadline)
+
+    assert chore.deadline == TODAY + 2
+    assert recurrences.exceptions[chore.task_id] == set()
+
+    undo_history.undo()
+
+    assert chore.deadline == TODAY
+    assert recurrences.exceptions[chore.task_id] == {TODAY + 1}
+
+
+def test_undoing_added_rule_stops_task_from_recurring(stores):
+    task_store, _, recurrences, undo_history = stores
+
+    with undo_history.batch():
+        chore: Task = add_daily_task(task_store, recurrences)
+
+    undo_history.undo()
+
+    assert chore.task_id not in task_store
+    assert chore.task_id not in recurrences
+
+    undo_history.redo()
+
+    assert chore.task_id in task_store
+    assert chore.task_id in recurrences
+    assert len(week_range(stores)) == 7
+
+
+def test_rules_and_exceptions_are_saved_and_loaded(stores, tmp_path):
+    task_store, _, recurrences, _ = stores
+    chore: Task = add_daily_task(task_store, recurrences)
+    recurrences.set_occurrence_completed(
+        task_id=chore.task_id, deadline=TODAY + 3, completed=True
+    )
+
+    recurrences.prepare_save()()
+    assert recurrences.prepare_save() is None
+
+    loaded_recurrences = RecurrenceStore(
+        rules_dir=str(tmp_path / "rules.json")
+    )
+    loaded_recurrences.load()
+
+    assert loaded_recurrences.rules[chore.task_id].to_dict() == (
+        recurrences.rules[chore.task_id].to_dict()
+    )
+    assert loaded_recurrences.exceptions == {chore.task_id: {TODAY + 3}}
+
+
+def test_saves_of_two_instances_are_merged_by_task(tmp_path):
+    rules_dir: str = str(tmp_path / "rules.json")
+    first_recurrences = RecurrenceStore(rules_dir=rules_dir)
+    second_recurrences = RecurrenceStore(rules_dir=rules_dir)
+    first_recurrences.load()
+    second_recurrences.load()
+
+    first_recurrences.set_rule(
+        task_id="a", rule=RecurrenceRule(start=TODAY, frequency="daily")
+    )
+    assert not first_recurrences.prepare_save()()
+
+    second_recurrences.set_rule(
+        task_id="b", rule=RecurrenceRule(start=TODAY, frequency="weekly")
+    )
+    assert second_recurrences.prepare_save()()
+
+    with open(rules_dir, "r") as rules_file:
+        assert sorted(json.load(rules_file)) == ["a", "b"]
+
+    first_recurrences.set_rule(task_id="a", rule=None)
+    first_recurrences.load()
+
+    assert sorted(first_recurrences.rules) == ["b"]
+
+    first_recurrences.prepare_save()()
+
+    with open(rules_dir, "r") as rules_file:
+        assert sorted(json.load(rules_file)) == ["b"]
@@ -0,0 +1,136 @@
+"""
+Tests of the app's RPC methods, called on an app with its task store,
+indexes, recurrence rules and undo history but without a window.
+"""
+
+import datetime
+import pytest
+
+from deadline_index import DeadlineIndex
+from main import TODO_App_GUI
+from recurrence import RecurrenceRule, RecurrenceStore
+from search_index import TaskNameIndex
+from task_store import TaskStore
+from undo_history import UndoHistory
+
+DEADLINE: int = datetime.date(2030, 1, 7).toordinal()
+
+
+@pytest.fixture
+def app(tmp_path) -> TODO_App_GUI:
+    """
+    App with three open tasks, "Report", "Call" and "Chore", which
+    recurs daily
+    """
+
+    app: TODO_App_GUI = TODO_App_GUI.__new__(TODO_App_GUI)
+
+    app.task_store = TaskStore()
+    app.deadline_index = DeadlineIndex()
+    app.name_index = TaskNameIndex()
+    app.recurrences = RecurrenceStore(
+        rules_dir=str(tmp_path / "rules.json")
+    )
+    app.undo_history = UndoHistory(
+        task_store=app.task_store, max_depth=10,
+        recurrences=app.recurrences
+    )
+    app.recurring_range = None
+    app.rpc_changed_tasks = False
+
+    for listener in (app.deadline_index.on_task_changed,
+                     app.name_index.on_task_changed,
+                     app.recurrences.on_task_changed,
+                     app.undo_history.on_task_changed):
+        app.task_store.add_listener(listener)
+    app.recurrences.add_listener(app.undo_history.on_rules_changed)
+
+    with app.undo_history.ignore_changes():
+        app.task_store.add_many(
+            (task_name, DEADLINE + offset, False)
+            for offset, task_name in enumerate(("Report", "Call", "Chore"))
+        )
+        app.recurrences.set_rule(
+            task_id=task_id(app, "Chore"),
+            rule=RecurrenceRule(start=DEADLINE + 2, frequency="daily")
+        )
+
+    return app
+
+
+def task_id(app: TODO_App_GUI, task_name: str) -> str:
+    return next(
+        task.task_id for task in app.task_store if task.task_name == task_name
+    )
+
+
+def states(app: TODO_App_GUI) -> list:
+    return [task.state() for task in app.task_store]
+
+
+def test_completing_recurring_and_other_tasks_is_undone_at_once(app):
+    task_ids: list = [task.task_id for task in app.task_store]
+
+    result: dict = app.rpc_complete_tasks({"task_ids": task_ids})
+
+    assert sorted(result["task_ids"]) == sorted(task_ids)
+    assert states(app) == [("Report", DEADLINE, True),
+                           ("Call", DEADLINE + 1, True),
+                           ("Chore", DEADLINE + 3, False)]
+
+    app.undo_history.undo()
+
+    assert states(app) == [("Report", DEADLINE, False),
+                           ("Call", DEADLINE + 1, False),
+                           ("Chore", DEADLINE + 2, False)]
+    assert not app.undo_history.can_undo()
+
+
+@pytest.mark.parametrize("completed", ["false", 0, None, "true"])
+def test_completed_must_be_a_boolean(app, completed):
+    with pytest.raises(ValueError):
+        app.rpc_complete_tasks({
+            "task_ids": [task_id(app, "Report")], "completed": completed
+        })
+
+    assert not any(task.completed for task in app.task_store)
+
+
+def test_completed_false_marks_tasks_unfinished(app):
+    report_id: str = task_id(app, "Report")
+    app.rpc_complete_tasks({"task_ids": [report_id]})
+
+    result: dict = app.rpc_complete_tasks(
+        {"task_ids": [report_id], "completed": False}
+    )
+
+    assert result == {"task_ids": [report_id]}
+    assert not app.task_store.get(report_id).completed
+
+
+def test_query_by_deadline_uses_only_tasks_in_range(app):
+    app.deadline_index.rebuild(app.task_store)
+    app.rpc_complete_tasks({"task_ids": [task_id(app, "Call")]})
+
+    def names(params: dict) -> list:
+        return [task["task_name"]
+                for task in app.rpc_query_tasks(params)["tasks"]]
+
+    assert names({"deadline_from": "08-01-2030"}) == ["Call", "Chore"]
+    assert names({"deadline_to": "08-01-2030"}) == ["Report", "Call"]
+    assert names({"deadline_from": "08-01-2030",
+                  "completed": False}) == ["Chore"]
+    assert names({"deadline_from": "08-01-2030",
+                  "completed": True}) == ["Call"]
+    assert names({"name_contains": "or", "deadline_to": "07-01-2030"}) == [
+        "Report"
+    ]
+    assert app.rpc_query_tasks(
+        {"deadline_from": "07-01-2030", "limit": 1, "offset": 1}
+    ) == {"total": 3, "tasks": [app.task_store.get(task_id(app, "Call"))
+                                .to_dict()]}
+
+
+def test_query_completed_must_be_a_boolean(app):
+    with pytest.raises(ValueError):
+        app.rpc_query_tasks({"completed": "false"})
@@ -0,0 +1,296 @@
+"""
+Tests of RpcServer driven through RpcClient. A fake main window runs
+the Tk side of the server on the test's thread: file handlers, idle
+callbacks and timers are run from a select loop while the client
+calls the server from another thread.
+"""
+
+import os
+import time
+import select
+import socket
+import threading
+import pytest
+
+from rpc_server import (
+    INVALID_PARAMS, METHOD_NOT_FOUND, RpcClient, RpcError, RpcServer
+)
+from typing import Callable
+
+DEADLINE: int = 739000
+
+
+class FakeTk():
+    def __init__(self) -> None:
+        self.file_handlers: dict = {}
+
+    def createfilehandler(
+            self, file_descriptor: int, mask: int,
+            handler: Callable[[int, int], None]) -> None:
+        self.file_handlers[file_descriptor] = handler
+
+    def deletefilehandler(self, file_descriptor: int) -> None:
+        del self.file_handlers[file_descriptor]
+
+
+class FakeRoot():
+    """
+    Stands in for tk.Tk with the parts RpcServer uses.
+    """
+
+    def __init__(self) -> None:
+        self.tk = FakeTk()
+        self.idle_callbacks: list = []
+        self.timers: dict = {}
+        self.timers_count: int = 0
+
+    def after_idle(self, callback: Callable[[], None]) -> None:
+        self.idle_callbacks.append(callback)
+
+    def after(self, delay: int, callback: Callable[[], None]) -> int:
+        self.timers_count += 1
+        self.timers[self.timers_count] = (
+            time.monotonic() + delay / 1000, callback
+        )
+
+        return self.timers_count
+
+    def after_cancel(self, timer_id: int) -> None:
+        self.timers.pop(timer_id, None)
+
+    def run_until(self, is_done: Callable[[], bool]) -> None:
+        timeout: float = time.monotonic() + 10
+
+        while not is_done():
+            assert time.monotonic() < timeout, "RPC calls didn't finish"
+
+            ready_fds, _, _ = select.select(
+                list(self.tk.file_handlers), [], [], 0.005
+            )
+            for ready_fd in ready_fds:
+                self.tk.file_handlers[ready_fd](ready_fd, 0)
+
+            while self.idle_callbacks:
+                self.idle_callbacks.pop(0)()
+
+            now: float = time.monotonic()
+            for timer_id, (due, callback) in list(self.timers.items()):
+                if due <= now and self.timers.pop(timer_id, None):
+                    callback()
+
+
+class Methods():
+    """
+    RPC methods that keep task names in a list, and count how often
+    the server finished a drain.
+    """
+
+    def __init__(self) -> None:
+        self.task_names: list = []
+        self.drains_count: int = 0
+
+    def add_tasks(self, params: dict) -> dict:
+        if not isinstance(params["tasks"], list):
+            raise ValueError("tasks must be a list")
+
+        self.task_names.extend(params["tasks"])
+
+        return {"added": len(params["tasks"])}
+
+    def query_tasks(self, params: dict) -> dict:
+        return {"tasks": list(self.task_names)}
+
+    def on_drained(self) -> None:
+        self.drains_count += 1
+
+
+def free_tcp_address() -> tuple:
+    with socket.socket(socket.AF_INET) as probe:
+        probe.bind(("127.0.0.1", 0))
+
+        return probe.getsockname()
+
+
+@pytest.fixture(params=["unix", "tcp", "poll"])
+def server(request, tmp_path):
+    """
+    Started server, its fake main window and methods. Listens on a Unix
+    socket, on TCP, or on a Unix socket with the Tk thread polling the
+    queue instead of being woken up through a pipe
+    """
+
+    if request.param != "tcp" and not hasattr(socket, "AF_UNIX"):
+        pytest.skip("Unix sockets aren't available")
+
+    address: object = (
+        free_tcp_address() if request.param == "tcp"
+        else str(tmp_path / "todo_app.sock")
+    )
+    root = FakeRoot()
+    methods = Methods()
+
+    rpc_server = RpcServer(
+        root=root,
+        methods={"add_tasks": methods.add_tasks,
+                 "query_tasks": methods.query_tasks},
+        on_drained=methods.on_drained, address=address,
+        drain_time_budget=100, poll_interval=5, max_request_size=1 << 20
+    )
+    if request.param == "poll":
+        rpc_server.start_wakeup_pipe = lambda: False
+    rpc_server.start()
+
+    yield rpc_server, root, methods
+
+    rpc_server.close()
+
+
+def run_client(
+        rpc_server: RpcServer,
+        root: FakeRoot,
+        script: Callable[[RpcClient], object]) -> object:
+    """
+    Runs a client script on another thread while the fake main window
+    runs the server's calls
+
+    Parameters
+    ----------
+    rpc_server : RpcServer
+        Started server
+    root : FakeRoot
+        Main window of the server
+    script : Callable[[RpcClient], object]
+        Function that calls the server through the client it is given
+
+    Returns
+    ----------
+    result : object
+        What script returned
+    """
+
+    outcome: dict = {}
+
+    def run_script() -> None:
+        try:
+            with RpcClient(address=rpc_server.address, timeout=10) as client:
+                outcome["result"] = script(client)
+        except BaseException as error:
+            outcome["error"] = error
+
+    client_thread = threading.Thread(target=run_script)
+    client_thread.start()
+    root.run_until(lambda: not client_thread.is_alive())
+    client_thread.join()
+
+    if "error" in outcome:
+        raise outcome["error"]
+
+    return outcome["result"]
+
+
+def test_call_returns_result(server):
+    rpc_server, root, methods = server
+
+    result: object = run_client(
+        rpc_server, root, lambda client: client.call(
+            "add_tasks", tasks=["Report"]
+        )
+    )
+
+    assert result == {"added": 1}
+    assert methods.task_names == ["Report"]
+
+
+def test_batch_is_run_in_one_drain(server):
+    rpc_server, root, methods = server
+
+    results: list = run_client(
+        rpc_server, root, lambda client: client.call_batch(
+            [("add_tasks", {"tasks": [f"Task {index}"]})
+             for index in range(100)]
+            + [("query_tasks", {})]
+        )
+    )
+
+    assert results[:100] == [{"added": 1}] * 100
+    assert results[100] == {
+        "tasks": [f"Task {index}" for index in range(100)]
+    }
+    assert methods.drains_count == 1
+    assert rpc_server.stats()["calls"] == 101
+
+
+def test_batch_reports_failed_calls_in_place(server):
+    rpc_server, root, methods = server
+
+    results: list = run_client(
+        rpc_server, root, lambda client: client.call_batch([
+            ("add_tasks", {"tasks": ["Report"]}),
+            ("add_tasks", {"tasks": "Report"}),
+            ("remove_tasks", {})
+        ])
+    )
+
+    assert results[0] == {"added": 1}
+    assert isinstance(results[1], RpcError)
+    assert results[1].code == INVALID_PARAMS
+    assert isinstance(results[2], RpcError)
+    assert results[2].code == METHOD_NOT_FOUND
+
+
+def test_notification_is_run_before_later_calls(server):
+    rpc_server, root, methods = server
+
+    def script(client: RpcClient) -> object:
+        client.notify("add_tasks", tasks=["Report"])
+
+        return client.call("query_tasks")
+
+    assert run_client(rpc_server, root, script) == {"tasks": ["Report"]}
+
+
+def test_unknown_method_raises_method_not_found(server):
+    rpc_server, root, methods = server
+
+    def script(client: RpcClient) -> object:
+        with pytest.raises(RpcError) as error:
+            client.call("remove_tasks", task_ids=[])
+
+        return error.value.code
+
+    assert run_client(rpc_server, root, script) == METHOD_NOT_FOUND
+
+
+def test_invalid_params_raise_invalid_params(server):
+    rpc_server, root, methods = server
+
+    def script(client: RpcClient) -> object:
+        codes: list = []
+
+        for params in ({"tasks": "Report"}, {}):
+            with pytest.raises(RpcError) as error:
+                client.call("add_tasks", **params)
+            codes.append(error.value.code)
+
+        return codes
+
+    assert run_client(rpc_server, root, script) == [INVALID_PARAMS] * 2
+    assert methods.task_names == []
+
+
+def test_close_removes_unix_socket(tmp_path):
+    if not hasattr(socket, "AF_UNIX"):
+        pytest.skip("Unix sockets aren't available")
+
+    socket_dir: str = str(tmp_path / "todo_app.sock")
+    rpc_server = RpcServer(
+        root=FakeRoot(), methods={}, on_drained=lambda: None,
+        address=socket_dir, drain_time_budget=100, poll_interval=5,
+        max_request_size=1 << 20
+    )
+
+    rpc_server.start()
+    assert os.path.exists(socket_dir)
+
+    rpc_server.close()
+    assert not os.path.exists(socket_dir)
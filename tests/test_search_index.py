@@ -0,0 +1,61 @@
+"""
+Tests of searching tasks by a part of their name with TaskNameIndex.
+"""
+
+from search_index import TaskNameIndex
+from task_store import TaskStore
+
+
+def create_index(task_names: list) -> tuple:
+    task_store = TaskStore()
+    name_index = TaskNameIndex()
+    task_store.add_listener(name_index.on_task_changed)
+
+    task_store.add_many(
+        (task_name, 739000, False) for task_name in task_names
+    )
+
+    return task_store, name_index
+
+
+def names(tasks: set) -> list:
+    return sorted(task.task_name for task in tasks)
+
+
+def test_query_matches_names_including_it_in_any_case():
+    _, name_index = create_index(["Write report", "Report bug", "Call"])
+
+    assert names(name_index.search("REPORT")) == [
+        "Report bug", "Write report"
+    ]
+    assert names(name_index.search("port b")) == ["Report bug"]
+    assert name_index.search("reports") == set()
+    assert name_index.search("") == set()
+
+
+def test_queries_shorter_than_ngrams_match():
+    _, name_index = create_index(["Write report", "Go", "Call"])
+
+    assert names(name_index.search("o")) == ["Go", "Write report"]
+    assert names(name_index.search("al")) == ["Call"]
+
+
+def test_query_with_one_repeated_ngram_is_checked_against_names():
+    _, name_index = create_index(["aaa", "aaaa", "baaab", "1111", "111"])
+
+    assert names(name_index.search("aaa")) == ["aaa", "aaaa", "baaab"]
+    assert names(name_index.search("aaaa")) == ["aaaa"]
+    assert names(name_index.search("1111")) == ["1111"]
+
+
+def test_renamed_and_deleted_tasks_are_updated():
+    task_store, name_index = create_index(["Write report", "Call"])
+    report, call = list(task_store)
+
+    task_store.edit(task_id=report.task_id, task_name="Read book",
+                    deadline=report.deadline)
+    task_store.delete(task_id=call.task_id)
+
+    assert name_index.search("report") == set()
+    assert name_index.search("book") == {report}
+    assert name_index.search("call") == set()
@@ -0,0 +1,229 @@
+"""
+Tests of saving tasks from several app instances that share the same
+JSON snapshot and journal, and of replaying and compacting the journal.
+"""
+
+import datetime
+import pytest
+
+from task_journal import SnapshotReader, TaskJournal
+from task_store import Task, TaskStore
+from task_storage import JsonJournalStorage, SaveConflictError
+
+DEADLINE: int = datetime.date(2030, 1, 1).toordinal()
+
+
+def open_store(directory, compaction_threshold: int = 2 ** 62) -> TaskStore:
+    """
+    Creates a store that loads the tasks saved in directory, like an
+    app instance started on the same files
+
+    Parameters
+    ----------
+    directory : pathlib.Path
+        Directory of the snapshot and journal files
+    compaction_threshold : int, default: 2 ** 62
+        Journal size after which the journal is folded into the snapshot
+
+    Returns
+    ----------
+    task_store : TaskStore
+        Store with the saved tasks loaded
+    """
+
+    task_store = TaskStore(task_storage=JsonJournalStorage(
+        task_journal=TaskJournal(
+            snapshot_dir=str(directory / "tasks.json"),
+            journal_dir=str(directory / "tasks.journal"),
+            compaction_threshold=compaction_threshold
+        )
+    ))
+    task_store.load()
+
+    return task_store
+
+
+def stored_states(directory) -> dict:
+    return {task.task_id: task.state() for task in open_store(directory)}
+
+
+@pytest.fixture
+def directory(tmp_path):
+    """
+    Directory with a snapshot of two open tasks, "a" and "b"
+    """
+
+    JsonJournalStorage(task_journal=TaskJournal(
+        snapshot_dir=str(tmp_path / "tasks.json"),
+        journal_dir=str(tmp_path / "tasks.journal"),
+        compaction_threshold=2 ** 62
+    )).write_snapshot(tasks=(
+        Task(task_id=task_id, task_name=task_id.upper(), deadline=DEADLINE,
+             completed=False).to_dict()
+        for task_id in ("a", "b")
+    ))
+
+    return tmp_path
+
+
+def test_changes_to_different_tasks_and_fields_are_merged(directory):
+    first_store: TaskStore = open_store(directory)
+    second_store: TaskStore = open_store(directory)
+
+    first_store.edit(task_id="a", task_name="First", deadline=DEADLINE)
+    first_store.save()
+
+    second_store.edit(task_id="a", task_name="A", deadline=DEADLINE + 1)
+    second_store.toggle(task_id="b", completed=True)
+    changed_elsewhere: bool = second_store.prepare_save()()
+
+    assert changed_elsewhere
+    assert stored_states(directory) == {
+        "a": ("First", DEADLINE + 1, False),
+        "b": ("B", DEADLINE, True)
+    }
+
+
+def test_same_field_changed_differently_conflicts(directory):
+    first_store: TaskStore = open_store(directory)
+    second_store: TaskStore = open_store(directory)
+
+    first_store.edit(task_id="a", task_name="First", deadline=DEADLINE)
+    first_store.save()
+
+    second_store.edit(task_id="a", task_name="Second", deadline=DEADLINE)
+    second_store.toggle(task_id="b", completed=True)
+
+    with pytest.raises(SaveConflictError) as error:
+        second_store.save()
+
+    assert error.value.conflicted_task_names == ["Second"]
+    assert stored_states(directory) == {
+        "a": ("First", DEADLINE, False),
+        "b": ("B", DEADLINE, True)
+    }
+
+
+def test_same_change_in_both_instances_does_not_conflict(directory):
+    first_store: TaskStore = open_store(directory)
+    second_store: TaskStore = open_store(directory)
+
+    first_store.toggle(task_id="a", completed=True)
+    first_store.save()
+
+    second_store.toggle(task_id="a", completed=True)
+    second_store.save()
+
+    assert stored_states(directory)["a"] == ("A", DEADLINE, True)
+
+
+def test_edit_of_task_deleted_elsewhere_conflicts(directory):
+    first_store: TaskStore = open_store(directory)
+    second_store: TaskStore = open_store(directory)
+
+    first_store.delete(task_id="a")
+    first_store.save()
+
+    second_store.edit(task_id="a", task_name="Second", deadline=DEADLINE)
+
+    with pytest.raises(SaveConflictError) as error:
+        second_store.save()
+
+    assert error.value.conflicted_task_names == ["Second"]
+    assert "a" not in stored_states(directory)
+
+
+def test_delete_of_task_edited_elsewhere_conflicts(directory):
+    first_store: TaskStore = open_store(directory)
+    second_store: TaskStore = open_store(directory)
+
+    first_store.edit(task_id="a", task_name="First", deadline=DEADLINE)
+    first_store.save()
+
+    second_store.delete(task_id="a")
+
+    with pytest.raises(SaveConflictError) as error:
+        second_store.save()
+
+    assert error.value.conflicted_task_names == ["First"]
+    assert stored_states(directory)["a"] == ("First", DEADLINE, False)
+
+
+def test_tasks_added_in_both_instances_are_kept(directory):
+    first_store: TaskStore = open_store(directory)
+    second_store: TaskStore = open_store(directory)
+
+    first_task: Task = first_store.add(task_name="C", deadline=DEADLINE)
+    first_store.save()
+
+    second_task: Task = second_store.add(task_name="D", deadline=DEADLINE)
+    second_store.save()
+
+    assert list(stored_states(directory)) == [
+        "a", "b", first_task.task_id, second_task.task_id
+    ]
+
+
+def test_journal_is_replayed_on_top_of_snapshot(directory):
+    task_store: TaskStore = open_store(directory)
+
+    added_task: Task = task_store.add(task_name="C", deadline=DEADLINE)
+    task_store.edit(task_id="a", task_name="First", deadline=DEADLINE + 2)
+    task_store.toggle(task_id="a", completed=True)
+    task_store.delete(task_id="b")
+    task_store.save()
+
+    assert (directory / "tasks.journal").stat().st_size > 0
+    assert stored_states(directory) == {
+        "a": ("First", DEADLINE + 2, True),
+        added_task.task_id: ("C", DEADLINE, False)
+    }
+
+
+def test_compaction_folds_journal_into_snapshot(directory):
+    task_store: TaskStore = open_store(directory, compaction_threshold=0)
+
+    task_store.edit(task_id="a", task_name="First", deadline=DEADLINE)
+    task_store.save()
+    task_store.toggle(task_id="b", completed=True)
+    task_store.save()
+
+    assert (directory / "tasks.journal").stat().st_size == 0
+    assert list(SnapshotReader(str(directory / "tasks.json"))) == [
+        {"task_id": "a", "task_name": "First", "deadline": "01-01-2030",
+         "completed": False},
+        {"task_id": "b", "task_name": "B", "deadline": "01-01-2030",
+         "completed": True}
+    ]
+
+
+def test_compaction_after_another_save_keeps_its_changes(directory):
+    first_store: TaskStore = open_store(directory)
+    second_store: TaskStore = open_store(directory, compaction_threshold=0)
+
+    first_store.edit(task_id="a", task_name="First", deadline=DEADLINE)
+    first_store.save()
+
+    second_store.toggle(task_id="b", completed=True)
+    second_store.storage_outdated = True
+    second_store.save()
+
+    assert stored_states(directory) == {
+        "a": ("First", DEADLINE, False),
+        "b": ("B", DEADLINE, True)
+    }
+
+
+def test_full_rewrite_saves_tasks_as_they_were_when_prepared(directory):
+    task_store: TaskStore = open_store(directory)
+    task_store.storage_outdated = True
+
+    save_job = task_store.prepare_save()
+    task_store.edit(task_id="a", task_name="Later", deadline=DEADLINE)
+    save_job()
+
+    assert stored_states(directory)["a"] == ("A", DEADLINE, False)
+
+    task_store.save()
+
+    assert stored_states(directory)["a"] == ("Later", DEADLINE, False)
@@ -0,0 +1,246 @@
+"""
+Tests of undoing and redoing changes to tasks with UndoHistory.
+"""
+
+import datetime
+
+from task_store import TaskStore
+from undo_history import UndoHistory
+
+DEADLINE: int = datetime.date(2030, 1, 1).toordinal()
+
+
+def create_store(max_depth: int = 10) -> tuple:
+    """
+    Creates a store with three open tasks, added without recording an
+    undo step
+
+    Parameters
+    ----------
+    max_depth : int, default: 10
+        Number of steps that can be undone
+
+    Returns
+    ----------
+    store : tuple
+        The task store and its undo history
+    """
+
+    task_store = TaskStore()
+    undo_history = UndoHistory(task_store=task_store, max_depth=max_depth)
+    task_store.add_listener(undo_history.on_task_changed)
+
+    with undo_history.ignore_changes():
+        task_store.add_many(
+            (task_name, DEADLINE, False) for task_name in ("A", "B", "C")
+        )
+
+    return task_store, undo_history
+
+
+def states(task_store: TaskStore) -> list:
+    return [task.state() for task in task_store]
+
+
+def test_ignored_changes_are_not_recorded():
+    task_store, undo_history = create_store()
+
+    assert len(task_store) == 3
+    assert not undo_history.can_undo()
+
+
+def test_undo_and_redo_add():
+    task_store, undo_history = create_store()
+
+    added_tasks: list = task_store.add_many(
+        [("D", DEADLINE, False), ("E", DEADLINE, False)]
+    )
+
+    changes: dict = undo_history.undo()
+
+    assert changes["delete"] == added_tasks
+    assert [task.task_name for task in task_store] == ["A", "B", "C"]
+
+    changes = undo_history.redo()
+
+    assert changes["add"] == added_tasks
+    assert [task.task_name for task in task_store] == [
+        "A", "B", "C", "D", "E"
+    ]
+    assert [task.task_id for task in task_store][3:] == [
+        task.task_id for task in added_tasks
+    ]
+
+
+def test_undo_and_redo_edit():
+    task_store, undo_history = create_store()
+    task_id: str = list(task_store)[1].task_id
+
+    task_store.edit(
+        task_id=task_id, task_name="Renamed", deadline=DEADLINE + 1
+    )
+
+    changes: dict = undo_history.undo()
+
+    assert [task.task_id for task in changes["edit"]] == [task_id]
+    assert task_store.get(task_id).state() == ("B", DEADLINE, False)
+
+    undo_history.redo()
+
+    assert task_store.get(task_id).state() == (
+        "Renamed", DEADLINE + 1, False
+    )
+
+
+def test_undo_of_toggle_restores_each_task_state():
+    task_store, undo_history = create_store()
+    task_ids: list = [task.task_id for task in task_store]
+
+    with undo_history.ignore_changes():
+        task_store.toggle(task_id=task_ids[0], completed=True)
+
+    task_store.toggle_many(task_ids=task_ids, completed=True)
+    assert all(task.completed for task in task_store)
+
+    changes: dict = undo_history.undo()
+
+    assert changes["toggle"] == list(task_store)[1:]
+    assert [task.completed for task in task_store] == [True, False, False]
+
+    undo_history.redo()
+
+    assert all(task.completed for task in task_store)
+
+
+def test_undo_of_delete_brings_back_same_tasks():
+    task_store, undo_history = create_store()
+    deleted_tasks: list = task_store.delete_many(
+        task.task_id for task in list(task_store)[:2]
+    )
+
+    changes: dict = undo_history.undo()
+
+    assert changes["add"] == deleted_tasks
+    assert sorted(states(task_store)) == [
+        ("A", DEADLINE, False), ("B", DEADLINE, False), ("C", DEADLINE, False)
+    ]
+    assert all(task.task_id in task_store for task in deleted_tasks)
+
+    undo_history.redo()
+
+    assert states(task_store) == [("C", DEADLINE, False)]
+
+
+def test_batch_is_undone_as_one_step():
+    task_store, undo_history = create_store()
+
+    task_store.toggle_many(
+        task_ids=[task.task_id for task in task_store], completed=True
+    )
+    task_store.add(task_name="D", deadline=DEADLINE)
+
+    undo_history.undo()
+    undo_history.undo()
+
+    assert states(task_store) == [("A", DEADLINE, False),
+                                  ("B", DEADLINE, False),
+                                  ("C", DEADLINE, False)]
+    assert not undo_history.can_undo()
+
+
+def test_undo_and_redo_are_not_recorded_as_steps():
+    task_store, undo_history = create_store()
+
+    task_store.add(task_name="D", deadline=DEADLINE)
+    undo_history.undo()
+
+    assert not undo_history.can_undo()
+    assert undo_history.can_redo()
+
+
+def test_new_change_clears_redo_steps():
+    task_store, undo_history = create_store()
+
+    task_store.add(task_name="D", deadline=DEADLINE)
+    undo_history.undo()
+    task_store.add(task_name="E", deadline=DEADLINE)
+
+    assert not undo_history.can_redo()
+    assert undo_history.redo() == {
+        "add": [], "edit": [], "toggle": [], "delete": [], "rules": []
+    }
+
+
+def test_steps_beyond_max_depth_are_dropped():
+    task_store, undo_history = create_store(max_depth=2)
+
+    for task_name in ("D", "E", "F"):
+        task_store.add(task_name=task_name, deadline=DEADLINE)
+
+    undo_history.undo()
+    undo_history.undo()
+
+    assert not undo_history.can_undo()
+    assert [task.task_name for task in task_store] == ["A", "B", "C", "D"]
+
+
+def test_undo_skips_tasks_deleted_elsewhere():
+    task_store, undo_history = create_store()
+    task_id: str = list(task_store)[0].task_id
+
+    task_store.toggle(task_id=task_id, completed=True)
+    with undo_history.ignore_changes():
+        task_store.delete(task_id=task_id)
+
+    changes: dict = undo_history.undo()
+
+    assert changes["toggle"] == []
+    assert task_id not in task_store
+
+
+def test_undone_steps_are_journaled():
+    task_store, undo_history = create_store()
+    task_store.journal_records = []
+
+    added_task = task_store.add(task_name="D", deadline=DEADLINE)
+    undo_history.undo()
+
+    assert task_store.journal_records[-1] == {
+        "op": "delete", "task_id": added_task.task_id
+    }
+
+
+def test_changes_in_batch_are_undone_as_one_step():
+    task_store, undo_history = create_store()
+    task_ids: list = [task.task_id for task in task_store]
+
+    # Completing a selection of a recurring and two other tasks moves
+    # the recurring one to its next occurrence and finishes the others
+    with undo_history.batch():
+        task_store.edit_many([(task_ids[0], "A", DEADLINE + 1)])
+        with undo_history.batch():
+            task_store.toggle_many(task_ids=task_ids[1:], completed=True)
+
+    changes: dict = undo_history.undo()
+
+    assert changes["edit"] == list(task_store)[:1]
+    assert changes["toggle"] == list(task_store)[1:]
+    assert states(task_store) == [("A", DEADLINE, False),
+                                  ("B", DEADLINE, False),
+                                  ("C", DEADLINE, False)]
+    assert not undo_history.can_undo()
+
+    undo_history.redo()
+
+    assert states(task_store) == [("A", DEADLINE + 1, False),
+                                  ("B", DEADLINE, True),
+                                  ("C", DEADLINE, True)]
+
+
+def test_empty_batch_is_not_recorded():
+    task_store, undo_history = create_store()
+
+    with undo_history.batch():
+        task_store.toggle_many(task_ids=[], completed=True)
+
+    assert not undo_history.can_undo()
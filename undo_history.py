@@ -0,0 +1,337 @@
+"""
+Undo and redo of changes to tasks.
+
+UndoHistory listens to the task store and keeps every change as a step
+holding only the changed tasks and the states needed to reverse it, so
+a step costs memory and time in proportion to the number of tasks it
+changed, not to the number of tasks. Added and deleted tasks are kept
+as they are, edits and toggles also keep the states before and after
+the change. Changes of recurrence rules, like finished occurrences,
+keep the rules' states before and after. Changes made inside a batch
+block are kept as one step, so a user action that changes tasks in
+several ways is undone at once. Undoing and redoing go through the
+task store's batch operations, so they are journaled and saved like
+any other change. Steps beyond the configured depth are dropped,
+oldest first.
+"""
+
+import contextlib
+import collections
+
+from recurrence import RecurrenceStore
+from task_store import TaskStore
+from typing import Iterator, Union
+
+# Operation that reverses each operation
+INVERSE_OPERATIONS: dict = {
+    "add": "delete", "delete": "add", "edit": "edit", "toggle": "toggle",
+    "rules": "rules"
+}
+
+
+class UndoHistory():
+    def __init__(
+            self,
+            task_store: TaskStore,
+            max_depth: int,
+            recurrences: Union[RecurrenceStore, None] = None) -> None:
+        """
+        Parameters
+        ----------
+        task_store : TaskStore
+            Store whose changes are undone and redone. on_task_changed
+            has to be added to its listeners
+        max_depth : int
+            Number of steps that can be undone
+        recurrences : RecurrenceStore or None, default: None
+            Rules of recurring tasks whose changes are undone and redone
+            too. on_rules_changed has to be added to its listeners
+        """
+
+        self.task_store = task_store
+        self.recurrences = recurrences
+
+        # Tuples of the step's changes, in the order they were made.
+        # A change is an (operation, tasks, states before, states after)
+        # tuple. States are None for added and deleted tasks, which keep
+        # their state themselves. Changes of rules have the "rules"
+        # operation, task IDs instead of tasks and the rules' states
+        self.undo_steps = collections.deque(maxlen=max_depth)
+        self.redo_steps = collections.deque(maxlen=max_depth)
+
+        self.ignored_changes: int = 0
+        # Changes recorded inside batch blocks, None outside them
+        self.batch_changes: Union[list, None] = None
+
+    def can_undo(self) -> bool:
+        return bool(self.undo_steps)
+
+    def can_redo(self) -> bool:
+        return bool(self.redo_steps)
+
+    def clear(self) -> None:
+        self.undo_steps.clear()
+        self.redo_steps.clear()
+
+    @contextlib.contextmanager
+    def ignore_changes(self) -> Iterator[None]:
+        """
+        Changes made inside the with block aren't recorded, like
+        changes saved by other programs or made by undo and redo
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None : Iterator[None]
+            Yields once, for the duration of the with block
+        """
+
+        self.ignored_changes += 1
+
+        try:
+            yield
+        finally:
+            self.ignored_changes -= 1
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Changes made inside the with block are recorded as one step.
+        Nested blocks are part of the outermost one
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None : Iterator[None]
+            Yields once, for the duration of the with block
+        """
+
+        if self.batch_changes is not None:
+            yield
+            return
+
+        self.batch_changes = []
+
+        try:
+            yield
+        finally:
+            changes: list = self.batch_changes
+            self.batch_changes = None
+
+            if changes:
+                self.add_step(tuple(changes))
+
+    def add_step(self, changes: tuple) -> None:
+        self.undo_steps.append(changes)
+        self.redo_steps.clear()
+
+    def on_task_changed(
+            self,
+            operation: str,
+            tasks: list,
+            previous_states: list) -> None:
+        """
+        Records a change as a step, or as part of the current batch.
+        Steps that were undone can't be redone anymore
+
+        Parameters
+        ----------
+        operation : str
+            "add", "edit", "toggle" or "delete"
+        tasks : list
+            Changed tasks
+        previous_states : list
+            Tasks' states before the change, None for added tasks
+
+        Returns
+        ----------
+        None
+        """
+
+        if self.ignored_changes:
+            return
+
+        states: Union[tuple, None] = None
+        if operation in ("edit", "toggle"):
+            states = tuple(task.state() for task in tasks)
+        else:
+            previous_states = None
+
+        self.record_change((
+            operation, tuple(tasks),
+            None if previous_states is None else tuple(previous_states),
+            states
+        ))
+
+    def on_rules_changed(
+            self,
+            task_ids: list,
+            previous_states: Union[list, None]) -> None:
+        """
+        Records a change of recurrence rules as a step, or as part of
+        the current batch. Changes that follow changes of tasks aren't
+        recorded, undoing the tasks' changes reverses them
+
+        Parameters
+        ----------
+        task_ids : list
+            IDs of the tasks whose rules changed
+        previous_states : list or None
+            Rules' states before the change, returned by
+            RecurrenceStore.rule_state, None if the change follows a
+            change of tasks
+
+        Returns
+        ----------
+        None
+        """
+
+        if self.ignored_changes or previous_states is None:
+            return
+
+        self.record_change((
+            "rules", tuple(task_ids), tuple(previous_states),
+            tuple(self.recurrences.rule_state(task_id)
+                  for task_id in task_ids)
+        ))
+
+    def record_change(self, change: tuple) -> None:
+        if self.batch_changes is None:
+            self.add_step((change,))
+        else:
+            self.batch_changes.append(change)
+
+    def undo(self) -> dict:
+        """
+        Reverses the latest step that wasn't undone yet, its changes
+        latest first. Tasks that other programs have deleted or added
+        again in the meantime are skipped
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        changes : dict
+            Added, edited, toggled and deleted tasks, keyed by "add",
+            "edit", "toggle" and "delete", and IDs of tasks whose rules
+            changed, keyed by "rules". Empty lists if there's
+            nothing to undo
+        """
+
+        changes: dict = {
+            "add": [], "edit": [], "toggle": [], "delete": [], "rules": []
+        }
+
+        if not self.undo_steps:
+            return changes
+
+        step: tuple = self.undo_steps.pop()
+        self.redo_steps.append(step)
+
+        for operation, tasks, previous_states, _ in reversed(step):
+            self.apply_change(
+                operation=INVERSE_OPERATIONS[operation], tasks=tasks,
+                states=previous_states, changes=changes
+            )
+
+        return changes
+
+    def redo(self) -> dict:
+        """
+        Makes the latest undone step again
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        changes : dict
+            Added, edited, toggled and deleted tasks, keyed by "add",
+            "edit", "toggle" and "delete", and IDs of tasks whose rules
+            changed, keyed by "rules". Empty lists if there's
+            nothing to redo
+        """
+
+        changes: dict = {
+            "add": [], "edit": [], "toggle": [], "delete": [], "rules": []
+        }
+
+        if not self.redo_steps:
+            return changes
+
+        step: tuple = self.redo_steps.pop()
+        self.undo_steps.append(step)
+
+        for operation, tasks, _, states in step:
+            self.apply_change(
+                operation=operation, tasks=tasks, states=states,
+                changes=changes
+            )
+
+        return changes
+
+    def apply_change(
+            self,
+            operation: str,
+            tasks: tuple,
+            states: Union[tuple, None],
+            changes: dict) -> None:
+        """
+        Changes tasks with the task store's batch operations without
+        recording the change as a step
+
+        Parameters
+        ----------
+        operation : str
+            "add" to append removed tasks again, "delete" to remove
+            tasks, "edit" or "toggle" to give tasks the given states,
+            "rules" to give tasks the given rules
+        tasks : tuple
+            Tasks of the change, task IDs for "rules"
+        states : tuple or None
+            States to give the tasks, None for "add" and "delete"
+        changes : dict
+            Changed tasks keyed by operation, which the tasks changed
+            are added to
+
+        Returns
+        ----------
+        None
+        """
+
+        with self.ignore_changes():
+            if operation == "add":
+                changes["add"].extend(self.task_store.restore_many(tasks))
+            elif operation == "delete":
+                changes["delete"].extend(self.task_store.delete_many(
+                    task.task_id for task in tasks
+                ))
+            elif operation == "edit":
+                changes["edit"].extend(self.task_store.edit_many(
+                    (task.task_id, task_name, deadline)
+                    for task, (task_name, deadline, _) in zip(tasks, states)
+                ))
+            elif operation == "toggle":
+                for completed in (True, False):
+                    changes["toggle"].extend(self.task_store.toggle_many(
+                        task_ids=[
+                            task.task_id
+                            for task, state in zip(tasks, states)
+                            if state[2] == completed
+                        ],
+                        completed=completed
+                    ))
+            elif operation == "rules":
+                self.recurrences.restore_rule_states(
+                    task_ids=tasks, states=states
+                )
+                changes["rules"].extend(tasks)